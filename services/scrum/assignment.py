@@ -0,0 +1,233 @@
+import heapq
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config import settings
+
+# Tasks at least this complex go to a user rated at least HIGH_RATING when one matches
+COMPLEX_TASK_THRESHOLD = 7
+# Complexity of nodes whose complexity is missing or not a number
+DEFAULT_COMPLEXITY = 5
+HIGH_RATING = 300
+# Nodes scored per matrix product, bounding memory to NODE_CHUNK x users scores
+NODE_CHUNK = 256
+
+
+class SkillIndex:
+    """
+    An organization's users and their skills as a 0/1 matrix.
+
+    Columns are the skills any user has. Built once per organization
+    snapshot and shared by every assignment against it, since nothing in it
+    depends on the request.
+    """
+
+    def __init__(self, users: Sequence[Mapping[str, Any]]):
+        self.users = list(users)
+        self.emails = [user.get("email") for user in self.users]
+        self.columns: Dict[str, int] = {}
+        rows, cols = [], []
+        for row, user in enumerate(self.users):
+            for skill in set(user.get("skills") or ()):
+                rows.append(row)
+                cols.append(self.columns.setdefault(skill, len(self.columns)))
+        self.matrix = np.zeros((len(self.users), len(self.columns)), dtype=np.float32)
+        self.matrix[rows, cols] = 1
+
+    def encode(self, skill_lists: Sequence[Iterable[str]]) -> np.ndarray:
+        """0/1 matrix of required skills, one row per node; unknown skills are dropped."""
+        encoded = np.zeros((len(skill_lists), len(self.columns)), dtype=np.float32)
+        for row, skills in enumerate(skill_lists):
+            for skill in skills or ():
+                col = self.columns.get(skill)
+                if col is not None:
+                    encoded[row, col] = 1
+        return encoded
+
+    def rating_ranks(self, ratings: Dict[str, int]) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-user ratings, and their dense ranks (0 = lowest) for tie-breaking."""
+        values = np.array([ratings.get(email, 0) or 0 for email in self.emails], dtype=np.float64)
+        _, ranks = np.unique(values, return_inverse=True)
+        return values, ranks.astype(np.int64)
+
+
+def skill_index(organization: Mapping[str, Any]) -> SkillIndex:
+    """The organization's SkillIndex, reusing the one cached on a snapshot."""
+    index = getattr(organization, "skill_index", None)
+    if index is None:
+        index = SkillIndex(organization.get("users", []))
+    return index
+
+
+def best_matches(index: SkillIndex, nodes: Sequence[Tuple[Iterable[str], int]],
+                 ratings: Dict[str, int]) -> List[Optional[int]]:
+    """
+    Pick the best user for each (required_skills, complexity) node.
+
+    Candidates are users sharing at least one required skill. The best has
+    the most shared skills, then the highest rating, then comes first in the
+    organization. For nodes of complexity >= COMPLEX_TASK_THRESHOLD, the
+    best candidate rated >= HIGH_RATING is preferred when there is one.
+
+    Returns:
+        Index into `index.users` per node, or None when nobody matches
+    """
+    if not nodes or not index.users or not index.columns:
+        return [None] * len(nodes)
+
+    values, ranks = index.rating_ranks(ratings)
+    levels = int(ranks.max()) + 1
+    high_rated = values >= HIGH_RATING
+    users_t = index.matrix.T
+
+    chosen: List[Optional[int]] = []
+    for start in range(0, len(nodes), NODE_CHUNK):
+        chunk = nodes[start:start + NODE_CHUNK]
+        overlap = (index.encode([skills for skills, _ in chunk]) @ users_t).astype(np.int64)
+        # Lexicographic (overlap, rating) as one integer; argmax keeps the
+        # first user among equals, like a stable sort of the candidates
+        keys = np.where(overlap > 0, overlap * levels + ranks, -1)
+        best = keys.argmax(axis=1)
+        best_key = keys[np.arange(len(chunk)), best]
+
+        complex_rows = np.array([complexity >= COMPLEX_TASK_THRESHOLD for _, complexity in chunk])
+        if complex_rows.any() and high_rated.any():
+            high_keys = np.where(high_rated, keys[complex_rows], -1)
+            high_best = high_keys.argmax(axis=1)
+            found = high_keys[np.arange(len(high_best)), high_best] >= 0
+            rows = np.flatnonzero(complex_rows)[found]
+            best[rows] = high_best[found]
+
+        chosen.extend(int(user) if key >= 0 else None for user, key in zip(best, best_key))
+    return chosen
+
+
+def balanced_matches(index: SkillIndex, nodes: Sequence[Tuple[Iterable[str], int]],
+                     ratings: Dict[str, int], capacity: int = None) -> List[Optional[int]]:
+    """
+    Spread nodes over the users who fit them by accumulated complexity.
+
+    Nodes are placed most complex first, each on the least-loaded user
+    sharing one of its required skills; equal loads go to the better fit,
+    then the higher rating. Nodes of complexity >= COMPLEX_TASK_THRESHOLD
+    go to the least-loaded user rated >= HIGH_RATING when one fits. With a
+    `capacity` (ASSIGNMENT_USER_CAPACITY by default, 0 = none), no user
+    takes more complexity than that and a node nobody can take is left
+    unassigned.
+
+    Every required skill gets a min-heap of its users keyed by load, built
+    on first use. A user's old entries are left in place when their load
+    grows and skipped once they surface, so placing a node costs
+    O(skills x log users).
+
+    Returns:
+        Index into `index.users` per node, or None when nobody fits
+    """
+    capacity = settings.ASSIGNMENT_USER_CAPACITY if capacity is None else capacity
+    values, _ = index.rating_ranks(ratings)
+    high_rated = values >= HIGH_RATING
+    user_skills = [set(user.get("skills") or ()) for user in index.users]
+    loads = [0] * len(index.users)
+    heaps: Dict[Tuple[str, bool], list] = {}
+
+    def heap(skill: str, high: bool) -> list:
+        entries = heaps.get((skill, high))
+        if entries is None:
+            members = np.flatnonzero(index.matrix[:, index.columns[skill]])
+            if high:
+                members = members[high_rated[members]]
+            entries = [(loads[user], -float(values[user]), int(user)) for user in members]
+            heapq.heapify(entries)
+            heaps[(skill, high)] = entries
+        return entries
+
+    def least_loaded(entries: list) -> Optional[tuple]:
+        while entries and entries[0][0] != loads[entries[0][2]]:
+            heapq.heappop(entries)
+        return entries[0] if entries else None
+
+    def choose(required: set, complexity: int, high: bool) -> Optional[int]:
+        best = None
+        for skill in required:
+            entry = least_loaded(heap(skill, high))
+            if entry is not None:
+                load, rating, user = entry
+                key = (load, -len(required & user_skills[user]), rating, user)
+                best = key if best is None or key < best else best
+        # The least-loaded candidate is full, so every candidate is
+        if best is None or (capacity and best[0] + complexity > capacity):
+            return None
+        return best[-1]
+
+    chosen: List[Optional[int]] = [None] * len(nodes)
+    for position in sorted(range(len(nodes)), key=lambda i: -nodes[i][1]):
+        skills, complexity = nodes[position]
+        required = {skill for skill in skills or () if skill in index.columns}
+        user = None
+        if complexity >= COMPLEX_TASK_THRESHOLD:
+            user = choose(required, complexity, high=True)
+        if user is None:
+            user = choose(required, complexity, high=False)
+        if user is None:
+            continue
+
+        chosen[position] = user
+        if complexity > 0:
+            loads[user] += complexity
+            for skill in user_skills[user]:
+                for high in (False, True) if high_rated[user] else (False,):
+                    entries = heaps.get((skill, high))
+                    if entries is not None:
+                        heapq.heappush(entries, (loads[user], -float(values[user]), user))
+    return chosen
+
+
+def node_complexity(item: Mapping[str, Any]) -> int:
+    """A node's complexity as an int; the LLM may answer "8", "high" or nothing."""
+    try:
+        return int(item.get("complexity", DEFAULT_COMPLEXITY))
+    except (TypeError, ValueError):
+        return DEFAULT_COMPLEXITY
+
+
+def assign_tree(tasks: List[Dict[str, Any]], organization: Mapping[str, Any],
+                ratings: Dict[str, int], mode: str = None) -> List[Dict[str, Any]]:
+    """
+    Set assignee fields on every node of `tasks` that has `required_skills`.
+
+    Args:
+        tasks: Decomposed forest, updated in place
+        organization: Organization info with its users
+        ratings: Rating per user email
+        mode: "best" scores all nodes against all users in batched matrix
+            products and gives each its best fit; "balanced" spreads load
+            with `balanced_matches`. Defaults to ASSIGNMENT_MODE.
+    """
+    mode = mode or settings.ASSIGNMENT_MODE
+    if mode not in ("best", "balanced"):
+        raise ValueError(f"Unknown assignment mode: {mode}")
+    nodes = []
+
+    def collect(item):
+        if "required_skills" in item:
+            nodes.append(item)
+        for child in [*(item.get("stories") or []), *(item.get("subtasks") or [])]:
+            collect(child)
+
+    for task in tasks:
+        collect(task)
+
+    index = skill_index(organization)
+    requirements = [(item["required_skills"], node_complexity(item)) for item in nodes]
+    if mode == "balanced":
+        matches = balanced_matches(index, requirements, ratings)
+    else:
+        matches = best_matches(index, requirements, ratings)
+    for item, user in zip(nodes, matches):
+        assignee = index.users[user] if user is not None else None
+        item["assignee"] = f"{assignee['name']} {assignee['surname']}" if assignee else "Unassigned"
+        if assignee:
+            item["assignee_rating"] = ratings.get(assignee.get('email'), 0)
+            item["assignee_email"] = assignee.get('email')
+    return tasks
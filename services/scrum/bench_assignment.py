@@ -0,0 +1,168 @@
+"""
+Benchmark for task assignment on a large organization.
+
+Assigns a generated forest to a synthetic organization with the previous
+per-node Python loop over users and with the vectorized engine, checks
+both pick the same assignees, and reports wall time for each. Then runs
+the balanced mode and compares how load is spread.
+
+Usage:
+    python bench_assignment.py [--users N] [--nodes N] [--seed N]
+"""
+
+import argparse
+import copy
+import os
+import random
+import time
+from collections import Counter
+
+os.environ.setdefault("AZURE_OPENAI_API_KEY", "bench")
+os.environ.setdefault("AZURE_OPENAI_ENDPOINT", "http://openai.bench")
+os.environ.setdefault("API_VERSION", "2024-02-15-preview")
+
+from assignment import COMPLEX_TASK_THRESHOLD, HIGH_RATING, SkillIndex, assign_tree
+
+SKILLS = ["Backend", "API", "Python", "FastAPI", "SQL", "Database", "Frontend", "UI", "UX", "React",
+          "TypeScript", "CSS", "Mobile", "iOS", "Android", "Swift", "Kotlin", "DevOps", "AWS", "Docker",
+          "Kubernetes", "CI/CD", "Testing", "QA", "Automation", "Selenium", "Data", "Analytics", "ML",
+          "Security", "Authentication", "Encryption", "Architecture", "Design", "Leadership",
+          "Programming", "Development"]
+
+
+class IndexedOrganization(dict):
+    """Organization dict carrying a prebuilt index, as a cached snapshot does."""
+
+    def __init__(self, organization, skill_index):
+        super().__init__(organization)
+        self.skill_index = skill_index
+
+
+def legacy_assign(tasks, users, ratings):
+    """The previous assignment: a scan and sort of all users per node."""
+
+    def find_best_match(required_skills, complexity):
+        candidates = []
+        for user in users:
+            overlap = len(set(required_skills).intersection(set(user.get("skills", []))))
+            if overlap > 0:
+                candidates.append({'user': user, 'overlap': overlap, 'rating': ratings.get(user.get('email'), 0)})
+        if not candidates:
+            return None
+        candidates.sort(key=lambda x: (-x['overlap'], -x['rating']))
+        if complexity >= COMPLEX_TASK_THRESHOLD:
+            high_rated = [c for c in candidates if c['rating'] >= HIGH_RATING]
+            if high_rated:
+                return high_rated[0]['user']
+        return candidates[0]['user']
+
+    def process_item(item):
+        if "required_skills" in item:
+            assignee = find_best_match(item["required_skills"], item.get("complexity", 5))
+            item["assignee"] = f"{assignee['name']} {assignee['surname']}" if assignee else "Unassigned"
+            if assignee:
+                item["assignee_rating"] = ratings.get(assignee.get('email'), 0)
+                item["assignee_email"] = assignee.get('email')
+        for key in ("stories", "subtasks"):
+            if key in item:
+                item[key] = [process_item(child) for child in item[key]]
+        return item
+
+    return [process_item(task) for task in tasks]
+
+
+def make_organization(users: int, rng: random.Random):
+    members = [
+        {
+            "name": f"User{i}",
+            "surname": "Bench",
+            "email": f"user{i}@example.com",
+            "skills": rng.sample(SKILLS, rng.randint(1, 8))
+        }
+        for i in range(users)
+    ]
+    ratings = {member["email"]: rng.randint(0, 600) for member in members}
+    return {"users": members}, ratings
+
+
+def make_forest(nodes: int, rng: random.Random):
+    def node(kind):
+        return {"summary": kind, "required_skills": rng.sample(SKILLS, rng.randint(1, 4)),
+                "complexity": rng.randint(1, 10)}
+
+    forest = []
+    count = 0
+    while count < nodes:
+        epic = node("Epic")
+        epic["stories"] = []
+        count += 1
+        for _ in range(5):
+            story = node("Story")
+            story["subtasks"] = [node("Subtask") for _ in range(3)]
+            epic["stories"].append(story)
+            count += 4
+        forest.append(epic)
+    return forest
+
+
+def nodes(forest):
+    found = []
+
+    def walk(item):
+        found.append(item)
+        for child in item.get("stories", []) + item.get("subtasks", []):
+            walk(child)
+
+    for epic in forest:
+        walk(epic)
+    return found
+
+
+def assignees(forest):
+    return [node.get("assignee_email") for node in nodes(forest)]
+
+
+def load_spread(forest) -> str:
+    loads = Counter()
+    for node in nodes(forest):
+        if node.get("assignee_email"):
+            loads[node["assignee_email"]] += node["complexity"]
+    return f"{len(loads)} assignees, max load {max(loads.values())}"
+
+
+def main(args):
+    rng = random.Random(args.seed)
+    organization, ratings = make_organization(args.users, rng)
+    forest = make_forest(args.nodes, rng)
+    print(f"{args.users} users x {len(assignees(forest))} nodes")
+
+    start = time.perf_counter()
+    legacy = legacy_assign(copy.deepcopy(forest), organization["users"], ratings)
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = SkillIndex(organization["users"])
+    index_time = time.perf_counter() - start
+
+    indexed = IndexedOrganization(organization, skill_index=index)
+    start = time.perf_counter()
+    vectorized = assign_tree(copy.deepcopy(forest), indexed, ratings)
+    vectorized_time = time.perf_counter() - start
+
+    assert assignees(legacy) == assignees(vectorized), "vectorized assignment disagrees with the legacy loop"
+    print(f"legacy loop:        {legacy_time:8.3f} s")
+    print(f"skill index build:  {index_time:8.3f} s (once per organization snapshot)")
+    print(f"vectorized assign:  {vectorized_time:8.3f} s ({legacy_time / vectorized_time:.0f}x), {load_spread(vectorized)}")
+
+    start = time.perf_counter()
+    balanced = assign_tree(copy.deepcopy(forest), indexed, ratings, mode="balanced")
+    balanced_time = time.perf_counter() - start
+    print(f"balanced assign:    {balanced_time:8.3f} s, {load_spread(balanced)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--nodes", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=3)
+    main(parser.parse_args())
@@ -0,0 +1,112 @@
+"""
+Benchmark for PDF extraction: event-loop lag and wall time.
+
+Compares the old in-handler extraction (pypdf on the event loop, text built
+with +=) against DocumentExtractor (process pool, parallel page ranges) for
+generated 10/100/1000-page PDFs.
+
+Usage:
+    python bench_extraction.py [--workers N] [--pages-per-task N]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import pypdf
+from pypdf import PdfWriter
+from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+from extraction import DocumentExtractor
+from ingestion import SpooledDocument
+
+PAGE_COUNTS = [10, 100, 1000]
+LINES_PER_PAGE = 45
+TICK = 0.005
+
+
+def make_pdf(path: str, pages: int):
+    writer = PdfWriter()
+    font = writer._add_object(DictionaryObject({
+        NameObject("/Type"): NameObject("/Font"),
+        NameObject("/Subtype"): NameObject("/Type1"),
+        NameObject("/BaseFont"): NameObject("/Helvetica"),
+    }))
+    for i in range(pages):
+        lines = " ".join(
+            f"(Page {i} requirement {j}: the service shall validate and persist the request.) Tj T*"
+            for j in range(LINES_PER_PAGE)
+        )
+        page = writer.add_blank_page(612, 792)
+        page[NameObject("/Resources")] = DictionaryObject({
+            NameObject("/Font"): DictionaryObject({NameObject("/F1"): font})
+        })
+        content = DecodedStreamObject()
+        content.set_data(f"BT /F1 9 Tf 40 760 Td 16 TL {lines} ET".encode())
+        page[NameObject("/Contents")] = writer._add_object(content)
+    with open(path, "wb") as f:
+        writer.write(f)
+
+
+def legacy_extract(path: str) -> str:
+    with open(path, "rb") as stream:
+        pdf_reader = pypdf.PdfReader(stream)
+        text = ""
+        for page in pdf_reader.pages:
+            text += page.extract_text() + "\n"
+    return text
+
+
+async def measure(extract) -> tuple:
+    """Run `extract` while a ticker records the worst event-loop delay."""
+    max_lag = 0.0
+    done = asyncio.Event()
+
+    async def ticker():
+        nonlocal max_lag
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(TICK)
+            max_lag = max(max_lag, time.perf_counter() - start - TICK)
+
+    tick_task = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    text = await extract()
+    wall = time.perf_counter() - start
+    done.set()
+    await tick_task
+    return wall, max_lag, len(text)
+
+
+async def main(workers: int, pages_per_task: int):
+    extractor = DocumentExtractor(max_workers=workers, pages_per_task=pages_per_task)
+    # Start the pool before timing so process spawn is not counted.
+    await extractor._run(os.getpid)
+
+    print(f"workers={workers} pages_per_task={pages_per_task}")
+    print(f"{'pages':>6} | {'mode':<7} | {'wall s':>8} | {'max loop lag ms':>15} | {'chars':>9}")
+    print("-" * 58)
+    with tempfile.TemporaryDirectory() as tmp:
+        for pages in PAGE_COUNTS:
+            path = os.path.join(tmp, f"bench-{pages}.pdf")
+            make_pdf(path, pages)
+            document = SpooledDocument(os.path.basename(path), "pdf", path, os.path.getsize(path))
+
+            async def inline():
+                return legacy_extract(path)
+
+            for mode, extract in (("inline", inline), ("pool", lambda: extractor.extract(document))):
+                wall, lag, chars = await measure(extract)
+                print(f"{pages:>6} | {mode:<7} | {wall:>8.2f} | {lag * 1000:>15.1f} | {chars:>9}")
+    extractor.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--pages-per-task", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.workers, args.pages_per_task))
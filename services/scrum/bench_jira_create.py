@@ -0,0 +1,100 @@
+"""
+Benchmark for Jira batch creation against the fake Jira server.
+
+Creates a generated Epic -> Story -> Subtask forest three ways: one request
+at a time (the old create_jira_tasks loop), through the concurrent
+scheduler with single creates, and through the scheduler with bulk
+creation. Reports wall time and the number of requests Jira received.
+
+Usage:
+    python bench_jira_create.py [--epics N] [--stories N] [--subtasks N] [--latency-ms N] [--rate N]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import time
+import types
+
+os.environ.setdefault("AZURE_OPENAI_API_KEY", "bench")
+os.environ.setdefault("AZURE_OPENAI_ENDPOINT", "http://openai.bench")
+os.environ.setdefault("API_VERSION", "2024-02-15-preview")
+
+import httpx
+
+from config import settings
+from fake_jira import create_fake_jira
+from http_client import HttpClientPool
+from jira_scheduler import RateLimiterRegistry
+from service import JiraScrumMasterService
+
+
+def make_forest(epics: int, stories: int, subtasks: int):
+    return [
+        {
+            "summary": f"Epic {e}",
+            "type": "Epic",
+            "stories": [
+                {
+                    "summary": f"Story {e}.{s}",
+                    "type": "Story",
+                    "assignee_email": f"dev{s}@example.com",
+                    "subtasks": [{"summary": f"Subtask {e}.{s}.{t}", "type": "Subtask"} for t in range(subtasks)]
+                }
+                for s in range(stories)
+            ]
+        }
+        for e in range(epics)
+    ]
+
+
+async def run_mode(forest, latency: float, rate: float, concurrency: int, bulk: bool) -> tuple:
+    app = create_fake_jira(latency=latency)
+    service = JiraScrumMasterService(
+        client=types.SimpleNamespace(),
+        mongo_client=types.SimpleNamespace(),
+        http=HttpClientPool(transport=httpx.ASGITransport(app=app))
+    )
+    service.jira_semaphore = asyncio.Semaphore(concurrency)
+    service.jira_rate_limiters = RateLimiterRegistry(rate=rate)
+    service.jira_bulk_supported = bulk
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        created = await service.create_jira_tasks(forest, "bench-token")
+    wall = time.perf_counter() - start
+    await service.close()
+    return wall, len(app.state.jira.requests), len(app.state.jira.issues), len(created)
+
+
+async def main(args):
+    settings.JIRA_API_URL = "http://jira.bench"
+    settings.JIRA_BULK_BATCH_SIZE = args.batch_size
+    latency = args.latency_ms / 1000
+    issues = args.epics * (1 + args.stories * (1 + args.subtasks))
+    print(f"{args.epics} epics x {args.stories} stories x {args.subtasks} subtasks = {issues} issues, "
+          f"latency {args.latency_ms} ms, rate limit {args.rate or 'off'}")
+    print(f"{'mode':<18} | {'wall s':>8} | {'requests':>8} | {'issues':>6}")
+    print("-" * 50)
+    modes = (
+        ("sequential", 1, False),
+        ("concurrent", settings.JIRA_MAX_CONCURRENCY, False),
+        ("concurrent + bulk", settings.JIRA_MAX_CONCURRENCY, True),
+    )
+    for mode, concurrency, bulk in modes:
+        forest = make_forest(args.epics, args.stories, args.subtasks)
+        wall, requests, created, _ = await run_mode(forest, latency, args.rate, concurrency, bulk)
+        print(f"{mode:<18} | {wall:>8.2f} | {requests:>8} | {created:>6}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--epics", type=int, default=15)
+    parser.add_argument("--stories", type=int, default=6)
+    parser.add_argument("--subtasks", type=int, default=4)
+    parser.add_argument("--latency-ms", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=50, help="Elements per bulk request in bulk mode")
+    parser.add_argument("--rate", type=float, default=0, help="Jira requests per second per token (0 = unlimited)")
+    asyncio.run(main(parser.parse_args()))
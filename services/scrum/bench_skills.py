@@ -0,0 +1,98 @@
+"""
+Benchmark for skill derivation from job titles.
+
+Derives skills for a synthetic organization with the previous hard-coded
+chain of `any(word in job ...)` scans and with the compiled SkillMatcher,
+checks both give the same skills, then repeats with a rule set grown to
+hundreds of keywords to show how each scales.
+
+Usage:
+    python bench_skills.py [--users N] [--extra-rules N] [--keywords-per-rule N]
+"""
+
+import argparse
+import os
+import random
+import time
+
+os.environ.setdefault("AZURE_OPENAI_API_KEY", "bench")
+os.environ.setdefault("AZURE_OPENAI_ENDPOINT", "http://openai.bench")
+os.environ.setdefault("API_VERSION", "2024-02-15-preview")
+
+from skills import SkillMatcher, load_skill_rules
+
+SENIORITY = ["", "Junior ", "Senior ", "Lead ", "Principal ", "Staff "]
+AREAS = ["Backend", "Frontend", "Mobile", "iOS", "Android", "DevOps", "Cloud", "QA", "Test Automation",
+         "Data", "ML", "Security", "Platform", "API", "UI/UX", "Infrastructure", "Analytics", "Product"]
+ROLES = ["Engineer", "Developer", "Programmer", "Architect", "Designer", "Manager", "Analyst", "Maintainer"]
+
+
+def legacy_rules_derive(job: str, rules) -> list:
+    """The previous derivation: one `any()` substring scan per rule."""
+    job = (job or "").lower()
+    skills = []
+    for rule in rules:
+        if any(word in job for word in rule["keywords"]):
+            skills.extend(rule["skills"])
+    return list(dict.fromkeys(skills))
+
+
+def make_jobs(users: int, extra_keywords: list) -> list:
+    rng = random.Random(7)
+    jobs = []
+    for _ in range(users):
+        job = f"{rng.choice(SENIORITY)}{rng.choice(AREAS)} {rng.choice(ROLES)}"
+        if extra_keywords and rng.random() < 0.3:
+            job += f" ({rng.choice(extra_keywords)})"
+        jobs.append(job)
+    return jobs
+
+
+def make_extra_rules(count: int, keywords_per_rule: int) -> list:
+    rng = random.Random(11)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return [
+        {
+            "name": f"extra{r}",
+            "keywords": ["".join(rng.choice(letters) for _ in range(rng.randint(5, 10))) for _ in range(keywords_per_rule)],
+            "skills": [f"Skill{r}"]
+        }
+        for r in range(count)
+    ]
+
+
+def timed(fn) -> tuple:
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def run(label: str, rules: list, users: int):
+    keywords = [keyword for rule in rules for keyword in rule["keywords"]]
+    jobs = make_jobs(users, keywords[-len(keywords) // 2:] if len(rules) > 9 else [])
+
+    compile_time, matcher = timed(lambda: SkillMatcher(rules))
+    legacy_time, legacy = timed(lambda: [legacy_rules_derive(job, rules) for job in jobs])
+    compiled_time, compiled = timed(lambda: matcher.derive_many(jobs))
+    assert [set(s) for s in legacy] == [set(s) for s in compiled], "compiled matcher disagrees with legacy rules"
+
+    print(f"{label:<10} | {len(rules):>5} | {len(keywords):>8} | {legacy_time * 1000:>9.1f} | "
+          f"{compiled_time * 1000:>11.1f} | {compile_time * 1000:>10.1f} | {legacy_time / compiled_time:>6.1f}x")
+
+
+def main(args):
+    base_rules = load_skill_rules()
+    print(f"{args.users} synthetic users")
+    print(f"{'rule set':<10} | {'rules':>5} | {'keywords':>8} | {'legacy ms':>9} | {'compiled ms':>11} | "
+          f"{'compile ms':>10} | {'speed':>7}")
+    print("-" * 80)
+    run("default", base_rules, args.users)
+    run("grown", base_rules + make_extra_rules(args.extra_rules, args.keywords_per_rule), args.users)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--extra-rules", type=int, default=100)
+    parser.add_argument("--keywords-per-rule", type=int, default=5)
+    main(parser.parse_args())
@@ -0,0 +1,138 @@
+"""
+Benchmark for service cold start.
+
+Starts the app under uvicorn in a fresh process, next to a fake Jira
+server, and measures how long it takes until the process has imported
+`main`, until it serves its first request and until /ready reports the
+critical dependencies up. Point --app-dir at a checkout of an older
+revision to compare before and after.
+
+Mongo defaults to an unreachable address with a short server selection
+timeout, which is what a pod sees while Mongo is still starting; pass
+--mongo-url for a real one.
+
+Usage:
+    python bench_startup.py [--runs N] [--app-dir DIR] [--mongo-url URL] [--jira-latency-ms N]
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+POLL_SECONDS = 0.01
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(url: str, timeout: float, ok=lambda response: response.status_code == 200):
+    """Seconds until `url` answers with a response satisfying `ok`, or None on timeout."""
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        try:
+            response = httpx.get(url, timeout=1)
+            if ok(response):
+                return response
+        except httpx.TransportError:
+            pass
+        time.sleep(POLL_SECONDS)
+    return None
+
+
+def service_env(args, jira_url: str) -> dict:
+    env = dict(os.environ)
+    env.setdefault("AZURE_OPENAI_API_KEY", "bench")
+    env.setdefault("AZURE_OPENAI_ENDPOINT", "http://openai.bench")
+    env.setdefault("API_VERSION", "2024-02-15-preview")
+    env["MONGO_URL"] = args.mongo_url
+    env["JIRA_API_URL"] = jira_url
+    return env
+
+
+def measure_import(args, env: dict) -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import main"], cwd=args.app_dir, env=env, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - started
+
+
+def measure_start(args, env: dict):
+    """Seconds from spawning uvicorn to the first served request and to readiness."""
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=args.app_dir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        # /stats exists in every revision, /health and /ready only in newer ones
+        if wait_for(f"{base}/stats", args.timeout) is None:
+            return None, None
+        serving = time.perf_counter() - started
+        response = wait_for(f"{base}/ready", args.timeout - serving, ok=lambda r: r.status_code in (200, 404))
+        if response is None or response.status_code == 404:
+            # Without a readiness endpoint the app is as ready as it gets once it serves
+            return serving, serving if response is not None else None
+        return serving, time.perf_counter() - started
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def fmt(seconds) -> str:
+    return "  timeout" if seconds is None else f"{seconds * 1000:8.0f}ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--app-dir", default=HERE)
+    parser.add_argument("--mongo-url", default="mongodb://127.0.0.1:9/?serverSelectionTimeoutMS=2000")
+    parser.add_argument("--jira-latency-ms", type=int, default=200)
+    parser.add_argument("--timeout", type=float, default=30)
+    args = parser.parse_args()
+
+    jira_port = free_port()
+    jira = subprocess.Popen(
+        [sys.executable, "fake_jira.py", "--port", str(jira_port), "--latency-ms", str(args.jira_latency_ms)],
+        cwd=HERE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        jira_url = f"http://127.0.0.1:{jira_port}"
+        if wait_for(f"{jira_url}/sprints", args.timeout) is None:
+            sys.exit("fake Jira did not start")
+        env = service_env(args, jira_url)
+
+        imports, serving, ready = [], [], []
+        for _ in range(args.runs):
+            imports.append(measure_import(args, env))
+            first, up = measure_start(args, env)
+            serving.append(first)
+            ready.append(up)
+    finally:
+        jira.terminate()
+        jira.wait()
+
+    def median(values):
+        values = [v for v in values if v is not None]
+        return statistics.median(values) if values else None
+
+    print(f"app: {args.app_dir}  mongo: {args.mongo_url}  runs: {args.runs}")
+    print(f"{'import main':<22}{fmt(median(imports))}")
+    print(f"{'first request served':<22}{fmt(median(serving))}")
+    print(f"{'ready':<22}{fmt(median(ready))}")
+
+
+if __name__ == "__main__":
+    main()
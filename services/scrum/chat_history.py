@@ -0,0 +1,153 @@
+import asyncio
+from typing import TYPE_CHECKING, Any, Dict, List, Set
+
+from config import settings
+from message_buffer import ChatMessageBuffer
+from mongo_client import MongoClient
+from token_budget import TokenBudget
+
+if TYPE_CHECKING:
+    from openai import AsyncAzureOpenAI
+
+FOLD_PROMPT = """
+        You maintain a running summary of a conversation between a user and a Scrum Master assistant.
+        Update the summary with the new messages below. Keep decisions, open questions, issue keys, names and numbers; drop small talk.
+        Keep the summary under {max_tokens} tokens. Write it in the language of the conversation.
+
+        Current Summary:
+        {summary}
+
+        New Messages:
+        {messages}
+        """
+
+
+class ChatHistoryManager:
+    """
+    Token-bounded chat history with a rolling summary per session.
+
+    Each chat turn gets the session's summary followed by the newest
+    messages that fit CHAT_HISTORY_TOKENS, so the prompt stays bounded
+    however long the session runs. After each reply, `schedule_fold` folds
+    the oldest unsummarized messages into the summary in the background once
+    they outgrow the budget, down to half of it, so the summary is rewritten
+    every few turns rather than on every one. Summaries live in the
+    `chat_summaries` collection with the (timestamp, _id) of the last message
+    they cover; errors are logged and never fail a chat turn. Turns still
+    queued in the write-behind `buffer` are part of the context too.
+    """
+
+    def __init__(self, mongo_client: MongoClient, client: "AsyncAzureOpenAI", token_budget: TokenBudget,
+                 history_tokens: int = None, summary_tokens: int = None, max_messages: int = None,
+                 buffer: ChatMessageBuffer = None):
+        self.mongo_client = mongo_client
+        self.buffer = buffer
+        self.client = client
+        self.token_budget = token_budget
+        self.history_tokens = history_tokens or settings.CHAT_HISTORY_TOKENS
+        self.summary_tokens = summary_tokens or settings.CHAT_SUMMARY_TOKENS
+        self.max_messages = max_messages or settings.CHAT_HISTORY_MAX_MESSAGES
+        self._folds: Dict[str, asyncio.Task] = {}
+        self._refold: Set[str] = set()
+        self.folds = 0
+
+    async def context(self, session_id: str) -> List[Dict[str, str]]:
+        """Prompt messages carrying the session's history: summary first, then recent turns."""
+        summary, messages = await self._unsummarized(session_id)
+        if self.buffer is not None:
+            stored = {message["_id"] for message in messages}
+            messages += [message for message in self.buffer.pending_for(session_id) if message["_id"] not in stored]
+        counts = await self._token_counts(messages)
+
+        kept = []
+        used = 0
+        for message, tokens in zip(reversed(messages), reversed(counts)):
+            if used + tokens > self.history_tokens:
+                break
+            kept.append({"role": message["role"], "content": message["content"]})
+            used += tokens
+        kept.reverse()
+
+        if summary and summary.get("summary"):
+            kept.insert(0, {"role": "system", "content": f"Summary of the earlier conversation:\n{summary['summary']}"})
+        return kept
+
+    def schedule_fold(self, session_id: str):
+        """Fold the session's older messages into its summary in the background."""
+        if session_id in self._folds:
+            # A fold is running; run once more after it to catch this turn
+            self._refold.add(session_id)
+            return
+        task = asyncio.create_task(self._fold_loop(session_id))
+        self._folds[session_id] = task
+        task.add_done_callback(lambda _: self._folds.pop(session_id, None))
+
+    async def _fold_loop(self, session_id: str):
+        while True:
+            try:
+                await self.fold(session_id)
+            except Exception as e:
+                print(f"Error summarizing chat history for session {session_id}: {e}")
+            if session_id not in self._refold:
+                return
+            self._refold.discard(session_id)
+
+    async def fold(self, session_id: str) -> bool:
+        """Fold the oldest unsummarized messages into the summary; returns whether it did."""
+        summary, messages = await self._unsummarized(session_id)
+        counts = await self._token_counts(messages)
+        if sum(counts) <= self.history_tokens:
+            return False
+
+        # Keep the newest messages within half the budget; fold everything older
+        keep_from = len(messages)
+        used = 0
+        while keep_from > 0 and used + counts[keep_from - 1] <= self.history_tokens // 2:
+            keep_from -= 1
+            used += counts[keep_from]
+        folded = messages[:keep_from]
+
+        transcript = "\n".join(f"{message['role']}: {message['content']}" for message in folded)
+        transcript = await self.token_budget.truncate_async(transcript, settings.SUMMARY_INPUT_TOKENS)
+        response = await self.client.chat.completions.create(
+            model=settings.AZURE_OPENAI_DEPLOYMENT_NAME,
+            messages=[
+                {"role": "system", "content": "You are a helpful assistant that summarizes conversations."},
+                {"role": "user", "content": FOLD_PROMPT.format(
+                    max_tokens=self.summary_tokens,
+                    summary=(summary or {}).get("summary") or "(none yet)",
+                    messages=transcript
+                )}
+            ]
+        )
+        text = await self.token_budget.truncate_async(response.choices[0].message.content or "", self.summary_tokens)
+        last = folded[-1]
+        await self.mongo_client.save_chat_summary(session_id, text, (last["timestamp"], last["_id"]))
+        self.folds += 1
+        print(f"Folded {len(folded)} chat message(s) of session {session_id} into its summary.")
+        return True
+
+    async def _unsummarized(self, session_id: str) -> tuple:
+        try:
+            summary = await self.mongo_client.get_chat_summary(session_id)
+        except Exception as e:
+            print(f"Error loading chat summary: {e}")
+            summary = None
+        after = (summary["through_timestamp"], summary["through_id"]) if summary else None
+        messages = await self.mongo_client.get_chat_history(session_id, limit=self.max_messages, after=after)
+        return summary, messages
+
+    async def _token_counts(self, messages: List[Dict[str, Any]]) -> List[int]:
+        if not messages:
+            return []
+        # Role and framing overhead per message, as the chat format adds it
+        return await asyncio.to_thread(lambda: [self.token_budget.count(m["content"] or "") + 4 for m in messages])
+
+    async def close(self):
+        tasks = list(self._folds.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"folds": self.folds, "folds_running": len(self._folds)}
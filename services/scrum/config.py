@@ -13,6 +13,120 @@ class Settings:
     MONGO_DB_NAME = os.getenv("MONGO_DB_NAME", "scrum_db")
     JIRA_API_URL = os.getenv("JIRA_API_URL","https://jira.azed.kz/api/jira")   
 
+    # Upload ingestion
+    UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+    UPLOAD_SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR") or None
+    MAX_UPLOAD_SIZE_PDF = int(os.getenv("MAX_UPLOAD_SIZE_PDF", str(250 * 1024 * 1024)))
+    MAX_UPLOAD_SIZE_DOCX = int(os.getenv("MAX_UPLOAD_SIZE_DOCX", str(250 * 1024 * 1024)))
+    MAX_UPLOAD_SIZE_MD = int(os.getenv("MAX_UPLOAD_SIZE_MD", str(10 * 1024 * 1024)))
+
+    # Document extraction (0 workers runs extraction in a thread instead of a process pool)
+    EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", str(os.cpu_count() or 1)))
+    PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "50"))
+
+    # Extracted document text cache (in-process LRU + capped Mongo collection)
+    DOCUMENT_CACHE_MAX_BYTES = int(os.getenv("DOCUMENT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    DOCUMENT_CACHE_MONGO_MAX_BYTES = int(os.getenv("DOCUMENT_CACHE_MONGO_MAX_BYTES", str(1024 * 1024 * 1024)))
+
+    # Token budgets for prompts
+    SUMMARIZE_THRESHOLD_TOKENS = int(os.getenv("SUMMARIZE_THRESHOLD_TOKENS", "100000"))
+    SUMMARY_INPUT_TOKENS = int(os.getenv("SUMMARY_INPUT_TOKENS", "16000"))
+    DECOMPOSE_INPUT_TOKENS = int(os.getenv("DECOMPOSE_INPUT_TOKENS", "4000"))
+    CHAT_FILE_INLINE_TOKENS = int(os.getenv("CHAT_FILE_INLINE_TOKENS", "5000"))
+    # Local copy of the cl100k_base BPE file; the Docker image fetches it at build time
+    TIKTOKEN_ENCODING_FILE = os.getenv(
+        "TIKTOKEN_ENCODING_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "cl100k_base.tiktoken")
+    )
+    # Chat history sent with each message: recent turns verbatim up to CHAT_HISTORY_TOKENS,
+    # older turns folded into a rolling summary of about CHAT_SUMMARY_TOKENS
+    CHAT_HISTORY_TOKENS = int(os.getenv("CHAT_HISTORY_TOKENS", "3000"))
+    CHAT_SUMMARY_TOKENS = int(os.getenv("CHAT_SUMMARY_TOKENS", "500"))
+    CHAT_HISTORY_MAX_MESSAGES = int(os.getenv("CHAT_HISTORY_MAX_MESSAGES", "200"))
+    # Chat messages are written behind the reply, in batches of up to CHAT_WRITE_BATCH_SIZE
+    # at most CHAT_WRITE_FLUSH_MS after they were queued
+    CHAT_WRITE_BATCH_SIZE = int(os.getenv("CHAT_WRITE_BATCH_SIZE", "100"))
+    CHAT_WRITE_FLUSH_MS = int(os.getenv("CHAT_WRITE_FLUSH_MS", "200"))
+    CHAT_WRITE_MAX_PENDING = int(os.getenv("CHAT_WRITE_MAX_PENDING", "10000"))
+    # Cached Jira issues ranked by relevance to the message and added to each chat prompt
+    CHAT_JIRA_TOP_K = int(os.getenv("CHAT_JIRA_TOP_K", "8"))
+
+    # Map-reduce summarization
+    SUMMARY_CHUNK_OVERLAP_TOKENS = int(os.getenv("SUMMARY_CHUNK_OVERLAP_TOKENS", "200"))
+    SUMMARY_CONCURRENCY = int(os.getenv("SUMMARY_CONCURRENCY", "8"))
+
+    # Section-parallel decomposition
+    DECOMPOSE_CONCURRENCY = int(os.getenv("DECOMPOSE_CONCURRENCY", "6"))
+
+    # Decomposition result cache
+    DECOMPOSITION_CACHE_TTL_SECONDS = int(os.getenv("DECOMPOSITION_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+    # Shared HTTP client for Jira, backend and rating calls
+    HTTP_MAX_CONNECTIONS_PER_HOST = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "20"))
+    HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT_SECONDS", "10"))
+    HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "3"))
+    HTTP_BACKOFF_BASE_SECONDS = float(os.getenv("HTTP_BACKOFF_BASE_SECONDS", "0.2"))
+    HTTP_BACKOFF_MAX_SECONDS = float(os.getenv("HTTP_BACKOFF_MAX_SECONDS", "5"))
+
+    # Concurrent Jira issue creation
+    JIRA_MAX_CONCURRENCY = int(os.getenv("JIRA_MAX_CONCURRENCY", "8"))
+    JIRA_RATE_LIMIT_PER_SECOND = float(os.getenv("JIRA_RATE_LIMIT_PER_SECOND", "10"))
+    JIRA_RATE_LIMIT_BURST = int(os.getenv("JIRA_RATE_LIMIT_BURST", "10"))
+    JIRA_SPRINT_CHUNK_SIZE = int(os.getenv("JIRA_SPRINT_CHUNK_SIZE", "20"))
+    # Bulk creation: up to this many tasks/subtasks per request, waiting at most
+    # JIRA_BULK_LINGER_MS for a batch to fill. Off (1) by default, as not every
+    # Jira API in front of this service has the bulk endpoints.
+    JIRA_BULK_BATCH_SIZE = int(os.getenv("JIRA_BULK_BATCH_SIZE", "1"))
+    JIRA_BULK_LINGER_MS = int(os.getenv("JIRA_BULK_LINGER_MS", "20"))
+    # How long Jira batch job journals are kept for resuming and deduplicating submissions
+    JIRA_JOB_TTL_SECONDS = int(os.getenv("JIRA_JOB_TTL_SECONDS", str(30 * 24 * 3600)))
+
+    # Background sync of changed Jira issues into the jira_cache collection
+    JIRA_SYNC_INTERVAL_SECONDS = int(os.getenv("JIRA_SYNC_INTERVAL_SECONDS", "300"))
+    # Each interval is randomized by up to this fraction either way
+    JIRA_SYNC_JITTER = float(os.getenv("JIRA_SYNC_JITTER", "0.2"))
+    JIRA_SYNC_PAGE_SIZE = int(os.getenv("JIRA_SYNC_PAGE_SIZE", "100"))
+    # Pages one run reads at most; the rest follows in the next run
+    JIRA_SYNC_MAX_PAGES = int(os.getenv("JIRA_SYNC_MAX_PAGES", "1000"))
+    # Re-read this much before the watermark, for clock skew and JQL's minute resolution
+    JIRA_SYNC_OVERLAP_SECONDS = int(os.getenv("JIRA_SYNC_OVERLAP_SECONDS", "300"))
+    # IANA timezone of the Jira API user; Jira reads JQL dates in it
+    JIRA_TIMEZONE = os.getenv("JIRA_TIMEZONE", "UTC")
+    # Without a change stream, replicas check the jira_cache version this often
+    # to pick up issues synced by others
+    JIRA_SNAPSHOT_POLL_SECONDS = int(os.getenv("JIRA_SNAPSHOT_POLL_SECONDS", "30"))
+
+    # User ratings from the git service
+    RATING_API_URL = os.getenv("RATING_API_URL", "https://git.azed.kz/api/v1")
+    RATING_CONCURRENCY = int(os.getenv("RATING_CONCURRENCY", "16"))
+    RATING_CACHE_TTL_SECONDS = int(os.getenv("RATING_CACHE_TTL_SECONDS", "600"))
+    # After the TTL, serve the cached rating this much longer while refreshing it
+    RATING_STALE_SECONDS = int(os.getenv("RATING_STALE_SECONDS", str(24 * 3600)))
+    RATING_CACHE_MAX_ENTRIES = int(os.getenv("RATING_CACHE_MAX_ENTRIES", "10000"))
+
+    # Organization info from the backend
+    ORG_CACHE_TTL_SECONDS = int(os.getenv("ORG_CACHE_TTL_SECONDS", "300"))
+    # After the TTL, serve the cached organization this much longer while revalidating it
+    ORG_CACHE_STALE_SECONDS = int(os.getenv("ORG_CACHE_STALE_SECONDS", "3600"))
+    ORG_CACHE_MAX_ENTRIES = int(os.getenv("ORG_CACHE_MAX_ENTRIES", "1000"))
+
+    # Job-title keyword rules used to derive user skills
+    SKILL_RULES_FILE = os.getenv("SKILL_RULES_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "skill_rules.json"))
+
+    # Task assignment: "best" gives every node its best-fitting user, "balanced"
+    # spreads complexity across the fitting users
+    ASSIGNMENT_MODE = os.getenv("ASSIGNMENT_MODE", "best")
+    # Most complexity points one user takes in a balanced assignment (0 = no limit)
+    ASSIGNMENT_USER_CAPACITY = int(os.getenv("ASSIGNMENT_USER_CAPACITY", "0"))
+
+    # Background jobs for the async /jobs API
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+    JOB_QUEUE_MAX_SIZE = int(os.getenv("JOB_QUEUE_MAX_SIZE", "100"))
+    JOB_RESULT_TTL_SECONDS = int(os.getenv("JOB_RESULT_TTL_SECONDS", "3600"))
+
+    # Startup warmup runs in the background; while Mongo is unreachable it is
+    # retried every STARTUP_RETRY_SECONDS and /ready reports 503
+    STARTUP_RETRY_SECONDS = float(os.getenv("STARTUP_RETRY_SECONDS", "2"))
+
 print(f"Loaded API Key: {Settings.AZURE_OPENAI_API_KEY[:5]}..." if Settings.AZURE_OPENAI_API_KEY else "API Key is None")
 
 settings = Settings()
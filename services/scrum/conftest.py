@@ -0,0 +1,230 @@
+"""
+Shared test setup for the scrum service.
+
+`config.settings` reads the Azure OpenAI variables when it is imported, so
+placeholders are set here, before pytest imports any test module. Fakes
+used by several test modules are provided as fixtures.
+"""
+
+import asyncio
+import datetime
+import os
+import types
+
+os.environ.setdefault("AZURE_OPENAI_API_KEY", "test")
+os.environ.setdefault("AZURE_OPENAI_ENDPOINT", "http://openai.test")
+os.environ.setdefault("API_VERSION", "2024-02-15-preview")
+
+import mongomock
+import pytest
+import tiktoken
+from pymongo.errors import AutoReconnect
+
+from chat_history import ChatHistoryManager
+from mongo_client import MongoClient
+from token_budget import TokenBudget
+
+HISTORY_START = datetime.datetime(2024, 5, 1)
+
+
+class FakeStream:
+    """A streamed chat completion of `chunks` deltas, one every `interval` seconds."""
+
+    def __init__(self, chunks: int, interval: float):
+        self.chunks = chunks
+        self.interval = interval
+        self.sent = 0
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.sent >= self.chunks:
+            raise StopAsyncIteration
+        self.sent += 1
+        await asyncio.sleep(self.interval)
+        delta = types.SimpleNamespace(content=f"token{self.sent} ")
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(delta=delta)])
+
+
+class FakeCompletions:
+    """`client.chat.completions` answering every request with a FakeStream."""
+
+    chunks = 40
+    interval = 0.005
+
+    async def create(self, **kwargs):
+        return FakeStream(self.chunks, self.interval)
+
+
+class FakeMongo:
+    """The MongoClient calls a chat turn makes, with an empty history and one cached issue."""
+
+    async def get_chat_history(self, session_id, limit=50, after=None):
+        return []
+
+    async def get_chat_summary(self, session_id):
+        return None
+
+    async def load_cached_issues(self, synced_since=None):
+        return [{"key": "SCRUM-1", "summary": "Existing issue", "status": "To Do"}]
+
+    async def get_jira_cache_version(self):
+        return 0
+
+    async def save_messages(self, messages):
+        pass
+
+
+class FakeHistoryMongo:
+    """
+    Chat messages and summaries in memory, with the MongoClient query semantics.
+
+    Records the size of each `save_messages` batch, and fails the next
+    `failures` of them.
+    """
+
+    def __init__(self):
+        self.messages = []
+        self.summaries = {}
+        self.batches = []
+        self.failures = 0
+
+    def add(self, session_id, role, content):
+        # Two messages share each timestamp, like inserts within one millisecond
+        self.messages.append({"_id": len(self.messages), "session_id": session_id, "role": role, "content": content,
+                              "timestamp": HISTORY_START + datetime.timedelta(milliseconds=len(self.messages) // 2)})
+
+    async def get_chat_history(self, session_id, limit=50, after=None):
+        history = [m for m in self.messages if m["session_id"] == session_id
+                   and (after is None or (m["timestamp"], m["_id"]) > after)]
+        return history[-limit:]
+
+    async def get_chat_summary(self, session_id):
+        return self.summaries.get(session_id)
+
+    async def save_chat_summary(self, session_id, summary, through):
+        self.summaries[session_id] = {"summary": summary, "through_timestamp": through[0], "through_id": through[1]}
+
+    async def save_messages(self, messages):
+        await asyncio.sleep(0.005)
+        if self.failures:
+            self.failures -= 1
+            raise AutoReconnect("mongo went away")
+        self.batches.append(len(messages))
+        self.messages.extend(messages)
+
+
+class SummaryCompletions:
+    """Answers summary requests with a fixed short summary, recording the prompts."""
+
+    def __init__(self):
+        self.prompts = []
+
+    async def create(self, **kwargs):
+        self.prompts.append(kwargs["messages"][-1]["content"])
+        message = types.SimpleNamespace(content=f"summary #{len(self.prompts)}")
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)])
+
+
+class AsyncCollection:
+    """Awaitable facade over a mongomock collection, standing in for motor."""
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    def __getattr__(self, name):
+        method = getattr(self._collection, name)
+
+        async def call(*args, **kwargs):
+            return method(*args, **kwargs)
+
+        return call
+
+
+class AsyncDatabase:
+    """Awaitable facade over a mongomock database."""
+
+    def __init__(self, db):
+        self._db = db
+
+    def __getitem__(self, name):
+        return AsyncCollection(self._db[name])
+
+
+def byte_token_budget() -> TokenBudget:
+    """TokenBudget over a byte-level encoding, so tests need no downloaded BPE file."""
+    encoding = tiktoken.Encoding(
+        name="test-bytes",
+        pat_str=r"\S+|\s+",
+        mergeable_ranks={bytes([i]): i for i in range(256)},
+        special_tokens={}
+    )
+    return TokenBudget(encoding=encoding)
+
+
+@pytest.fixture
+def token_budget() -> TokenBudget:
+    """Byte-level TokenBudget: each UTF-8 byte is one token."""
+    return byte_token_budget()
+
+
+@pytest.fixture
+def fake_completions() -> FakeCompletions:
+    return FakeCompletions()
+
+
+@pytest.fixture
+def fake_mongo() -> FakeMongo:
+    return FakeMongo()
+
+
+@pytest.fixture
+def history_mongo() -> FakeHistoryMongo:
+    return FakeHistoryMongo()
+
+
+@pytest.fixture
+def make_manager(token_budget):
+    """Factory of ChatHistoryManager over a Mongo fake; returns (manager, SummaryCompletions)."""
+    def make(mongo, history_tokens=200):
+        completions = SummaryCompletions()
+        client = types.SimpleNamespace(chat=types.SimpleNamespace(completions=completions))
+        manager = ChatHistoryManager(mongo, client, token_budget, history_tokens=history_tokens, summary_tokens=50)
+        return manager, completions
+
+    return make
+
+
+@pytest.fixture
+def make_batch():
+    """Factory of decomposition forests of Epics, Stories and Subtasks."""
+    def make(epics: int = 3, stories: int = 2, subtasks: int = 2):
+        return [
+            {
+                "summary": f"Epic {e}",
+                "type": "Epic",
+                "stories": [
+                    {
+                        "summary": f"Story {e}.{s}",
+                        "type": "Story",
+                        "subtasks": [{"summary": f"Subtask {e}.{s}.{t}", "type": "Subtask"} for t in range(subtasks)]
+                    }
+                    for s in range(stories)
+                ]
+            }
+            for e in range(epics)
+        ]
+
+    return make
+
+
+@pytest.fixture
+def mongomock_client() -> MongoClient:
+    """MongoClient over an in-memory mongomock database (no capped collections or change streams)."""
+    client = MongoClient.__new__(MongoClient)
+    client.db = AsyncDatabase(mongomock.MongoClient().db)
+    for name in ("chat_history", "chat_summaries", "jira_cache", "document_text",
+                 "decompositions", "jira_jobs", "sync_state"):
+        setattr(client, name, client.db[name])
+    return client
@@ -0,0 +1,67 @@
+import hashlib
+from typing import Any, Dict, List, Optional
+
+from config import settings
+from mongo_client import MongoClient
+
+# Bump whenever the decomposition prompt or post-processing changes so
+# results produced by the old prompt are not served.
+DECOMPOSE_PROMPT_VERSION = "3"
+
+
+def decomposition_cache_key(text: str) -> str:
+    """Cache key for a document: content hash, prompt version and model deployment."""
+    digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    return f"{digest}:{DECOMPOSE_PROMPT_VERSION}:{settings.AZURE_OPENAI_DEPLOYMENT_NAME}"
+
+
+class DecompositionCache:
+    """
+    Mongo-backed cache of parsed decomposition forests.
+
+    Entries live in the `decompositions` collection and expire after
+    DECOMPOSITION_CACHE_TTL_SECONDS via a TTL index. Mongo errors are logged
+    and treated as misses so a cache outage only costs an LLM call.
+    """
+
+    def __init__(self, mongo_client: MongoClient, ttl_seconds: int = None):
+        self.mongo_client = mongo_client
+        self.ttl_seconds = ttl_seconds or settings.DECOMPOSITION_CACHE_TTL_SECONDS
+        self._indexes_ready = False
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+    async def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        try:
+            tasks = await self.mongo_client.get_decomposition(key)
+        except Exception as e:
+            print(f"Error reading decomposition cache: {e}")
+            tasks = None
+
+        if tasks is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return tasks
+
+    def record_bypass(self):
+        """Count a lookup skipped because the caller asked for a fresh result."""
+        self.bypassed += 1
+
+    async def put(self, key: str, tasks: List[Dict[str, Any]]):
+        try:
+            if not self._indexes_ready:
+                await self.mongo_client.ensure_decomposition_indexes()
+                self._indexes_ready = True
+            await self.mongo_client.save_decomposition(key, tasks, self.ttl_seconds)
+        except Exception as e:
+            print(f"Error writing decomposition cache: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "ttl_seconds": self.ttl_seconds,
+        }
@@ -0,0 +1,99 @@
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from config import settings
+from extraction import PARSER_VERSION
+from ingestion import SpooledDocument
+from mongo_client import MongoClient
+
+# Largest text persisted to Mongo; stays under the 16 MB BSON document limit.
+MAX_STORED_TEXT_BYTES = 15 * 1024 * 1024
+
+
+def document_cache_key(document: SpooledDocument) -> str:
+    """Content address of a document's extracted text."""
+    return f"{document.sha256}:{document.extension}:{PARSER_VERSION}"
+
+
+class DocumentTextCache:
+    """
+    Content-addressed cache of extracted document text.
+
+    Lookups go to an in-process LRU bounded by DOCUMENT_CACHE_MAX_BYTES first,
+    then to the capped `document_text` collection in Mongo, which evicts the
+    oldest entries once it reaches DOCUMENT_CACHE_MONGO_MAX_BYTES. Mongo
+    errors are logged and treated as misses so the cache never fails a request.
+    """
+
+    def __init__(self, mongo_client: MongoClient, max_bytes: int = None):
+        self.mongo_client = mongo_client
+        self.max_bytes = max_bytes or settings.DOCUMENT_CACHE_MAX_BYTES
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._size = 0
+        self._collection_ready = False
+        self.memory_hits = 0
+        self.mongo_hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Optional[str]:
+        text = self._entries.get(key)
+        if text is not None:
+            self._entries.move_to_end(key)
+            self.memory_hits += 1
+            return text
+
+        try:
+            text = await self.mongo_client.get_document_text(key)
+        except Exception as e:
+            print(f"Error reading document cache: {e}")
+            text = None
+
+        if text is None:
+            self.misses += 1
+            return None
+
+        self.mongo_hits += 1
+        self._remember(key, text)
+        return text
+
+    async def put(self, key: str, text: str):
+        size = self._remember(key, text)
+        if size > MAX_STORED_TEXT_BYTES:
+            return
+
+        try:
+            if not self._collection_ready:
+                await self.mongo_client.ensure_document_text_collection(settings.DOCUMENT_CACHE_MONGO_MAX_BYTES)
+                self._collection_ready = True
+            await self.mongo_client.save_document_text(key, text)
+        except Exception as e:
+            print(f"Error writing document cache: {e}")
+
+    def _remember(self, key: str, text: str) -> int:
+        size = len(text.encode('utf-8'))
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return size
+        if size > self.max_bytes:
+            return size
+
+        self._entries[key] = text
+        self._sizes[key] = size
+        self._size += size
+        while self._size > self.max_bytes:
+            evicted, _ = self._entries.popitem(last=False)
+            self._size -= self._sizes.pop(evicted)
+        return size
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.memory_hits + self.mongo_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "mongo_hits": self.mongo_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.mongo_hits) / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+            "bytes": self._size,
+            "max_bytes": self.max_bytes,
+        }
@@ -0,0 +1,134 @@
+import asyncio
+import multiprocessing
+import re
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from config import settings
+from ingestion import SpooledDocument
+
+
+# Bump whenever extraction output changes so cached text is not reused.
+PARSER_VERSION = "2"
+
+# docx paragraph styles rendered as markdown headings ("Title" is level 1).
+DOCX_HEADING_RE = re.compile(r"^Heading (\d)$")
+
+
+# Worker functions run in the extraction process pool, so they only take
+# picklable arguments (the spooled file path) and import parsers locally.
+# Document structure (docx heading styles, the PDF outline) is rendered as
+# markdown headings so the text can later be split into sections.
+
+def _docx_paragraph_text(para) -> str:
+    style = para.style.name if para.style is not None else ""
+    match = DOCX_HEADING_RE.match(style)
+    if match and para.text.strip():
+        return f"{'#' * min(int(match.group(1)), 6)} {para.text.strip()}"
+    if style == "Title" and para.text.strip():
+        return f"# {para.text.strip()}"
+    return para.text
+
+
+def extract_docx(path: str) -> str:
+    import docx
+
+    doc = docx.Document(path)
+    return "\n".join([_docx_paragraph_text(para) for para in doc.paragraphs])
+
+
+def _pdf_outline_headings(pdf_reader, outline, level: int, headings: Dict[int, List[str]]):
+    for entry in outline:
+        if isinstance(entry, list):
+            _pdf_outline_headings(pdf_reader, entry, level + 1, headings)
+            continue
+        page = pdf_reader.get_destination_page_number(entry)
+        title = str(entry.title or "").strip()
+        if page is not None and page >= 0 and title:
+            headings.setdefault(page, []).append(f"{'#' * min(level, 6)} {title}")
+
+
+def read_pdf_structure(path: str) -> Tuple[int, Dict[int, List[str]]]:
+    """Page count and the outline headings that start on each page."""
+    import pypdf
+
+    pdf_reader = pypdf.PdfReader(path)
+    headings: Dict[int, List[str]] = {}
+    try:
+        _pdf_outline_headings(pdf_reader, pdf_reader.outline, 1, headings)
+    except Exception as e:
+        print(f"Error reading PDF outline: {e}")
+    return len(pdf_reader.pages), headings
+
+
+def extract_pdf_pages(path: str, start: int, stop: int) -> List[str]:
+    import pypdf
+
+    pdf_reader = pypdf.PdfReader(path)
+    return [pdf_reader.pages[i].extract_text() for i in range(start, stop)]
+
+
+def extract_md(path: str) -> str:
+    with open(path, "rb") as stream:
+        return stream.read().decode('utf-8')
+
+
+class DocumentExtractor:
+    """
+    Extracts text from spooled documents off the event loop.
+
+    docx and pdf parsing runs in a process pool of EXTRACTION_WORKERS
+    processes. PDFs longer than PDF_PAGES_PER_TASK pages are split into page
+    ranges that are extracted in parallel and joined in page order. With
+    EXTRACTION_WORKERS=0 extraction runs in a worker thread instead.
+    """
+
+    def __init__(self, max_workers: int = None, pages_per_task: int = None):
+        self.max_workers = settings.EXTRACTION_WORKERS if max_workers is None else max_workers
+        self.pages_per_task = pages_per_task or settings.PDF_PAGES_PER_TASK
+        self._executor: Optional[Executor] = None
+
+    def _get_executor(self) -> Optional[Executor]:
+        if self.max_workers <= 0:
+            return None
+        if self._executor is None:
+            # spawn rather than fork: the parent runs an event loop and driver threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def _run(self, func, *args):
+        executor = self._get_executor()
+        if executor is None:
+            return await asyncio.to_thread(func, *args)
+        return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+
+    async def extract(self, document: SpooledDocument) -> str:
+        if document.extension == 'docx':
+            return await self._run(extract_docx, document.path)
+        elif document.extension == 'pdf':
+            return await self._extract_pdf(document.path)
+        elif document.extension == 'md':
+            return await asyncio.to_thread(extract_md, document.path)
+        else:
+            raise ValueError(f"Unsupported file type: {document.extension}")
+
+    async def _extract_pdf(self, path: str) -> str:
+        page_count, headings = await self._run(read_pdf_structure, path)
+        ranges = [
+            (start, min(start + self.pages_per_task, page_count))
+            for start in range(0, page_count, self.pages_per_task)
+        ]
+        chunks = await asyncio.gather(*[self._run(extract_pdf_pages, path, start, stop) for start, stop in ranges])
+        pages = [page for chunk in chunks for page in chunk]
+        return "".join(
+            "".join(heading + "\n" for heading in headings.get(number, [])) + page + "\n"
+            for number, page in enumerate(pages)
+        )
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
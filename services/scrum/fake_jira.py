@@ -0,0 +1,186 @@
+"""
+In-memory stand-in for the Jira API used by the scrum service.
+
+Serves the endpoints under JIRA_API_URL that the service calls, including
+bulk creation, with configurable latency and failures. Use it in tests and
+benchmarks through `httpx.ASGITransport(app=create_fake_jira())`, or run it
+as a server and point JIRA_API_URL at it:
+
+    python fake_jira.py --port 8090 --latency-ms 100
+"""
+
+import argparse
+import asyncio
+import re
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from fastapi import Body, FastAPI, HTTPException, Request, Response
+
+# Jira rejects bulk requests with more elements than this
+MAX_BULK_ELEMENTS = 50
+
+
+class FakeJiraState:
+    """Issues, sprints and a request log shared by the fake's handlers."""
+
+    def __init__(self, latency: float = 0.0, fail_summaries: Iterable[str] = (),
+                 flaky_summaries: Iterable[str] = ()):
+        self.latency = latency
+        self.fail_summaries = set(fail_summaries)
+        self.flaky_summaries = set(flaky_summaries)
+        self.issues: Dict[str, Dict[str, Any]] = {}
+        self.sprints = [{"id": 1, "state": "active", "name": "Sprint 1"}]
+        self.sprint_issues: Dict[int, List[str]] = {1: []}
+        self.requests: List[tuple] = []
+        # Like Jira, JQL date literals are read in the API user's timezone
+        self.timezone = timezone.utc
+
+    def create(self, issue_type: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        summary = payload.get("summary")
+        if not summary:
+            raise ValueError("summary is required")
+        if summary in self.fail_summaries:
+            raise ValueError(f"Jira rejected '{summary}'")
+        if summary in self.flaky_summaries:
+            # Fails once, then succeeds
+            self.flaky_summaries.discard(summary)
+            raise ValueError(f"Jira temporarily rejected '{summary}'")
+        parent_key = payload.get("parentKey")
+        if issue_type == "Subtask" and parent_key not in self.issues:
+            raise ValueError(f"Parent issue {parent_key} does not exist")
+
+        number = len(self.issues) + 1
+        key = f"SCRUM-{number}"
+        self.issues[key] = {
+            "id": str(10000 + number),
+            "key": key,
+            "fields": {
+                "summary": summary,
+                "issuetype": {"name": issue_type},
+                "status": {"name": "To Do"},
+                "assignee": {"displayName": payload["assigneeEmail"]} if payload.get("assigneeEmail") else None,
+                "duedate": payload.get("dueDate"),
+                "parent": {"key": parent_key} if parent_key else None,
+                "updated": datetime.now(timezone.utc).isoformat(),
+            },
+        }
+        return {"id": self.issues[key]["id"], "key": key, "self": f"https://jira.fake/rest/api/2/issue/{key}"}
+
+    def touch(self, key: str, **fields: Any):
+        """Change fields of an issue and bump its `updated` time, as an edit in Jira would."""
+        issue_fields = self.issues[key]["fields"]
+        issue_fields.update(fields)
+        issue_fields["updated"] = datetime.now(timezone.utc).isoformat()
+
+    def search(self, jql: Optional[str], start_at: int, max_results: int) -> List[Dict[str, Any]]:
+        """Issues matching the `updated >= "yyyy/MM/dd HH:mm"` clause of `jql`, oldest update first."""
+        issues = sorted(self.issues.values(), key=lambda issue: (issue["fields"]["updated"], issue["key"]))
+        match = re.search(r'updated\s*>=\s*"([^"]+)"', jql or "")
+        if match:
+            since = datetime.strptime(match.group(1), "%Y/%m/%d %H:%M").replace(tzinfo=self.timezone)
+            issues = [issue for issue in issues if datetime.fromisoformat(issue["fields"]["updated"]) >= since]
+        return issues[start_at:start_at + max_results]
+
+    def create_bulk(self, issue_type: str, issue_updates: List[Dict[str, Any]]) -> Dict[str, Any]:
+        if len(issue_updates) > MAX_BULK_ELEMENTS:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_ELEMENTS} issues per request")
+        issues, errors = [], []
+        for index, payload in enumerate(issue_updates):
+            try:
+                issues.append(self.create(issue_type, payload))
+            except ValueError as e:
+                errors.append({
+                    "status": 400,
+                    "elementErrors": {"errorMessages": [str(e)], "errors": {}},
+                    "failedElementNumber": index,
+                })
+        return {"issues": issues, "errors": errors}
+
+
+def create_fake_jira(latency: float = 0.0, fail_summaries: Iterable[str] = (),
+                     flaky_summaries: Iterable[str] = (), bulk: bool = True) -> FastAPI:
+    """
+    Build a fake Jira app.
+
+    Args:
+        latency: Seconds every request waits before it is handled
+        fail_summaries: Summaries that are always rejected
+        flaky_summaries: Summaries that are rejected the first time only
+        bulk: Whether the bulk-create endpoints exist
+
+    Returns:
+        FastAPI app; its FakeJiraState is available as `app.state.jira`
+    """
+    app = FastAPI(title="Fake Jira")
+    state = FakeJiraState(latency, fail_summaries, flaky_summaries)
+    app.state.jira = state
+
+    @app.middleware("http")
+    async def simulate_latency(request: Request, call_next):
+        state.requests.append((request.method, request.url.path))
+        if state.latency:
+            await asyncio.sleep(state.latency)
+        return await call_next(request)
+
+    def create_or_400(issue_type: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            return state.create(issue_type, payload)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    @app.post("/epics")
+    async def create_epic(payload: Dict[str, Any] = Body(...)):
+        return create_or_400("Epic", payload)
+
+    @app.post("/issues")
+    async def create_issue(payload: Dict[str, Any] = Body(...)):
+        return create_or_400("Task", payload)
+
+    @app.post("/subtasks")
+    async def create_subtask(payload: Dict[str, Any] = Body(...)):
+        return create_or_400("Subtask", payload)
+
+    if bulk:
+        @app.post("/issues/bulk")
+        async def create_issues_bulk(payload: Dict[str, Any] = Body(...)):
+            return state.create_bulk("Task", payload.get("issueUpdates") or [])
+
+        @app.post("/subtasks/bulk")
+        async def create_subtasks_bulk(payload: Dict[str, Any] = Body(...)):
+            return state.create_bulk("Subtask", payload.get("issueUpdates") or [])
+
+    @app.get("/issues")
+    async def list_issues(limit: int = 50, sort: Optional[str] = None, jql: Optional[str] = None,
+                          startAt: int = 0, maxResults: Optional[int] = None):
+        if jql is None and not startAt and maxResults is None:
+            return {"issues": list(state.issues.values())[:limit]}
+        page = state.search(jql, startAt, maxResults or limit)
+        return {"startAt": startAt, "maxResults": maxResults or limit, "issues": page}
+
+    @app.get("/sprints")
+    async def list_sprints():
+        return {"sprints": state.sprints}
+
+    @app.post("/sprints/{sprint_id}/issues", status_code=204)
+    async def move_to_sprint(sprint_id: int, payload: Dict[str, Any] = Body(...)):
+        if sprint_id not in state.sprint_issues:
+            raise HTTPException(status_code=404, detail=f"Sprint {sprint_id} does not exist")
+        unknown = [key for key in payload.get("issueKeys") or [] if key not in state.issues]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown issues: {unknown}")
+        state.sprint_issues[sprint_id].extend(payload.get("issueKeys") or [])
+        return Response(status_code=204)
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run the fake Jira API")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency-ms", type=int, default=0)
+    parser.add_argument("--no-bulk", action="store_true", help="Serve without the bulk-create endpoints")
+    args = parser.parse_args()
+    uvicorn.run(create_fake_jira(latency=args.latency_ms / 1000, bulk=not args.no_bulk), port=args.port)
@@ -0,0 +1,96 @@
+import asyncio
+import random
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from config import settings
+
+# Responses worth retrying. Only 429 is retried for non-idempotent requests,
+# since the server did not process them; a 5xx POST may already have created an issue.
+RETRY_STATUSES = {429, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+# Transport errors raised before the request reached the server.
+CONNECT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class HttpClientPool:
+    """
+    Shared async HTTP clients for the upstream APIs (Jira, backend, rating).
+
+    One keep-alive `httpx.AsyncClient` is kept per upstream origin, each
+    limited to HTTP_MAX_CONNECTIONS_PER_HOST connections. Requests time out
+    after HTTP_TIMEOUT_SECONDS and transient failures are retried up to
+    HTTP_RETRIES times with full-jitter exponential backoff. Call `aclose()`
+    on shutdown to close the pooled connections.
+    """
+
+    def __init__(self, max_connections_per_host: int = None, timeout: float = None, retries: int = None,
+                 backoff_base: float = None, backoff_max: float = None,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.max_connections_per_host = max_connections_per_host or settings.HTTP_MAX_CONNECTIONS_PER_HOST
+        self.timeout = timeout or settings.HTTP_TIMEOUT_SECONDS
+        self.retries = settings.HTTP_RETRIES if retries is None else retries
+        self.backoff_base = settings.HTTP_BACKOFF_BASE_SECONDS if backoff_base is None else backoff_base
+        self.backoff_max = settings.HTTP_BACKOFF_MAX_SECONDS if backoff_max is None else backoff_max
+        self._transport = transport
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def _client_for(self, url: str) -> httpx.AsyncClient:
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        client = self._clients.get(origin)
+        if client is None:
+            client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections_per_host,
+                    max_keepalive_connections=self.max_connections_per_host
+                ),
+                timeout=self.timeout,
+                follow_redirects=True,
+                transport=self._transport
+            )
+            self._clients[origin] = client
+        return client
+
+    def _backoff(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        method = method.upper()
+        idempotent = method in IDEMPOTENT_METHODS
+        client = self._client_for(url)
+
+        attempt = 0
+        while True:
+            response = None
+            try:
+                response = await client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                if attempt >= self.retries or not (idempotent or isinstance(e, CONNECT_ERRORS)):
+                    raise
+                print(f"Retrying {method} {url} after error: {e}")
+            else:
+                retryable = response.status_code in RETRY_STATUSES and (idempotent or response.status_code == 429)
+                if attempt >= self.retries or not retryable:
+                    return response
+                print(f"Retrying {method} {url} after status {response.status_code}")
+                await response.aclose()
+
+            await asyncio.sleep(self._backoff(attempt, response))
+            attempt += 1
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def aclose(self):
+        clients, self._clients = list(self._clients.values()), {}
+        await asyncio.gather(*[client.aclose() for client in clients], return_exceptions=True)
@@ -0,0 +1,118 @@
+import hashlib
+import os
+import tempfile
+from typing import Any, BinaryIO, Dict
+
+from fastapi import UploadFile
+
+from config import settings
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds the size limit for its format."""
+
+
+# Maximum accepted upload size in bytes, per supported extension.
+SIZE_LIMITS: Dict[str, int] = {
+    "pdf": settings.MAX_UPLOAD_SIZE_PDF,
+    "docx": settings.MAX_UPLOAD_SIZE_DOCX,
+    "md": settings.MAX_UPLOAD_SIZE_MD,
+}
+
+
+class SpooledDocument:
+    """An uploaded document spooled to a temporary file on disk.
+
+    Extractors read from the file instead of an in-memory copy of the upload,
+    so memory use does not grow with the size of the document. The temporary
+    file is removed by `close()` (or when used as a context manager).
+    """
+
+    def __init__(self, filename: str, extension: str, path: str, size: int, sha256: str = None):
+        self.filename = filename
+        self.extension = extension
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Constructor arguments, for handing the spooled file to a background job."""
+        return {
+            "filename": self.filename,
+            "extension": self.extension,
+            "path": self.path,
+            "size": self.size,
+            "sha256": self.sha256,
+        }
+
+    def open(self) -> BinaryIO:
+        return open(self.path, "rb")
+
+    def close(self):
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self) -> "SpooledDocument":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def get_extension(filename: str) -> str:
+    return filename.split('.')[-1].lower() if filename else ""
+
+
+def _too_large(filename: str, extension: str, limit: int) -> UploadTooLargeError:
+    return UploadTooLargeError(
+        f"File {filename} exceeds the {limit // (1024 * 1024)} MB limit for .{extension} uploads"
+    )
+
+
+async def spool_upload(file: UploadFile, chunk_size: int = None) -> SpooledDocument:
+    """
+    Copy an upload to a temporary file in bounded chunks.
+
+    The extension and, when the client sent it, the declared size are checked
+    before any data is read. The size limit is enforced again while copying,
+    so an oversized upload is rejected as soon as it crosses the limit.
+
+    Args:
+        file: The uploaded file
+        chunk_size: Number of bytes read per chunk (defaults to UPLOAD_CHUNK_SIZE)
+
+    Returns:
+        SpooledDocument pointing at the temporary copy, with the SHA-256 of
+        its content; the caller must close it
+    """
+    chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE
+    filename = file.filename or ""
+    extension = get_extension(filename)
+
+    limit = SIZE_LIMITS.get(extension)
+    if limit is None:
+        raise ValueError(f"Unsupported file type: {extension}")
+    if file.size is not None and file.size > limit:
+        raise _too_large(filename, extension, limit)
+
+    fd, path = tempfile.mkstemp(prefix="scrum-upload-", suffix=f".{extension}", dir=settings.UPLOAD_SPOOL_DIR)
+    size = 0
+    digest = hashlib.sha256()
+    try:
+        with os.fdopen(fd, "wb") as spool:
+            while True:
+                chunk = await file.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > limit:
+                    raise _too_large(filename, extension, limit)
+                digest.update(chunk)
+                spool.write(chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+
+    return SpooledDocument(filename, extension, path, size, digest.hexdigest())
@@ -0,0 +1,107 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from config import settings
+
+KINDS = ("issues", "subtasks")
+
+# (request body, single-create fallback, caller's future)
+PendingCreate = Tuple[Dict[str, Any], Callable[[], Awaitable[Dict[str, Any]]], asyncio.Future]
+
+
+class BulkIssueWriter:
+    """
+    Coalesces concurrent Task and Subtask creates into bulk-create requests.
+
+    Creates of the same kind that arrive within JIRA_BULK_LINGER_MS of each
+    other are sent as one request of up to JIRA_BULK_BATCH_SIZE elements,
+    and each caller gets back its own element of the response. Elements that
+    Jira rejects are retried with a single create. If the Jira API has no
+    bulk endpoint, every create goes through the single-create path.
+
+    `call` runs one Jira request under the caller's concurrency and rate
+    limits, so a bulk request costs the same as a single create.
+    """
+
+    def __init__(self, service, token: str, call: Callable[[Callable[[], Awaitable[Any]]], Awaitable[Any]],
+                 batch_size: int = None, linger_ms: int = None):
+        self.service = service
+        self.token = token
+        self.call = call
+        self.batch_size = batch_size or settings.JIRA_BULK_BATCH_SIZE
+        linger_ms = settings.JIRA_BULK_LINGER_MS if linger_ms is None else linger_ms
+        self.linger = linger_ms / 1000
+        self._pending: Dict[str, List[PendingCreate]] = {kind: [] for kind in KINDS}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._sending = set()
+
+    async def create_task(self, summary: str, assignee_email: str = None, due_date: str = None) -> Dict[str, Any]:
+        payload = self.service.task_payload(summary, assignee_email=assignee_email, due_date=due_date)
+        return await self._submit("issues", payload, lambda: self.service.create_task(
+            summary, assignee_email=assignee_email, due_date=due_date, token=self.token
+        ))
+
+    async def create_subtask(self, summary: str, parent_key: str) -> Dict[str, Any]:
+        payload = {"summary": summary, "parentKey": parent_key}
+        return await self._submit("subtasks", payload, lambda: self.service.create_subtask(
+            summary, parent_key=parent_key, token=self.token
+        ))
+
+    async def _submit(self, kind: str, payload: Dict[str, Any],
+                      single: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        if self.batch_size <= 1 or not self.service.jira_bulk_supported:
+            return await self.call(single)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending[kind]
+        pending.append((payload, single, future))
+        if len(pending) >= self.batch_size:
+            self._flush(kind)
+        elif kind not in self._timers:
+            self._timers[kind] = loop.call_later(self.linger, self._flush, kind)
+        return await future
+
+    def _flush(self, kind: str):
+        timer = self._timers.pop(kind, None)
+        if timer is not None:
+            timer.cancel()
+        batch, self._pending[kind] = self._pending[kind], []
+        batch = [entry for entry in batch if not entry[2].done()]
+        if batch:
+            task = asyncio.create_task(self._send(kind, batch))
+            self._sending.add(task)
+            task.add_done_callback(self._sending.discard)
+
+    async def _send(self, kind: str, batch: List[PendingCreate]):
+        try:
+            results = await self.call(
+                lambda: self.service.create_issues_bulk(kind, [payload for payload, _, _ in batch], self.token)
+            )
+        except Exception as e:
+            # The request may have been processed, so do not fall back to single
+            # creates that could duplicate issues
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        if results is None:
+            results = [None] * len(batch)
+        fallbacks = []
+        for (_, single, future), result in zip(batch, results):
+            if result is None:
+                fallbacks.append(self._fallback(single, future))
+            elif not future.done():
+                future.set_result(result)
+        await asyncio.gather(*fallbacks)
+
+    async def _fallback(self, single: Callable[[], Awaitable[Dict[str, Any]]], future: asyncio.Future):
+        try:
+            result = await self.call(single)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        else:
+            if not future.done():
+                future.set_result(result)
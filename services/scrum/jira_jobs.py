@@ -0,0 +1,146 @@
+import asyncio
+import copy
+import hashlib
+import re
+import weakref
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, List, Optional
+
+from config import settings
+from mongo_client import MongoClient
+
+
+def jira_job_key(content: str, scope: str) -> str:
+    """
+    Job key for creating `content` in one Jira workspace.
+
+    `scope` identifies the workspace (organization id, or the token when
+    there is none) and is hashed so tokens are never stored.
+    """
+    content_digest = hashlib.sha256(content.encode('utf-8')).hexdigest()
+    scope_digest = hashlib.sha256(scope.encode('utf-8')).hexdigest()[:16]
+    return f"{content_digest}:{scope_digest}"
+
+
+def organization_scope(organization: Dict[str, Any], token: str) -> str:
+    """Workspace identifier for job keys: the organization id when the backend provides one."""
+    org = organization.get("organization") if isinstance(organization.get("organization"), Mapping) else organization
+    org_id = org.get("id") or org.get("_id")
+    return f"org:{org_id}" if org_id else f"token:{token}"
+
+
+def normalize_summary(node: Dict[str, Any]) -> str:
+    return re.sub(r"\s+", " ", str(node.get("summary", ""))).strip().lower()
+
+
+def node_id(parent_id: str, kind: str, summary: str, occurrence: int) -> str:
+    """
+    Journal id of a node.
+
+    Ids are derived from the chain of normalized summaries rather than list
+    positions, so a re-run whose decomposition lists items in another order
+    still finds the issues created for them. Repeated summaries among
+    siblings are told apart by their occurrence number.
+    """
+    path = f"{parent_id}/{kind}:{summary}#{occurrence}"
+    return hashlib.sha1(path.encode('utf-8')).hexdigest()
+
+
+def child_node_ids(parent_id: str, kind: str, nodes: Iterable[Dict[str, Any]]) -> List[str]:
+    """Journal ids for a list of sibling nodes."""
+    seen: Dict[str, int] = {}
+    ids = []
+    for node in nodes:
+        summary = normalize_summary(node)
+        seen[summary] = seen.get(summary, 0) + 1
+        ids.append(node_id(parent_id, kind, summary, seen[summary]))
+    return ids
+
+
+class JiraJobJournal:
+    """
+    Progress of one Jira batch job, persisted in the `jira_jobs` collection.
+
+    Records the decomposed forest, the Jira issue created for every node and
+    the keys already moved to the sprint. A re-run with the same job key
+    reuses all of it and only makes the calls that are still missing. Mongo
+    errors are logged and do not stop the batch.
+    """
+
+    def __init__(self, mongo_client: MongoClient, key: str, doc: Dict[str, Any], ttl_seconds: int):
+        self.mongo_client = mongo_client
+        self.key = key
+        self.ttl_seconds = ttl_seconds
+        self.status = doc.get("status", "running")
+        self.tasks: Optional[List[Dict[str, Any]]] = doc.get("tasks")
+        self.decomposed = bool(doc.get("decomposed"))
+        self.nodes: Dict[str, Dict[str, Any]] = doc.get("nodes") or {}
+        self.sprint_keys = set(doc.get("sprint_keys") or [])
+
+    def created(self, node_id: str) -> Optional[Dict[str, Any]]:
+        """The Jira issue already created for a node, if any."""
+        return self.nodes.get(node_id)
+
+    async def record(self, node_id: str, issue: Dict[str, Any]):
+        entry = {"id": issue.get("id"), "key": issue.get("key"), "self": issue.get("self")}
+        self.nodes[node_id] = entry
+        await self._write(self.mongo_client.record_jira_job_node(self.key, node_id, entry))
+
+    async def record_sprint_keys(self, issue_keys: List[str]):
+        self.sprint_keys.update(issue_keys)
+        await self._write(self.mongo_client.record_jira_job_sprint_keys(self.key, issue_keys))
+
+    async def save_tasks(self, tasks: List[Dict[str, Any]]):
+        """Persist the complete decomposed and assigned forest so re-runs skip the LLM."""
+        # Copied because the scheduler keeps filling in Jira keys while Mongo encodes
+        self.tasks = copy.deepcopy(tasks)
+        self.decomposed = True
+        await self._update({"tasks": self.tasks, "decomposed": True})
+
+    async def complete(self, tasks: List[Dict[str, Any]]):
+        self.status = "completed"
+        self.tasks = copy.deepcopy(tasks)
+        await self._update({"status": "completed", "tasks": self.tasks, "error": None})
+
+    async def fail(self, error: str):
+        self.status = "failed"
+        await self._update({"status": "failed", "error": error})
+
+    async def _update(self, fields: Dict[str, Any]):
+        await self._write(self.mongo_client.update_jira_job(self.key, fields, self.ttl_seconds))
+
+    async def _write(self, operation):
+        try:
+            await operation
+        except Exception as e:
+            print(f"Error writing Jira job journal {self.key}: {e}")
+
+
+class JiraJobStore:
+    """Opens Jira batch job journals and serializes runs of the same job within this process."""
+
+    def __init__(self, mongo_client: MongoClient, ttl_seconds: int = None):
+        self.mongo_client = mongo_client
+        self.ttl_seconds = ttl_seconds or settings.JIRA_JOB_TTL_SECONDS
+        self._indexes_ready = False
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+    def lock(self, key: str) -> asyncio.Lock:
+        """Lock held while a job runs, so a duplicate submission waits and then finds it completed."""
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[key] = lock
+        return lock
+
+    async def open(self, key: str, reset: bool = False) -> Optional[JiraJobJournal]:
+        """Journal for `key`, or None if Mongo is unavailable and the batch must run unjournaled."""
+        try:
+            if not self._indexes_ready:
+                await self.mongo_client.ensure_jira_job_indexes()
+                self._indexes_ready = True
+            doc = await self.mongo_client.open_jira_job(key, self.ttl_seconds, reset=reset)
+        except Exception as e:
+            print(f"Error opening Jira job journal {key}: {e}")
+            return None
+        return JiraJobJournal(self.mongo_client, key, doc, self.ttl_seconds)
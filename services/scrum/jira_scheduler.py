@@ -0,0 +1,209 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from config import settings
+from jira_bulk import BulkIssueWriter
+from jira_jobs import JiraJobJournal, child_node_ids, node_id, normalize_summary
+
+
+class TokenBucket:
+    """Async token-bucket rate limiter: `rate` acquisitions per second, bursts up to `burst`."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(burst, 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class RateLimiterRegistry:
+    """One TokenBucket per Jira token, keeping the most recently used `max_size` tokens."""
+
+    def __init__(self, rate: float = None, burst: int = None, max_size: int = 1024):
+        self.rate = settings.JIRA_RATE_LIMIT_PER_SECOND if rate is None else rate
+        self.burst = burst or settings.JIRA_RATE_LIMIT_BURST
+        self.max_size = max_size
+        self._limiters: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    def get(self, token: str) -> TokenBucket:
+        limiter = self._limiters.get(token)
+        if limiter is None:
+            limiter = TokenBucket(self.rate, self.burst)
+            self._limiters[token] = limiter
+            if len(self._limiters) > self.max_size:
+                self._limiters.popitem(last=False)
+        else:
+            self._limiters.move_to_end(token)
+        return limiter
+
+
+class JiraCreationScheduler:
+    """
+    Creates an assigned decomposition forest in Jira as a dependency graph.
+
+    All top-level items are created concurrently; each item's Stories start
+    as soon as the item exists, and Subtasks as soon as their parent key is
+    known. Tasks and Subtasks go through a BulkIssueWriter, so siblings that
+    become ready together are created in one bulk request. Every Jira request
+    takes a token from the per-Jira-token rate limiter, then holds a slot of
+    the service-wide `semaphore` while it runs. Keys that belong in the
+    sprint are moved in chunks of JIRA_SPRINT_CHUNK_SIZE as they are
+    produced; call `finish()` to move the remainder.
+
+    A node whose creation fails gets a `jira_error` field and its children
+    are skipped; a top-level item that fails is left out of the result.
+
+    With a `journal`, every created issue and sprint move is recorded as it
+    happens, and nodes the journal already has are filled in from it
+    instead of being created again.
+    """
+
+    def __init__(self, service, token: str, sprint_id: Optional[int], semaphore: asyncio.Semaphore,
+                 rate_limiter: TokenBucket, sprint_chunk_size: int = None,
+                 journal: Optional[JiraJobJournal] = None):
+        self.service = service
+        self.token = token
+        self.sprint_id = sprint_id
+        self.semaphore = semaphore
+        self.rate_limiter = rate_limiter
+        self.sprint_chunk_size = sprint_chunk_size or settings.JIRA_SPRINT_CHUNK_SIZE
+        self.writer = BulkIssueWriter(service, token, self._call)
+        self.journal = journal
+        self.reused = 0
+        self.failed = 0
+        self._top_level_seen: Dict[str, int] = {}
+        self.created_issue_keys: List[str] = []
+        self._pending_sprint_keys: List[str] = []
+        self._sprint_moves: List[asyncio.Task] = []
+
+    async def run(self, tasks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        results = await asyncio.gather(*[self.create_item(item) for item in tasks])
+        await self.finish()
+        return [item for item, created in zip(tasks, results) if created]
+
+    async def create_item(self, item: Dict[str, Any]) -> bool:
+        """Create a top-level item (Epic or Task) and everything below it."""
+        summary = normalize_summary(item)
+        self._top_level_seen[summary] = self._top_level_seen.get(summary, 0) + 1
+        item_id = node_id("", "item", summary, self._top_level_seen[summary])
+
+        item_type = item.get('type', 'Task')
+        if item_type == 'Epic':
+            create = lambda: self._call(lambda: self.service.create_epic(item.get('summary', 'Untitled'), self.token))
+        else:
+            create = self._task_creator(item, 'Untitled')
+        if not await self._create_node(item, item_id, create, in_sprint=item_type != 'Epic'):
+            return False
+
+        stories = item.get('stories') or []
+        children = [
+            self._create_story(story, story_id)
+            for story, story_id in zip(stories, child_node_ids(item_id, "story", stories))
+        ]
+        if item_type != 'Epic':
+            subtasks = item.get('subtasks') or []
+            children += [
+                self._create_subtask(subtask, subtask_id, item['jira_key'])
+                for subtask, subtask_id in zip(subtasks, child_node_ids(item_id, "subtask", subtasks))
+            ]
+        await asyncio.gather(*children)
+        return True
+
+    async def _create_story(self, story: Dict[str, Any], story_id: str):
+        if not await self._create_node(story, story_id, self._task_creator(story, 'Untitled Story'), in_sprint=True):
+            return
+        subtasks = story.get('subtasks') or []
+        await asyncio.gather(*[
+            self._create_subtask(subtask, subtask_id, story['jira_key'])
+            for subtask, subtask_id in zip(subtasks, child_node_ids(story_id, "subtask", subtasks))
+        ])
+
+    async def _create_subtask(self, subtask: Dict[str, Any], subtask_id: str, parent_key: Optional[str]):
+        if not parent_key:
+            return
+        summary = subtask.get('summary', 'Untitled Subtask')
+        await self._create_node(
+            subtask,
+            subtask_id,
+            lambda: self.writer.create_subtask(summary, parent_key),
+            in_sprint=False
+        )
+
+    def _task_creator(self, node: Dict[str, Any], default_summary: str) -> Callable[[], Awaitable[Dict[str, Any]]]:
+        return lambda: self.writer.create_task(
+            node.get('summary', default_summary),
+            assignee_email=node.get('assignee_email'),
+            due_date=node.get('due_date')
+        )
+
+    async def _call(self, request: Callable[[], Awaitable[Any]]) -> Any:
+        """Run one Jira request under the rate limit and concurrency cap."""
+        # Wait for this token's bucket before taking a shared slot, so a token
+        # over its rate does not hold slots other tokens could use
+        await self.rate_limiter.acquire()
+        async with self.semaphore:
+            return await request()
+
+    async def _create_node(self, node: Dict[str, Any], node_id: str,
+                           create: Callable[[], Awaitable[Dict[str, Any]]], in_sprint: bool) -> bool:
+        jira_res = self.journal.created(node_id) if self.journal else None
+        if jira_res is not None:
+            self.reused += 1
+        else:
+            try:
+                jira_res = await create()
+            except Exception as e:
+                print(f"ERROR processing item {node.get('summary')}: {str(e)}")
+                node['jira_error'] = str(e)
+                self.failed += 1
+                return False
+            if self.journal:
+                await self.journal.record(node_id, jira_res)
+
+        node.pop('jira_error', None)
+        node['jira_key'] = jira_res.get('key')
+        node['jira_id'] = jira_res.get('id')
+        node['jira_link'] = jira_res.get('self')
+        if in_sprint and node['jira_key']:
+            self._add_sprint_key(node['jira_key'])
+        return True
+
+    def _add_sprint_key(self, key: str):
+        self.created_issue_keys.append(key)
+        if not self.sprint_id or (self.journal and key in self.journal.sprint_keys):
+            return
+        self._pending_sprint_keys.append(key)
+        if len(self._pending_sprint_keys) >= self.sprint_chunk_size:
+            self._flush_sprint_keys()
+
+    def _flush_sprint_keys(self):
+        keys, self._pending_sprint_keys = self._pending_sprint_keys, []
+        if keys:
+            self._sprint_moves.append(asyncio.create_task(self._move_to_sprint(keys)))
+
+    async def _move_to_sprint(self, keys: List[str]):
+        moved = await self._call(lambda: self.service.move_issues_to_sprint(self.sprint_id, keys, self.token))
+        if moved and self.journal:
+            await self.journal.record_sprint_keys(keys)
+
+    async def finish(self):
+        """Move the remaining keys to the sprint and wait for all sprint moves."""
+        self._flush_sprint_keys()
+        moves, self._sprint_moves = self._sprint_moves, []
+        await asyncio.gather(*moves)
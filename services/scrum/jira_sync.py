@@ -0,0 +1,188 @@
+import asyncio
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+from zoneinfo import ZoneInfo
+
+from config import settings
+from http_client import HttpClientPool
+from mongo_client import MongoClient
+
+SYNC_STATE_ID = "jira_issues"
+
+# JQL compares dates to the minute
+JQL_DATE_FORMAT = "%Y/%m/%d %H:%M"
+
+
+def parse_updated(value: Any) -> Optional[datetime]:
+    """Jira `updated` timestamp as an aware UTC datetime, or None if missing or malformed."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def cache_document(issue: Dict[str, Any]) -> Dict[str, Any]:
+    """The fields of a Jira issue kept in `jira_cache`."""
+    fields = issue.get("fields") or {}
+    status = fields.get("status") or {}
+    assignee = fields.get("assignee") or {}
+    return {
+        "key": issue.get("key"),
+        "summary": fields.get("summary"),
+        "description": fields.get("description"),
+        "status": status.get("name"),
+        "status_category": (status.get("statusCategory") or {}).get("key"),
+        "assignee": assignee.get("displayName"),
+        "duedate": fields.get("duedate"),
+        "updated": fields.get("updated")
+    }
+
+
+class JiraSyncWorker:
+    """
+    Keeps `jira_cache` in step with Jira by pulling only changed issues.
+
+    Each run pages through the issues updated since the watermark stored in
+    `sync_state` (minus JIRA_SYNC_OVERLAP_SECONDS, to cover clock skew and
+    JQL's minute resolution), oldest first, upserts every page in one bulk
+    write and then advances the watermark to the newest `updated` seen. The
+    first run, with no watermark, pulls everything once. Pages are keyed on
+    the last `updated` minute rather than a growing offset, so issues that
+    change mid-run cannot shift unseen ones out of the result. A run stops
+    early when a page brings nothing newer than what it already stored (a
+    gateway that ignores the paging parameters) and after
+    JIRA_SYNC_MAX_PAGES pages. JQL dates are written in JIRA_TIMEZONE, the
+    Jira API user's timezone, which is how Jira reads them.
+
+    `start` runs it every JIRA_SYNC_INTERVAL_SECONDS, randomized by
+    JIRA_SYNC_JITTER so replicas don't hit Jira in lockstep. Errors are
+    logged and the watermark is only advanced past pages that were stored.
+    """
+
+    def __init__(self, http: HttpClientPool, mongo_client: MongoClient,
+                 on_issues: Callable[[List[Dict[str, Any]]], None] = None, interval_seconds: float = None,
+                 jitter: float = None, page_size: int = None, overlap_seconds: int = None, max_pages: int = None,
+                 jira_timezone: str = None):
+        self.http = http
+        self.mongo_client = mongo_client
+        self.on_issues = on_issues
+        self.interval_seconds = interval_seconds or settings.JIRA_SYNC_INTERVAL_SECONDS
+        self.jitter = settings.JIRA_SYNC_JITTER if jitter is None else jitter
+        self.page_size = page_size or settings.JIRA_SYNC_PAGE_SIZE
+        self.max_pages = max_pages or settings.JIRA_SYNC_MAX_PAGES
+        self.overlap = timedelta(seconds=settings.JIRA_SYNC_OVERLAP_SECONDS if overlap_seconds is None else overlap_seconds)
+        self.jira_timezone = ZoneInfo(jira_timezone or settings.JIRA_TIMEZONE)
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.synced = 0
+        self.last_error: Optional[str] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def _loop(self):
+        while True:
+            await self.sync_once()
+            delay = self.interval_seconds * random.uniform(1 - self.jitter, 1 + self.jitter)
+            await asyncio.sleep(delay)
+
+    async def sync_once(self) -> int:
+        """Pull the issues changed since the watermark; returns how many were cached."""
+        async with self._lock:
+            self.runs += 1
+            try:
+                count = await self._sync()
+                self.last_error = None
+                return count
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Error syncing Jira data: {e}")
+                return 0
+
+    async def _sync(self) -> int:
+        state = await self.mongo_client.get_sync_state(SYNC_STATE_ID) or {}
+        watermark = parse_updated(state.get("watermark"))
+        cursor = watermark - self.overlap if watermark else None
+        print(f"Syncing Jira issues updated since {cursor.isoformat() if cursor else 'the beginning'}...")
+
+        count = 0
+        skip = 0
+        # Newest `updated` stored per key this run; a page with nothing newer
+        # means the gateway ignored the paging parameters
+        stored: Dict[str, Any] = {}
+        for _ in range(self.max_pages):
+            issues = await self._fetch_page(cursor, skip)
+            documents = [cache_document(issue) for issue in issues if issue.get("key")]
+            documents = [doc for doc in documents if self._is_new(stored, doc)]
+            if issues and not documents:
+                print("WARNING: Jira returned a page of issues already synced this run; "
+                      "the gateway may not support jql/startAt paging. Stopping.")
+                break
+            if documents:
+                await self.mongo_client.cache_jira_issues(documents)
+                # Tells other replicas' snapshots to reload what changed
+                await self.mongo_client.bump_jira_cache_version()
+                if self.on_issues:
+                    self.on_issues(documents)
+                stored.update((doc["key"], doc["updated"]) for doc in documents)
+            count += len(documents)
+
+            seen = [parsed for parsed in (parse_updated(doc["updated"]) for doc in documents) if parsed]
+            if seen and (watermark is None or max(seen) > watermark):
+                watermark = max(seen)
+                await self.mongo_client.save_sync_state(SYNC_STATE_ID, {"watermark": watermark.isoformat()})
+            if len(issues) < self.page_size:
+                break
+
+            # Next page: issues from the last minute of this one on, skipping
+            # those of that minute already read. Positions count every issue
+            # Jira returned, including ones not stored.
+            minutes = [parsed.replace(second=0, microsecond=0) for parsed in
+                       (parse_updated((issue.get("fields") or {}).get("updated")) for issue in issues) if parsed]
+            last_minute = max(minutes) if minutes else None
+            if last_minute is None or (cursor is not None and last_minute <= cursor):
+                skip += len(issues)
+            else:
+                cursor = last_minute
+                skip = minutes.count(last_minute)
+        else:
+            print(f"WARNING: Jira sync stopped after {self.max_pages} pages; the rest follows next run.")
+
+        self.synced += count
+        await self.mongo_client.save_sync_state(SYNC_STATE_ID, {"last_run": datetime.utcnow(), "last_count": count})
+        print(f"Synced {count} changed Jira issue(s) to MongoDB.")
+        return count
+
+    @staticmethod
+    def _is_new(stored: Dict[str, Any], document: Dict[str, Any]) -> bool:
+        if document["key"] not in stored:
+            return True
+        updated, previous = parse_updated(document["updated"]), parse_updated(stored[document["key"]])
+        return updated is not None and (previous is None or updated > previous)
+
+    async def _fetch_page(self, since: Optional[datetime], skip: int) -> List[Dict[str, Any]]:
+        jql = "ORDER BY updated ASC, key ASC"
+        if since is not None:
+            jql = f'updated >= "{since.astimezone(self.jira_timezone).strftime(JQL_DATE_FORMAT)}" {jql}'
+        params = {"jql": jql, "startAt": skip, "maxResults": self.page_size, "limit": self.page_size}
+        response = await self.http.get(f"{settings.JIRA_API_URL}/issues", params=params,
+                                       headers={"accept": "application/json"})
+        response.raise_for_status()
+        return response.json().get("issues", [])
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"runs": self.runs, "synced": self.synced, "last_error": self.last_error}
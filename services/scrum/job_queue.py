@@ -0,0 +1,220 @@
+import abc
+import asyncio
+import time
+import uuid
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from config import settings
+
+# A job handler gets the submitted payload and an `emit` callback for
+# progress events, and returns the job result.
+Emit = Callable[[Dict[str, Any]], Awaitable[None]]
+JobHandler = Callable[[Dict[str, Any], Emit], Awaitable[Any]]
+# Releases resources referenced by a payload once its job is over, whether
+# it ran or was discarded.
+JobCleanup = Callable[[Dict[str, Any]], None]
+
+TERMINAL_STATUSES = {"succeeded", "failed"}
+
+
+class JobQueueFullError(RuntimeError):
+    """Raised when a job is submitted while the queue is at JOB_QUEUE_MAX_SIZE."""
+
+
+class Job:
+    """State of one submitted job as seen by status and event endpoints."""
+
+    def __init__(self, kind: str, payload: Dict[str, Any]):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.payload = payload
+        self.status = "queued"
+        self.events: List[Dict[str, Any]] = []
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.utcnow()
+        self.updated_at = self.created_at
+        self.finished_at: Optional[float] = None
+        self._changed = asyncio.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+    def public(self) -> Dict[str, Any]:
+        """Job fields safe to return to clients (the payload may hold credentials)."""
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "created_at": self.created_at.isoformat(),
+            "updated_at": self.updated_at.isoformat(),
+            "progress": self.events[-1] if self.events else None,
+            "events": len(self.events),
+            "result": self.result,
+            "error": self.error,
+        }
+
+    def _touch(self):
+        self.updated_at = datetime.utcnow()
+        # Wake everyone waiting on the current event and start a new one
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+
+class JobQueue(abc.ABC):
+    """
+    Interface of the background job queue used by the async job endpoints.
+
+    Handlers are registered per job kind; `submit` returns a job id at once
+    and a worker runs the handler later.
+
+    Jobs must run in the process that submitted them: the decompose payload
+    holds the path of an upload spooled to this process's local disk, which a
+    worker on another host could not open. A broker-backed queue would first
+    need the upload moved to shared storage.
+    """
+
+    @abc.abstractmethod
+    def register(self, kind: str, handler: JobHandler, cleanup: JobCleanup = None):
+        """Run `handler` for jobs of `kind`; `cleanup` releases a payload's resources once its job is over."""
+
+    @abc.abstractmethod
+    async def submit(self, kind: str, payload: Dict[str, Any]) -> Job:
+        """Queue a job and return it at once; raises JobQueueFullError when the queue is full."""
+
+    @abc.abstractmethod
+    def get(self, job_id: str) -> Optional[Job]:
+        """The job with `job_id`, or None if it is unknown or expired."""
+
+    @abc.abstractmethod
+    def events(self, job_id: str, after: int = 0) -> AsyncIterator[Dict[str, Any]]:
+        """Yield the job's events from index `after` until it finishes."""
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+
+class InProcessJobQueue(JobQueue):
+    """
+    JobQueue running jobs on this process's event loop.
+
+    At most JOB_WORKERS jobs run at once and JOB_QUEUE_MAX_SIZE more may
+    wait. Finished jobs, with their events, result or error, are kept for
+    JOB_RESULT_TTL_SECONDS.
+    """
+
+    def __init__(self, workers: int = None, max_size: int = None, result_ttl_seconds: int = None):
+        self.workers = workers or settings.JOB_WORKERS
+        self.max_size = settings.JOB_QUEUE_MAX_SIZE if max_size is None else max_size
+        self.result_ttl_seconds = result_ttl_seconds or settings.JOB_RESULT_TTL_SECONDS
+        self._handlers: Dict[str, JobHandler] = {}
+        self._cleanups: Dict[str, JobCleanup] = {}
+        self._jobs: Dict[str, Job] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: List[asyncio.Task] = []
+
+    def register(self, kind: str, handler: JobHandler, cleanup: JobCleanup = None):
+        self._handlers[kind] = handler
+        if cleanup:
+            self._cleanups[kind] = cleanup
+
+    async def start(self):
+        if self._worker_tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._worker_tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def submit(self, kind: str, payload: Dict[str, Any]) -> Job:
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        await self.start()
+        self._purge()
+
+        job = Job(kind, payload)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise JobQueueFullError(f"Job queue is full ({self.max_size} jobs waiting)")
+        self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self._purge()
+        return self._jobs.get(job_id)
+
+    async def events(self, job_id: str, after: int = 0) -> AsyncIterator[Dict[str, Any]]:
+        """Yield the job's events from index `after`, then new ones as they arrive, until it finishes."""
+        index = after
+        while True:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            changed = job._changed
+            while index < len(job.events):
+                yield job.events[index]
+                index += 1
+            if job.done:
+                return
+            await changed.wait()
+
+    async def close(self):
+        tasks, self._worker_tasks = self._worker_tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for job in self._jobs.values():
+            if not job.done:
+                self._finish(job, "failed", error="Service shut down before the job finished")
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job):
+        async def emit(event: Dict[str, Any]):
+            job.events.append(event)
+            job._touch()
+
+        job.status = "running"
+        job._touch()
+        print(f"Job {job.id} ({job.kind}) started")
+        try:
+            result = await self._handlers[job.kind](job.payload, emit)
+        except asyncio.CancelledError:
+            self._finish(job, "failed", error="Job was cancelled")
+            raise
+        except Exception as e:
+            print(f"Job {job.id} ({job.kind}) failed: {e}")
+            self._finish(job, "failed", error=str(e))
+        else:
+            print(f"Job {job.id} ({job.kind}) succeeded")
+            self._finish(job, "succeeded", result=result)
+
+    def _finish(self, job: Job, status: str, result: Any = None, error: str = None):
+        cleanup = self._cleanups.get(job.kind)
+        if cleanup:
+            try:
+                cleanup(job.payload)
+            except Exception as e:
+                print(f"Error cleaning up job {job.id}: {e}")
+        job.status = status
+        job.result = result
+        job.error = error
+        job.payload = {}
+        job.finished_at = time.monotonic()
+        job._touch()
+
+    def _purge(self):
+        cutoff = time.monotonic() - self.result_ttl_seconds
+        expired = [job_id for job_id, job in self._jobs.items() if job.finished_at and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
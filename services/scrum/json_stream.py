@@ -0,0 +1,91 @@
+import json
+from typing import Any, Dict, List
+
+
+class EpicStreamParser:
+    """
+    Incremental parser for a streamed decomposition response.
+
+    Feed it the model output chunk by chunk; each call returns the Epic
+    objects that were completed by that chunk. Epics are the objects directly
+    inside a top-level array or the array under the top-level `"epics"` key,
+    which covers both `[...]` and `{"epics": [...]}`. Any other shape, such
+    as a single Epic object whose `stories` array must not be mistaken for
+    Epics, emits nothing and is left to the caller to parse from `text`.
+    Objects that cannot be parsed are logged and counted in `dropped`.
+    """
+
+    def __init__(self):
+        self.text_parts: List[str] = []
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._epic_array_depth = None
+        self._current: List[str] = []
+        # The last string completed and the last key seen in the top-level object
+        self._string: List[str] = []
+        self._last_string = None
+        self._key = None
+        self.emitted = 0
+        self.dropped = 0
+
+    @property
+    def text(self) -> str:
+        return "".join(self.text_parts)
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        self.text_parts.append(chunk)
+        epics = []
+        for char in chunk:
+            capturing = bool(self._current)
+            if capturing:
+                self._current.append(char)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    self._last_string = "".join(self._string)
+                    continue
+                if self._stack == ["{"]:
+                    self._string.append(char)
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string = []
+            elif char == ":" and self._stack == ["{"]:
+                self._key = self._last_string
+            elif char == ",":
+                self._key = None
+            elif char in "[{":
+                if char == "[" and self._epic_array_depth is None and (
+                    not self._stack or (self._stack == ["{"] and self._key == "epics")
+                ):
+                    self._epic_array_depth = len(self._stack) + 1
+                elif char == "{" and len(self._stack) == self._epic_array_depth and not capturing:
+                    self._current = [char]
+                self._stack.append(char)
+            elif char in "]}":
+                if self._stack:
+                    self._stack.pop()
+                if char == "}" and self._current and len(self._stack) == self._epic_array_depth:
+                    epic = self._parse_current()
+                    if epic is not None:
+                        epics.append(epic)
+        return epics
+
+    def _parse_current(self):
+        raw = "".join(self._current)
+        self._current = []
+        try:
+            epic = json.loads(raw)
+        except json.JSONDecodeError:
+            self.dropped += 1
+            print(f"WARNING: dropped a streamed epic that is not valid JSON: {raw[:200]}")
+            return None
+        self.emitted += 1
+        return epic
@@ -1,10 +1,13 @@
 from fastapi import FastAPI, UploadFile, File, HTTPException, Header, Form
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from service import JiraScrumMasterService
+from ingestion import SpooledDocument, UploadTooLargeError, spool_upload
+from job_queue import InProcessJobQueue, JobQueueFullError
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
 from datetime import datetime as DateTime
+import json
 
 app = FastAPI(title="Jira AI Scrum Master")
 
@@ -18,9 +21,32 @@ app.add_middleware(
 
 service = JiraScrumMasterService()
 
+
+async def run_decompose_job(payload: Dict[str, Any], emit) -> List[Dict[str, Any]]:
+    """Background version of /decompose: parse, decompose and create issues, emitting progress."""
+    text = await service.parse_document(SpooledDocument(**payload["document"]))
+    organization = await service.get_organization_info(payload["token"])
+
+    final_tasks = []
+    async for event in service.decompose_pipeline(text, organization, payload["token"], use_cache=not payload["refresh"]):
+        if event["event"] == "completed":
+            final_tasks = event["tasks"]
+        else:
+            await emit({**event, "message": service.describe_progress(event)})
+    return final_tasks
+
+
+def discard_decompose_job(payload: Dict[str, Any]):
+    SpooledDocument(**payload["document"]).close()
+
+
+job_queue = InProcessJobQueue()
+job_queue.register("decompose", run_decompose_job, cleanup=discard_decompose_job)
+
 @app.post("/decompose", response_model=List[Dict[str, Any]])
 async def decompose_document(
     file: UploadFile = File(...),
+    refresh: bool = False,
     authorization: Optional[str] = Header(None)
 ):
     try:
@@ -32,18 +58,89 @@ async def decompose_document(
         token = authorization.split(" ")[1] if " " in authorization else authorization
         organization = await service.get_organization_info(token)
         
-        tasks = await service.decompose_tasks(text)
-        
-        assigned_tasks = service.assign_tasks(tasks, organization)
-        
-        final_tasks = await service.create_jira_tasks(assigned_tasks, token)
+        final_tasks = []
+        async for event in service.decompose_pipeline(text, organization, token, use_cache=not refresh):
+            if event["event"] == "completed":
+                final_tasks = event["tasks"]
         
         return final_tasks
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/jobs/decompose", status_code=202)
+async def submit_decompose_job(
+    file: UploadFile = File(...),
+    refresh: bool = False,
+    authorization: Optional[str] = Header(None)
+):
+    """Queue a /decompose run and return its job id without waiting for it."""
+    if not authorization:
+        raise HTTPException(status_code=401, detail="Missing Authorization header")
+    token = authorization.split(" ")[1] if " " in authorization else authorization
+
+    try:
+        # The upload is only readable during this request, so spool it now
+        document = await spool_upload(file)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        job = await job_queue.submit("decompose", {
+            "document": document.as_dict(),
+            "token": token,
+            "refresh": refresh
+        })
+    except JobQueueFullError as e:
+        document.close()
+        raise HTTPException(status_code=503, detail=str(e))
+
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/jobs/{job.id}",
+        "events_url": f"/jobs/{job.id}/events"
+    }
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job.public()
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, last_event_id: Optional[str] = Header(None)):
+    """Server-sent events for a job: its progress events, then a final `succeeded` or `failed` event."""
+    if job_queue.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    # Reconnecting EventSource clients send the id of the last event they saw
+    after = int(last_event_id) + 1 if last_event_id and last_event_id.isdigit() else 0
+
+    async def event_generator():
+        index = after
+        async for event in job_queue.events(job_id, after):
+            yield f"id: {index}\nevent: {event['event']}\ndata: {json.dumps(event, default=str)}\n\n"
+            index += 1
+        job = job_queue.get(job_id)
+        if job is not None:
+            yield f"event: {job.status}\ndata: {json.dumps(job.public(), default=str)}\n\n"
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
 class Person(BaseModel):
     name: str
     email: Optional[str] = None
@@ -123,9 +220,33 @@ async def chat(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/stats")
+async def stats():
+    return service.stats()
+
+@app.get("/health")
+async def health():
+    """Liveness: the process is up and serving requests."""
+    return {"status": "ok"}
+
+@app.get("/ready")
+async def ready():
+    """Readiness: 503 until the critical dependencies (Mongo, tokenizer, OpenAI client) are up."""
+    body = {"ready": service.ready, "checks": dict(service.readiness)}
+    if not service.ready:
+        return JSONResponse(status_code=503, content=body)
+    return body
+
 @app.on_event("startup")
 async def startup_event():
-    await service.sync_jira_data()
+    await job_queue.start()
+    # Warmup (loading, connecting, index builds, the first Jira sync) runs in the background
+    service.start_warmup()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await job_queue.close()
+    await service.close()
 
 if __name__ == "__main__":
     import uvicorn
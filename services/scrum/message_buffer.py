@@ -0,0 +1,147 @@
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+from config import settings
+from mongo_client import MongoClient
+
+DUPLICATE_KEY = 11000
+# Retries of a failing write wait up to flush_ms * 2 ** MAX_BACKOFF_DOUBLINGS
+MAX_BACKOFF_DOUBLINGS = 6
+
+
+class ChatMessageBuffer:
+    """
+    Write-behind buffer for chat messages.
+
+    `add_turn` queues a user message and the reply as a pair and returns
+    at once; the buffer writes queued messages with one `insert_many` when
+    CHAT_WRITE_BATCH_SIZE are pending or CHAT_WRITE_FLUSH_MS after the first
+    one, whichever comes first. Ids are assigned when a turn is queued, so
+    a batch that failed can be written again without duplicates. Failed
+    batches are kept for the next flush up to CHAT_WRITE_MAX_PENDING
+    messages, past which the oldest are dropped and logged. `close` drains
+    the buffer on shutdown.
+    """
+
+    def __init__(self, mongo_client: MongoClient, batch_size: int = None, flush_ms: int = None,
+                 max_pending: int = None):
+        self.mongo_client = mongo_client
+        self.batch_size = batch_size or settings.CHAT_WRITE_BATCH_SIZE
+        self.flush_ms = settings.CHAT_WRITE_FLUSH_MS if flush_ms is None else flush_ms
+        self.max_pending = max_pending or settings.CHAT_WRITE_MAX_PENDING
+        self._pending: List[Dict[str, Any]] = []
+        self._in_flight: List[Dict[str, Any]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._failures = 0
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+
+    def add_turn(self, session_id: str, user_content: str, assistant_content: str,
+                 asked_at: datetime = None, answered_at: datetime = None):
+        """Queue one exchange: the user's message and the assistant's reply."""
+        answered_at = answered_at or datetime.utcnow()
+        self._pending.append(self._message(session_id, "user", user_content, asked_at or answered_at))
+        self._pending.append(self._message(session_id, "assistant", assistant_content, answered_at))
+        if len(self._pending) > self.max_pending:
+            dropped = len(self._pending) - self.max_pending
+            del self._pending[:dropped]
+            self.dropped += dropped
+            print(f"ERROR: chat write buffer full, dropped {dropped} message(s)")
+
+        if len(self._pending) >= self.batch_size:
+            self._start_flush()
+        elif self._timer is None and self._flush_task is None:
+            self._timer = asyncio.get_running_loop().call_later(self.flush_ms / 1000, self._start_flush)
+
+    @staticmethod
+    def _message(session_id: str, role: str, content: str, timestamp: datetime) -> Dict[str, Any]:
+        # ObjectIds increase within the process, so _id orders messages that share a timestamp
+        return {"_id": ObjectId(), "session_id": session_id, "role": role, "content": content, "timestamp": timestamp}
+
+    def pending_for(self, session_id: str) -> List[Dict[str, Any]]:
+        """Messages of a session that are queued or being written, oldest first."""
+        return [message for message in self._in_flight + self._pending if message["session_id"] == session_id]
+
+    def _start_flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._flush_task is None and self._pending:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self):
+        try:
+            # Turns queued while a batch is being written go out in the next one
+            while self._pending:
+                if not await self.flush():
+                    break
+        finally:
+            self._flush_task = None
+            if self._pending and self._timer is None:
+                # Back off while writes keep failing
+                delay = self.flush_ms / 1000 * 2 ** min(self._failures, MAX_BACKOFF_DOUBLINGS)
+                self._timer = asyncio.get_running_loop().call_later(delay, self._start_flush)
+
+    async def flush(self) -> bool:
+        """Write up to one batch of queued messages; returns whether the write succeeded."""
+        batch = self._pending[:self.batch_size]
+        if not batch:
+            return True
+        del self._pending[:len(batch)]
+        self._in_flight = batch
+        try:
+            await self.mongo_client.save_messages(batch)
+        except BulkWriteError as e:
+            # Messages written by an earlier, partly failed attempt come back as duplicates
+            if any(error.get("code") != DUPLICATE_KEY for error in e.details.get("writeErrors", [])):
+                return self._requeue(batch, e)
+        except Exception as e:
+            return self._requeue(batch, e)
+        finally:
+            self._in_flight = []
+        self._failures = 0
+        self.written += len(batch)
+        self.batches += 1
+        return True
+
+    def _requeue(self, batch: List[Dict[str, Any]], error: Exception) -> bool:
+        print(f"ERROR writing {len(batch)} chat message(s), will retry: {error}")
+        self._failures += 1
+        self._pending[:0] = batch
+        overflow = len(self._pending) - self.max_pending
+        if overflow > 0:
+            del self._pending[:overflow]
+            self.dropped += overflow
+            print(f"ERROR: chat write buffer full, dropped {overflow} message(s)")
+        return False
+
+    async def close(self, attempts: int = 3):
+        """Write everything still queued, giving up after `attempts` failed batches."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._flush_task is not None:
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        failures = 0
+        while self._pending and failures < attempts:
+            if not await self.flush():
+                failures += 1
+        if self._pending:
+            print(f"ERROR: {len(self._pending)} chat message(s) were not written before shutdown")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._pending),
+            "written": self.written,
+            "batches": self.batches,
+            "dropped": self.dropped,
+        }
@@ -1,39 +1,90 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
 from config import settings
-from datetime import datetime
-from typing import List, Dict, Any, Optional
+from mongo_indexes import INDEXES
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Tuple
 
 class MongoClient:
     def __init__(self):
         self.client = AsyncIOMotorClient(settings.MONGO_URL)
         self.db = self.client[settings.MONGO_DB_NAME]
         self.chat_history = self.db.chat_history
+        self.chat_summaries = self.db.chat_summaries
         self.jira_cache = self.db.jira_cache
+        self.document_text = self.db.document_text
+        self.decompositions = self.db.decompositions
+        self.jira_jobs = self.db.jira_jobs
+        self.sync_state = self.db.sync_state
 
-    async def save_message(self, session_id: str, role: str, content: str):
-        """Save a chat message to history."""
-        await self.chat_history.insert_one({
-            "session_id": session_id,
-            "role": role,
-            "content": content,
-            "timestamp": datetime.utcnow()
-        })
-
-    async def get_chat_history(self, session_id: str, limit: int = 50) -> List[Dict[str, Any]]:
-        """Retrieve chat history for a session."""
-        cursor = self.chat_history.find(
-            {"session_id": session_id}
-        ).sort("timestamp", 1).limit(limit) # Get oldest first? No, usually we want context window.
-        # If we sort by timestamp ascending, we get the conversation flow.
-        # But if we limit, we might want the *latest* 50.
-        # So sort desc, limit, then reverse.
-        
-        cursor = self.chat_history.find(
-            {"session_id": session_id}
-        ).sort("timestamp", -1).limit(limit)
-        
+    async def ping(self):
+        """Round trip to the server; raises if Mongo is unreachable."""
+        await self.client.admin.command("ping")
+
+    async def ensure_indexes(self):
+        """
+        Create the indexes declared in `mongo_indexes.INDEXES`.
+
+        Idempotent: indexes that already exist are left as they are. A
+        collection whose indexes cannot be built is logged and skipped; if
+        Mongo is unreachable the rest are not attempted.
+        """
+        from pymongo.errors import ConnectionFailure
+
+        for name in INDEXES:
+            try:
+                await self._create_indexes(name)
+            except ConnectionFailure as e:
+                print(f"ERROR creating indexes: Mongo is unreachable: {e}")
+                return
+            except Exception as e:
+                print(f"ERROR creating indexes on {name}: {e}")
+
+    async def _create_indexes(self, name: str):
+        await self.db[name].create_indexes(INDEXES[name])
+
+    async def save_messages(self, messages: List[Dict[str, Any]]):
+        """Save a batch of chat messages with one unordered insert."""
+        await self.chat_history.insert_many(messages, ordered=False)
+
+    async def get_chat_history(self, session_id: str, limit: int = 50,
+                               after: Optional[Tuple[datetime, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Retrieve the latest `limit` messages of a session, oldest first.
+
+        Args:
+            after: (timestamp, _id) of a message; only later messages are returned
+        """
+        query: Dict[str, Any] = {"session_id": session_id}
+        if after is not None:
+            timestamp, message_id = after
+            query["$or"] = [
+                {"timestamp": {"$gt": timestamp}},
+                {"timestamp": timestamp, "_id": {"$gt": message_id}}
+            ]
+
+        # Sort desc, limit, then reverse, to get the latest messages in conversation order
+        cursor = self.chat_history.find(query).sort([("timestamp", -1), ("_id", -1)]).limit(limit)
         history = await cursor.to_list(length=limit)
-        return sorted(history, key=lambda x: x["timestamp"])
+        history.reverse()
+        return history
+
+    async def get_chat_summary(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Rolling summary of a session's older messages, if one was written."""
+        return await self.chat_summaries.find_one({"session_id": session_id})
+
+    async def save_chat_summary(self, session_id: str, summary: str, through: Tuple[datetime, Any]):
+        """Store a session's summary of every message up to `through` ((timestamp, _id))."""
+        await self.chat_summaries.update_one(
+            {"session_id": session_id},
+            {"$set": {
+                "summary": summary,
+                "through_timestamp": through[0],
+                "through_id": through[1],
+                "updated_at": datetime.utcnow()
+            }},
+            upsert=True
+        )
 
     async def cache_jira_issues(self, issues: List[Dict[str, Any]]):
         """Cache Jira issues, replacing existing ones."""
@@ -46,6 +97,8 @@ class MongoClient:
         
         from pymongo import UpdateOne
         
+        # synced_at lets other replicas load just the issues synced since they last looked
+        synced_at = datetime.utcnow()
         operations = []
         for issue in issues:
             key = issue.get("key")
@@ -53,16 +106,141 @@ class MongoClient:
                 operations.append(
                     UpdateOne(
                         {"key": key},
-                        {"$set": issue},
+                        {"$set": {**issue, "synced_at": synced_at}},
                         upsert=True
                     )
                 )
         
         if operations:
-            await self.jira_cache.bulk_write(operations)
+            await self.jira_cache.bulk_write(operations, ordered=False)
+
+    async def get_sync_state(self, name: str) -> Optional[Dict[str, Any]]:
+        """Progress of a background sync (e.g. its watermark)."""
+        return await self.sync_state.find_one({"_id": name})
+
+    async def save_sync_state(self, name: str, fields: Dict[str, Any]):
+        """Update fields of a background sync's progress."""
+        await self.sync_state.update_one({"_id": name}, {"$set": fields}, upsert=True)
+
+    async def load_cached_issues(self, synced_since: datetime = None) -> List[Dict[str, Any]]:
+        """Cached Jira issues for the in-process snapshot: all of them, or those synced since `synced_since`."""
+        query = {"synced_at": {"$gte": synced_since}} if synced_since else {}
+        cursor = self.jira_cache.find(query, {"_id": 0})
+        return await cursor.to_list(length=None)
+
+    async def get_jira_cache_version(self) -> int:
+        """Counter bumped whenever a sync writes to `jira_cache`."""
+        state = await self.sync_state.find_one({"_id": "jira_cache"})
+        return (state or {}).get("version", 0)
+
+    async def bump_jira_cache_version(self):
+        await self.sync_state.update_one({"_id": "jira_cache"}, {"$inc": {"version": 1}}, upsert=True)
+
+    def watch_jira_cache(self):
+        """Change stream of issues written to `jira_cache`; needs a replica set."""
+        return self.jira_cache.watch(
+            [{"$match": {"operationType": {"$in": ["insert", "update", "replace"]}}}],
+            full_document="updateLookup"
+        )
+
+    async def ensure_document_text_collection(self, max_bytes: int):
+        """Create the capped collection backing the document text cache."""
+        from pymongo.errors import CollectionInvalid
+
+        try:
+            await self.db.create_collection("document_text", capped=True, size=max_bytes)
+        except CollectionInvalid:
+            pass  # Already exists
+
+    async def get_document_text(self, key: str) -> Optional[str]:
+        """Get extracted document text by content key."""
+        doc = await self.document_text.find_one({"_id": key}, {"text": 1})
+        return doc["text"] if doc else None
+
+    async def save_document_text(self, key: str, text: str):
+        """Store extracted document text under its content key."""
+        from pymongo.errors import DuplicateKeyError
+
+        try:
+            await self.document_text.insert_one({
+                "_id": key,
+                "text": text,
+                "created_at": datetime.utcnow()
+            })
+        except DuplicateKeyError:
+            pass  # Stored concurrently by another request
+
+    async def ensure_decomposition_indexes(self):
+        """Expire cached decompositions at their `expires_at` time."""
+        await self._create_indexes("decompositions")
+
+    async def get_decomposition(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Get a cached decomposition that has not expired yet."""
+        doc = await self.decompositions.find_one(
+            {"_id": key, "expires_at": {"$gt": datetime.utcnow()}},
+            {"tasks": 1}
+        )
+        return doc["tasks"] if doc else None
+
+    async def save_decomposition(self, key: str, tasks: List[Dict[str, Any]], ttl_seconds: int):
+        """Cache a decomposition result for `ttl_seconds`."""
+        now = datetime.utcnow()
+        await self.decompositions.replace_one(
+            {"_id": key},
+            {
+                "tasks": tasks,
+                "created_at": now,
+                "expires_at": now + timedelta(seconds=ttl_seconds)
+            },
+            upsert=True
+        )
+
+    async def ensure_jira_job_indexes(self):
+        """Expire Jira batch job journals at their `expires_at` time."""
+        await self._create_indexes("jira_jobs")
+
+    async def open_jira_job(self, key: str, ttl_seconds: int, reset: bool = False) -> Dict[str, Any]:
+        """Get the journal of a Jira batch job, starting an empty one if there is none or `reset` is set."""
+        now = datetime.utcnow()
+        fresh = {
+            "status": "running",
+            "tasks": None,
+            "decomposed": False,
+            "nodes": {},
+            "sprint_keys": [],
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+            "expires_at": now + timedelta(seconds=ttl_seconds)
+        }
+        if reset:
+            await self.jira_jobs.replace_one({"_id": key}, fresh, upsert=True)
+            return {"_id": key, **fresh}
+        return await self.jira_jobs.find_one_and_update(
+            {"_id": key},
+            {"$setOnInsert": fresh},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def record_jira_job_node(self, key: str, node_id: str, issue: Dict[str, Any]):
+        """Record the Jira issue created for one node of a batch job."""
+        await self.jira_jobs.update_one(
+            {"_id": key},
+            {"$set": {f"nodes.{node_id}": issue, "updated_at": datetime.utcnow()}}
+        )
+
+    async def record_jira_job_sprint_keys(self, key: str, issue_keys: List[str]):
+        """Record issues of a batch job that were moved to the sprint."""
+        await self.jira_jobs.update_one(
+            {"_id": key},
+            {"$addToSet": {"sprint_keys": {"$each": issue_keys}}, "$set": {"updated_at": datetime.utcnow()}}
+        )
 
-    async def get_cached_issues(self, limit: int = 20) -> List[Dict[str, Any]]:
-        """Get cached Jira issues."""
-        # Ideally we would filter by relevance, but for now return recent ones
-        cursor = self.jira_cache.find().limit(limit)
-        return await cursor.to_list(length=limit)
+    async def update_jira_job(self, key: str, fields: Dict[str, Any], ttl_seconds: int):
+        """Update top-level fields of a batch job and extend its expiry."""
+        now = datetime.utcnow()
+        await self.jira_jobs.update_one(
+            {"_id": key},
+            {"$set": {**fields, "updated_at": now, "expires_at": now + timedelta(seconds=ttl_seconds)}}
+        )
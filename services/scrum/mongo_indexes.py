@@ -0,0 +1,55 @@
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+# Indexes per collection, for every query shape in QUERY_SHAPES. Names are
+# left to Mongo's defaults so that declaring an index which already exists
+# is a no-op.
+INDEXES: Dict[str, List[IndexModel]] = {
+    "chat_history": [
+        IndexModel([("session_id", ASCENDING), ("timestamp", ASCENDING), ("_id", ASCENDING)]),
+    ],
+    "chat_summaries": [
+        IndexModel([("session_id", ASCENDING)], unique=True),
+    ],
+    "jira_cache": [
+        IndexModel([("key", ASCENDING)], unique=True),
+        IndexModel([("synced_at", ASCENDING)]),
+    ],
+    "decompositions": [
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+    ],
+    "jira_jobs": [
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+    ],
+}
+
+
+class QueryShape(NamedTuple):
+    """A query the service runs, with placeholder values, for index verification."""
+    collection: str
+    filter: Dict[str, Any]
+    sort: Optional[List[Tuple[str, int]]] = None
+
+
+QUERY_SHAPES: List[QueryShape] = [
+    # get_chat_history, first page and after a summary
+    QueryShape("chat_history", {"session_id": "s"}, [("timestamp", DESCENDING), ("_id", DESCENDING)]),
+    QueryShape(
+        "chat_history",
+        {"session_id": "s", "$or": [{"timestamp": {"$gt": 0}}, {"timestamp": 0, "_id": {"$gt": 0}}]},
+        [("timestamp", DESCENDING), ("_id", DESCENDING)]
+    ),
+    # get_chat_summary / save_chat_summary
+    QueryShape("chat_summaries", {"session_id": "s"}),
+    # cache_jira_issues upserts
+    QueryShape("jira_cache", {"key": "SCRUM-1"}),
+    # load_cached_issues after a cache version bump
+    QueryShape("jira_cache", {"synced_at": {"$gte": 0}}),
+    # Lookups by content key
+    QueryShape("document_text", {"_id": "k"}),
+    QueryShape("decompositions", {"_id": "k", "expires_at": {"$gt": 0}}),
+    QueryShape("jira_jobs", {"_id": "k"}),
+    # Jira sync watermark and cache version
+    QueryShape("sync_state", {"_id": "jira_issues"}),
+]
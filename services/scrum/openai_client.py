@@ -0,0 +1,38 @@
+import threading
+from typing import Any
+
+from config import settings
+
+
+class LazyAzureOpenAI:
+    """
+    AsyncAzureOpenAI that is created on first use.
+
+    Importing `openai` takes about as long as the rest of the service's
+    imports together, so the service holds this instead and startup warmup
+    calls `load` in a worker thread. Attribute access is forwarded to the
+    real client, loading it first if warmup has not got there yet.
+    """
+
+    def __init__(self):
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._client is not None
+
+    def load(self):
+        with self._lock:
+            if self._client is None:
+                from openai import AsyncAzureOpenAI
+
+                self._client = AsyncAzureOpenAI(
+                    azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
+                    api_key=settings.AZURE_OPENAI_API_KEY,
+                    api_version=settings.API_VERSION
+                )
+        return self._client
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.load(), name)
@@ -0,0 +1,179 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from functools import cached_property
+from types import MappingProxyType
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import httpx
+
+from assignment import SkillIndex
+from config import settings
+from http_client import HttpClientPool
+from skills import default_matcher
+
+
+def freeze(value: Any) -> Any:
+    """Read-only copy of decoded JSON: dicts become mapping proxies and lists tuples."""
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+class OrganizationSnapshot(Mapping):
+    """
+    Immutable view of an `/organization` response with user skills derived.
+
+    Reads like the response dict (`snapshot.get("users")`), but nothing in
+    it can be modified, so one snapshot is safely shared by concurrent
+    requests. Per-request data such as ratings must be kept alongside it.
+    """
+
+    def __init__(self, data: Dict[str, Any], etag: str = None, last_modified: str = None):
+        users = list(data.get("users") or [])
+        # Skills for everyone without them, from one scan over all job titles
+        missing = [index for index, user in enumerate(users) if "skills" not in user]
+        derived = default_matcher().derive_many([users[index].get("job", "") for index in missing])
+        for index, skills in zip(missing, derived):
+            users[index] = {**users[index], "skills": skills}
+        self._data = freeze({**data, "users": users})
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = time.monotonic()
+
+    @property
+    def users(self) -> Tuple[Mapping, ...]:
+        return self._data["users"]
+
+    @cached_property
+    def skill_index(self) -> SkillIndex:
+        """Users' skill matrix for assignment, built on first use."""
+        return SkillIndex(self.users)
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class OrganizationCache:
+    """
+    Cache of organization snapshots, keyed by the caller's token.
+
+    A snapshot younger than ORG_CACHE_TTL_SECONDS is returned as is. An
+    older one is still returned, for up to ORG_CACHE_STALE_SECONDS more,
+    while a background request revalidates it with If-None-Match /
+    If-Modified-Since when the backend sent an ETag or Last-Modified, so
+    an unchanged organization costs a 304 and no skill derivation.
+    Concurrent requests for the same token share one fetch.
+    """
+
+    def __init__(self, http: HttpClientPool, url: str = None, ttl_seconds: int = None,
+                 stale_seconds: int = None, max_entries: int = None):
+        self.http = http
+        self.url = url or f"{settings.BACKEND_API_URL}/organization"
+        self.ttl_seconds = settings.ORG_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.stale_seconds = settings.ORG_CACHE_STALE_SECONDS if stale_seconds is None else stale_seconds
+        self.max_entries = max_entries or settings.ORG_CACHE_MAX_ENTRIES
+        self._snapshots: "OrderedDict[str, OrganizationSnapshot]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    async def get(self, token: str) -> OrganizationSnapshot:
+        key = hashlib.sha256(token.encode('utf-8')).hexdigest()
+        snapshot = self._snapshots.get(key)
+        if snapshot is not None:
+            age = time.monotonic() - snapshot.fetched_at
+            if age < self.ttl_seconds:
+                self.hits += 1
+                self._snapshots.move_to_end(key)
+                return snapshot
+            if age < self.ttl_seconds + self.stale_seconds:
+                self.stale_hits += 1
+                self._revalidate(key, token)
+                return snapshot
+
+        self.misses += 1
+        return await asyncio.shield(self._revalidate(key, token))
+
+    def _revalidate(self, key: str, token: str) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch(key, token))
+            self._inflight[key] = task
+            task.add_done_callback(self._fetch_done(key))
+        return task
+
+    def _fetch_done(self, key: str):
+        def done(task: asyncio.Task):
+            self._inflight.pop(key, None)
+            if not task.cancelled() and task.exception() is not None:
+                # Background revalidations have no awaiting caller to report to
+                print(f"Error refreshing organization info: {task.exception()}")
+        return done
+
+    async def _fetch(self, key: str, token: str) -> OrganizationSnapshot:
+        previous = self._snapshots.get(key)
+        headers = {"Authorization": f"Bearer {token}"}
+        if previous is not None and previous.etag:
+            headers["If-None-Match"] = previous.etag
+        if previous is not None and previous.last_modified:
+            headers["If-Modified-Since"] = previous.last_modified
+
+        print(f"Fetching organization info from {self.url} with token: {token[:10]}...")
+        try:
+            response = await self.http.get(self.url, headers=headers)
+            if response.status_code in (401, 403):
+                # The token no longer grants access; forget what it could see
+                self._snapshots.pop(key, None)
+            if response.status_code == 304 and previous is not None:
+                self.not_modified += 1
+                previous.fetched_at = time.monotonic()
+                self._store(key, previous)
+                return previous
+            response.raise_for_status()
+            data = response.json()
+        except httpx.HTTPError as e:
+            raise ValueError(f"Failed to fetch organization info: {str(e)}")
+
+        snapshot = OrganizationSnapshot(
+            data,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified")
+        )
+        org = snapshot.get("organization") if isinstance(snapshot.get("organization"), Mapping) else snapshot
+        print(f"Organization {org.get('name', 'Unknown')}: {len(snapshot.users)} users")
+        self._store(key, snapshot)
+        return snapshot
+
+    def _store(self, key: str, snapshot: OrganizationSnapshot):
+        self._snapshots[key] = snapshot
+        self._snapshots.move_to_end(key)
+        while len(self._snapshots) > self.max_entries:
+            self._snapshots.popitem(last=False)
+
+    async def close(self):
+        tasks = list(self._inflight.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._snapshots),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+        }
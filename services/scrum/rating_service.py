@@ -1,34 +1,115 @@
-import requests
-from typing import Dict, Any, Optional
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+from config import settings
+from http_client import HttpClientPool
 
 
 class RatingService:
-    def __init__(self, base_url: str = "https://git.azed.kz/api/v1"):
-        self.base_url = base_url
+    """
+    Async, cached client for user ratings from the git service.
+
+    Lookups for an organization fan out concurrently, at most
+    RATING_CONCURRENCY at a time, and concurrent lookups of the same email
+    share one request. Ratings are cached for RATING_CACHE_TTL_SECONDS; after
+    that, for up to RATING_STALE_SECONDS more, the cached rating is returned
+    at once while a background request refreshes it.
+    """
 
-    def get_user_rating(self, email: str) -> Optional[Dict[str, Any]]:
+    def __init__(self, http: HttpClientPool = None, base_url: str = None, concurrency: int = None,
+                 ttl_seconds: int = None, stale_seconds: int = None, max_entries: int = None):
+        self.http = http or HttpClientPool()
+        self.base_url = base_url or settings.RATING_API_URL
+        self.ttl_seconds = settings.RATING_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.stale_seconds = settings.RATING_STALE_SECONDS if stale_seconds is None else stale_seconds
+        self.max_entries = max_entries or settings.RATING_CACHE_MAX_ENTRIES
+        self._semaphore = asyncio.Semaphore(concurrency or settings.RATING_CONCURRENCY)
+        # email -> (rating, fetched_at)
+        self._cache: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    async def get_user_rating(self, email: str) -> Optional[Dict[str, Any]]:
+        """Rating record for `email` from the git service, {} if it has none, or None on errors."""
+        url = f"{self.base_url}/users/{email}/rating"
         try:
-            url = f"{self.base_url}/users/{email}/rating"
-            response = requests.get(url, headers={"accept": "application/json"}, timeout=10)
+            async with self._semaphore:
+                response = await self.http.get(url, headers={"accept": "application/json"})
+            if response.status_code == 404:
+                return {}
             response.raise_for_status()
             return response.json()
-        except requests.RequestException as e:
+        except (httpx.HTTPError, ValueError) as e:
             print(f"Error fetching rating for {email}: {e}")
             return None
 
-    def get_ratings_for_users(self, users: list) -> Dict[str, int]:
-        ratings = {}
-        for user in users:
-            email = user.get("email")
-            if not email:
-                continue
-            
-            rating_data = self.get_user_rating(email)
-            if rating_data:
-                ratings[email] = rating_data.get("rating", 0)
-                print(f"Fetched rating for {email}: {ratings[email]}")
-            else:
-                ratings[email] = 0
-                print(f"No rating found for {email}, defaulting to 0")
-        
-        return ratings
\ No newline at end of file
+    async def get_rating(self, email: str) -> int:
+        cached = self._cache.get(email)
+        if cached is not None:
+            rating, fetched_at = cached
+            age = time.monotonic() - fetched_at
+            if age < self.ttl_seconds:
+                self.hits += 1
+                self._cache.move_to_end(email)
+                return rating
+            if age < self.ttl_seconds + self.stale_seconds:
+                self.stale_hits += 1
+                self._refresh(email)
+                return rating
+
+        self.misses += 1
+        rating = await asyncio.shield(self._refresh(email))
+        if rating is None:
+            print(f"No rating found for {email}, defaulting to 0")
+            return 0
+        return rating
+
+    async def get_ratings_for_users(self, users: list) -> Dict[str, int]:
+        emails = list(dict.fromkeys(user.get("email") for user in users if user.get("email")))
+        ratings = await asyncio.gather(*[self.get_rating(email) for email in emails])
+        return dict(zip(emails, ratings))
+
+    def _refresh(self, email: str) -> asyncio.Task:
+        """Fetch `email`'s rating into the cache, joining a request already in flight."""
+        task = self._inflight.get(email)
+        if task is None:
+            task = asyncio.create_task(self._fetch(email))
+            self._inflight[email] = task
+            task.add_done_callback(lambda _: self._inflight.pop(email, None))
+        return task
+
+    async def _fetch(self, email: str) -> Optional[int]:
+        rating_data = await self.get_user_rating(email)
+        if rating_data is None:
+            # Keep serving the previous rating, if any, until a fetch succeeds
+            cached = self._cache.get(email)
+            return cached[0] if cached else None
+
+        rating = rating_data.get("rating", 0)
+        self._cache[email] = (rating, time.monotonic())
+        self._cache.move_to_end(email)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return rating
+
+    async def close(self):
+        """Cancel background refreshes."""
+        tasks = list(self._inflight.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._cache),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "in_flight": len(self._inflight),
+        }
@@ -0,0 +1,313 @@
+import asyncio
+import heapq
+import math
+import re
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from config import settings
+from jira_sync import parse_updated
+from mongo_client import MongoClient
+
+_TOKEN = re.compile(r"\w+")
+
+# Issue fields indexed for search, with how many times each one counts
+ISSUE_FIELDS = (("key", 1), ("summary", 2), ("description", 1), ("status", 1), ("assignee", 1))
+
+# Status names treated as finished when an issue has no Jira status category
+DONE_STATUSES = {"done", "closed", "resolved"}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens; Jira keys like PROJ-12 also yield `proj-12` itself."""
+    text = (text or "").lower()
+    return _TOKEN.findall(text) + re.findall(r"\b[a-z][a-z0-9]*-\d+\b", text)
+
+
+def is_done(issue: Dict[str, Any]) -> bool:
+    """Whether an issue is finished, by Jira status category or, for older cache entries, status name."""
+    if issue.get("status_category"):
+        return issue["status_category"] == "done"
+    return str(issue.get("status") or "").casefold() in DONE_STATUSES
+
+
+def chat_line(issue: Dict[str, Any]) -> str:
+    """An issue as listed in the Jira context of a chat prompt."""
+    return f"- [{issue['key']}] {issue.get('summary')} ({issue.get('status')})\n"
+
+
+def detail_line(issue: Dict[str, Any]) -> str:
+    """An issue as listed for meeting analysis, with the start of its description."""
+    line = f"- [{issue['key']}] {issue.get('summary') or 'No summary'} (Status: {issue.get('status') or 'Unknown'})\n"
+    if issue.get("description"):
+        line += f"  Description: {str(issue['description'])[:200]}...\n"
+    return line
+
+
+def is_newer(issue: Dict[str, Any], other: Dict[str, Any]) -> bool:
+    """Whether `issue` was updated in Jira after `other`."""
+    updated, other_updated = parse_updated(issue.get("updated")), parse_updated(other.get("updated"))
+    return updated is not None and other_updated is not None and updated > other_updated
+
+
+def issue_terms(issue: Dict[str, Any]) -> Counter:
+    terms: Counter = Counter()
+    for field, weight in ISSUE_FIELDS:
+        value = issue.get(field)
+        if value:
+            for term in tokenize(value if isinstance(value, str) else str(value)):
+                terms[term] += weight
+    return terms
+
+
+class BM25Index:
+    """
+    In-memory inverted index over Jira issues, ranked with Okapi BM25.
+
+    Issues are keyed by their Jira key. `upsert` replaces one issue's
+    postings without touching the rest, so syncs update it incrementally,
+    and a search only visits the postings of the query's terms.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._lengths: Dict[str, int] = {}
+        self._issues: Dict[str, Dict[str, Any]] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._issues)
+
+    @property
+    def term_count(self) -> int:
+        return len(self._postings)
+
+    def issues(self) -> List[Dict[str, Any]]:
+        return list(self._issues.values())
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self._issues.get(key)
+
+    def upsert(self, issue: Dict[str, Any]):
+        key = issue.get("key")
+        if not key:
+            return
+        self.remove(key)
+        terms = issue_terms(issue)
+        for term, count in terms.items():
+            self._postings.setdefault(term, {})[key] = count
+        length = sum(terms.values())
+        self._lengths[key] = length
+        self._total_length += length
+        self._issues[key] = {field: value for field, value in issue.items() if field != "_id"}
+
+    def upsert_many(self, issues: Iterable[Dict[str, Any]]):
+        for issue in issues:
+            self.upsert(issue)
+
+    def remove(self, key: str):
+        if key not in self._issues:
+            return
+        for term in issue_terms(self._issues.pop(key)):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(key, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= self._lengths.pop(key)
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[float, Dict[str, Any]]]:
+        """Up to `k` (score, issue) pairs matching `query`, best first."""
+        if not self._issues:
+            return []
+        count = len(self._issues)
+        average_length = self._total_length / count or 1
+        scores: Dict[str, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for key, frequency in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[key] / average_length)
+                scores[key] = scores.get(key, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+        best = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+        return [(score, self._issues[key]) for key, score in best]
+
+    def recent(self, k: int = 10) -> List[Dict[str, Any]]:
+        """The `k` most recently updated issues."""
+        return sorted(self._issues.values(), key=lambda issue: str(issue.get("updated") or ""), reverse=True)[:k]
+
+
+class IssueSearch:
+    """
+    In-process snapshot of the `jira_cache` collection for prompt context.
+
+    Every cached issue is held in a BM25 index together with its rendered
+    prompt lines, so chat turns and meeting analysis build their Jira
+    context without a database round trip. The snapshot is loaded from
+    Mongo once, by startup warmup or else on first use, and then kept
+    current: the local Jira sync hands over the issues it cached through
+    `update`, and `start` follows what other replicas sync, from a change
+    stream on `jira_cache` where Mongo offers one (replica sets) or else by
+    checking the cache version the sync bumps every JIRA_SNAPSHOT_POLL_SECONDS
+    and loading the issues synced since the last look. A copy never replaces
+    a more recently updated one. `version` counts changes to the snapshot.
+    Mongo errors are logged and leave the snapshot as it is.
+    """
+
+    def __init__(self, mongo_client: MongoClient, index: BM25Index = None, poll_seconds: float = None,
+                 overlap_seconds: int = None):
+        self.mongo_client = mongo_client
+        self.index = index or BM25Index()
+        self.poll_seconds = poll_seconds or settings.JIRA_SNAPSHOT_POLL_SECONDS
+        # Covers clock skew between replicas and writes in flight at a refresh
+        self.overlap = timedelta(seconds=settings.JIRA_SYNC_OVERLAP_SECONDS if overlap_seconds is None else overlap_seconds)
+        self._lines: Dict[str, Tuple[str, str]] = {}
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._refreshed_at: Optional[datetime] = None
+        self.version = 0
+        self.cache_version: Optional[int] = None
+        self.mode: Optional[str] = None
+        self.refreshes = 0
+        self.searches = 0
+        self.fallbacks = 0
+
+    async def _ensure_loaded(self):
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded:
+                return
+            try:
+                cache_version = await self.mongo_client.get_jira_cache_version()
+                started = datetime.utcnow()
+                issues = await self.mongo_client.load_cached_issues()
+            except Exception as e:
+                print(f"Error loading Jira issues for search: {e}")
+                return
+            # Issues synced while loading are newer than the stored copies
+            fresh = self.index.issues()
+            self._apply(issues)
+            self._apply(fresh)
+            self.cache_version = cache_version
+            self._refreshed_at = started
+            self._loaded = True
+            print(f"Indexed {len(self.index)} cached Jira issues for search.")
+
+    def _apply(self, issues: Iterable[Dict[str, Any]]) -> int:
+        changed = 0
+        for issue in issues:
+            key = issue.get("key")
+            current = self.index.get(key) if key else None
+            if not key or (current is not None and is_newer(current, issue)):
+                continue
+            self.index.upsert(issue)
+            self._lines[key] = (chat_line(issue), detail_line(issue))
+            changed += 1
+        if changed:
+            self.version += 1
+        return changed
+
+    def update(self, issues: Iterable[Dict[str, Any]]):
+        """Index freshly synced issues, replacing earlier versions."""
+        self._apply(issues)
+
+    async def refresh(self) -> int:
+        """Load the issues synced by other replicas if the cache version moved; returns how many changed."""
+        if not self._loaded:
+            await self._ensure_loaded()
+            return 0
+        cache_version = await self.mongo_client.get_jira_cache_version()
+        if cache_version == self.cache_version:
+            return 0
+        started = datetime.utcnow()
+        issues = await self.mongo_client.load_cached_issues(synced_since=self._refreshed_at - self.overlap)
+        self.cache_version = cache_version
+        self._refreshed_at = started
+        self.refreshes += 1
+        return self._apply(issues)
+
+    def start(self):
+        """Load the snapshot and follow changes to `jira_cache` in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._follow())
+
+    async def _follow(self):
+        try:
+            # Opened before loading, so nothing synced in between is missed
+            async with self.mongo_client.watch_jira_cache() as stream:
+                self.mode = "change_stream"
+                await self._ensure_loaded()
+                async for change in stream:
+                    if change.get("fullDocument"):
+                        self._apply([change["fullDocument"]])
+        except Exception as e:
+            print(f"Following jira_cache by its version instead of a change stream: {e}")
+        self.mode = "polling"
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"Error refreshing Jira issues for search: {e}")
+            await asyncio.sleep(self.poll_seconds)
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def relevant(self, query: str, k: int = None) -> List[Dict[str, Any]]:
+        """
+        The `k` issues most relevant to `query` (CHAT_JIRA_TOP_K by default).
+
+        Falls back to the most recently updated issues when no issue shares
+        a term with the query, so a chat turn always gets some project context.
+        """
+        k = k or settings.CHAT_JIRA_TOP_K
+        await self._ensure_loaded()
+        self.searches += 1
+        hits = [issue for _, issue in self.index.search(query, k)]
+        if hits:
+            return hits
+        self.fallbacks += 1
+        return self.index.recent(k)
+
+    async def context(self, query: str, k: int = None) -> str:
+        """Jira context for a chat prompt: the issues most relevant to `query`."""
+        issues = await self.relevant(query, k)
+        return "Relevant Jira Issues:\n" + "".join(self._lines[issue["key"]][0] for issue in issues)
+
+    async def upcoming_context(self, k: int = 10) -> str:
+        """
+        The `k` open issues due soonest, overdue ones first, with descriptions.
+
+        Done issues are skipped. Issues without a due date fill the remaining
+        places, most recently updated first.
+        """
+        await self._ensure_loaded()
+        open_issues = [issue for issue in self.index.issues() if not is_done(issue)]
+        dated = [issue for issue in open_issues if issue.get("duedate")]
+        issues = heapq.nsmallest(k, dated, key=lambda issue: str(issue["duedate"]))
+        if len(issues) < k:
+            undated = (issue for issue in open_issues if not issue.get("duedate"))
+            issues += heapq.nlargest(k - len(issues), undated, key=lambda issue: str(issue.get("updated") or ""))
+        return "".join(self._lines[issue["key"]][1] for issue in issues)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "issues": len(self.index),
+            "terms": self.index.term_count,
+            "version": self.version,
+            "cache_version": self.cache_version,
+            "mode": self.mode,
+            "refreshes": self.refreshes,
+            "searches": self.searches,
+            "fallbacks": self.fallbacks,
+        }
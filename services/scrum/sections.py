@@ -0,0 +1,134 @@
+import re
+from typing import Any, Dict, List, Optional
+
+from token_budget import TokenBudget
+
+HEADING_RE = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+FENCE_RE = re.compile(r"^\s*(```|~~~)")
+
+# Tokens repeated between the pieces of a section too large for one request.
+SECTION_OVERLAP_TOKENS = 100
+
+
+class Section:
+    """A heading-delimited part of a parsed document."""
+
+    def __init__(self, title: Optional[str], level: int, text: str):
+        self.title = title
+        self.level = level
+        self.text = text
+
+
+def split_sections(text: str) -> List[Section]:
+    """
+    Split parsed document text on markdown headings.
+
+    Extraction renders docx heading styles and the PDF outline as markdown
+    headings, so this covers all supported formats. Text before the first
+    heading becomes an untitled section; headings inside code fences are ignored.
+    """
+    sections: List[Section] = []
+    title, level, lines = None, 0, []
+    in_fence = False
+
+    for line in text.splitlines():
+        if FENCE_RE.match(line):
+            in_fence = not in_fence
+        match = None if in_fence else HEADING_RE.match(line)
+        if match:
+            if lines and any(l.strip() for l in lines):
+                sections.append(Section(title, level, "\n".join(lines)))
+            title, level, lines = match.group(2), len(match.group(1)), []
+        lines.append(line)
+
+    if lines and any(l.strip() for l in lines):
+        sections.append(Section(title, level, "\n".join(lines)))
+    return sections
+
+
+async def pack_sections(sections: List[Section], token_budget: TokenBudget, max_tokens: int) -> List[str]:
+    """
+    Group sections into request-sized parts of at most `max_tokens` tokens.
+
+    Consecutive small sections are merged into one part; a section larger
+    than the budget is split on token boundaries, and each piece after the
+    first is prefixed with the section heading for context.
+    """
+    parts: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+
+    for section in sections:
+        tokens = await token_budget.count_async(section.text)
+        if tokens > max_tokens:
+            if current:
+                parts.append("\n\n".join(current))
+                current, current_tokens = [], 0
+            heading = f"{'#' * section.level} {section.title} (continued)\n" if section.title else ""
+            pieces = await token_budget.split_async(
+                section.text, max_tokens - token_budget.count(heading), SECTION_OVERLAP_TOKENS
+            )
+            parts.extend(pieces[:1] + [heading + piece for piece in pieces[1:]])
+            continue
+        if current and current_tokens + tokens > max_tokens:
+            parts.append("\n\n".join(current))
+            current, current_tokens = [], 0
+        current.append(section.text)
+        current_tokens += tokens
+
+    if current:
+        parts.append("\n\n".join(current))
+    return parts
+
+
+def _normalize(summary: Any) -> str:
+    return " ".join(re.sub(r"[^\w\s]", " ", str(summary or "")).casefold().split())
+
+
+def _complexity(value: Any) -> int:
+    """The LLM sometimes answers "3" or "high"; anything that is not a number counts as 0."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _merge_node(target: Dict[str, Any], other: Dict[str, Any]):
+    if not target.get("description") and other.get("description"):
+        target["description"] = other["description"]
+    if other.get("complexity") is not None:
+        target["complexity"] = max(_complexity(target.get("complexity")), _complexity(other["complexity"]))
+    skills = list(target.get("required_skills") or [])
+    for skill in other.get("required_skills") or []:
+        if skill not in skills:
+            skills.append(skill)
+    if skills:
+        target["required_skills"] = skills
+    for children in ("stories", "subtasks"):
+        if other.get(children):
+            target[children] = merge_nodes((target.get(children) or []) + other[children])
+
+
+def merge_nodes(nodes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Merge nodes with the same summary (ignoring case and punctuation), keeping first-seen order."""
+    merged: Dict[str, Dict[str, Any]] = {}
+    result = []
+    for node in nodes:
+        if not isinstance(node, dict):
+            continue
+        key = _normalize(node.get("summary"))
+        if key and key in merged:
+            _merge_node(merged[key], node)
+            continue
+        if key:
+            merged[key] = node
+        for children in ("stories", "subtasks"):
+            if node.get(children):
+                node[children] = merge_nodes(node[children])
+        result.append(node)
+    return result
+
+
+def merge_forests(forests: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Combine per-section Epic/Story/Subtask forests, de-duplicating repeated items."""
+    return merge_nodes([epic for forest in forests for epic in forest])
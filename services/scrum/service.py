@@ -1,168 +1,181 @@
-import io
+import copy
 import json
 import asyncio
-from typing import List, Dict, Any, Optional
+from datetime import datetime
+from typing import TYPE_CHECKING, AsyncIterator, List, Dict, Any, Optional
 from fastapi import UploadFile
-import docx
-import pypdf
-import requests
+import httpx
 
-from openai import AsyncAzureOpenAI
 from config import settings
+from openai_client import LazyAzureOpenAI
 
-import tiktoken
+from assignment import assign_tree
 from rating_service import RatingService
+from organization_cache import OrganizationCache, OrganizationSnapshot
 from mongo_client import MongoClient
+from search_index import IssueSearch
+from jira_sync import JiraSyncWorker
+from chat_history import ChatHistoryManager
+from message_buffer import ChatMessageBuffer
+from http_client import HttpClientPool
+from ingestion import SpooledDocument, spool_upload
+from extraction import DocumentExtractor
+from document_cache import DocumentTextCache, document_cache_key
+from token_budget import TokenBudget
+from summarizer import MapReduceSummarizer
+from sections import merge_forests, pack_sections, split_sections
+from decomposition_cache import DecompositionCache, decomposition_cache_key
+from json_stream import EpicStreamParser
+from jira_scheduler import JiraCreationScheduler, RateLimiterRegistry
+from jira_jobs import JiraJobJournal, JiraJobStore, jira_job_key, organization_scope
+
+if TYPE_CHECKING:
+    from openai import AsyncAzureOpenAI
 
 class JiraScrumMasterService:
-    def __init__(self):
-        self.client = AsyncAzureOpenAI(
-            azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
-            api_key=settings.AZURE_OPENAI_API_KEY,
-            api_version=settings.API_VERSION
-        )
-        self.rating_service = RatingService()
-        self.mongo_client = MongoClient()
+    def __init__(self, client: "AsyncAzureOpenAI" = None, mongo_client: MongoClient = None,
+                 http: HttpClientPool = None, token_budget: TokenBudget = None):
+        self.client = client or LazyAzureOpenAI()
+        self.mongo_client = mongo_client or MongoClient()
+        self.http = http or HttpClientPool()
+        self.rating_service = RatingService(self.http)
+        self.organization_cache = OrganizationCache(self.http)
+        self.extractor = DocumentExtractor()
+        self.document_cache = DocumentTextCache(self.mongo_client)
+        self.decomposition_cache = DecompositionCache(self.mongo_client)
+        self.token_budget = token_budget or TokenBudget()
+        self.summarizer = MapReduceSummarizer(self.client, self.token_budget)
+        self.decompose_semaphore = asyncio.Semaphore(settings.DECOMPOSE_CONCURRENCY)
+        self.jira_semaphore = asyncio.Semaphore(settings.JIRA_MAX_CONCURRENCY)
+        self.jira_rate_limiters = RateLimiterRegistry()
+        self.jira_bulk_supported = settings.JIRA_BULK_BATCH_SIZE > 1
+        self.jira_bulk_confirmed = False
+        self.jira_jobs = JiraJobStore(self.mongo_client)
+        self.issue_search = IssueSearch(self.mongo_client)
+        self.jira_sync = JiraSyncWorker(self.http, self.mongo_client, on_issues=self.issue_search.update)
+        self.message_buffer = ChatMessageBuffer(self.mongo_client)
+        self.chat_history = ChatHistoryManager(self.mongo_client, self.client, self.token_budget,
+                                               buffer=self.message_buffer)
+        # Critical dependencies, as reported by /ready
+        self.readiness = {
+            "tokenizer": self.token_budget.loaded,
+            "openai": getattr(self.client, "loaded", True),
+            "mongo": False
+        }
+        self._warmup: Optional[asyncio.Task] = None
+
+    async def close(self):
+        """Release worker pools and pooled connections held by the service."""
+        if self._warmup is not None:
+            self._warmup.cancel()
+            await asyncio.gather(self._warmup, return_exceptions=True)
+        self.extractor.shutdown()
+        await self.jira_sync.close()
+        await self.issue_search.close()
+        await self.rating_service.close()
+        await self.organization_cache.close()
+        await self.chat_history.close()
+        await self.message_buffer.close()
+        await self.http.aclose()
 
     async def parse_file(self, file: UploadFile) -> str:
-        content = await file.read()
-        file_ext = file.filename.split('.')[-1].lower()
-
-        if file_ext == 'docx':
-            return self._parse_docx(content)
-        elif file_ext == 'pdf':
-            return self._parse_pdf(content)
-        elif file_ext == 'md':
-            return self._parse_md(content)
-        else:
-            raise ValueError(f"Unsupported file type: {file_ext}")
-
-    def _parse_docx(self, content: bytes) -> str:
-        doc = docx.Document(io.BytesIO(content))
-        return "\n".join([para.text for para in doc.paragraphs])
-
-    def _parse_pdf(self, content: bytes) -> str:
-        pdf_reader = pypdf.PdfReader(io.BytesIO(content))
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
+        with await spool_upload(file) as document:
+            return await self.parse_document(document)
+
+    async def parse_document(self, document: SpooledDocument) -> str:
+        """Text of a spooled upload, from the document cache or freshly extracted."""
+        key = document_cache_key(document)
+        text = await self.document_cache.get(key)
+        if text is None:
+            text = await self.extractor.extract(document)
+            await self.document_cache.put(key, text)
         return text
 
-    def _parse_md(self, content: bytes) -> str:
-        return content.decode('utf-8')
+    def stats(self) -> Dict[str, Any]:
+        """Cache counters exposed by the /stats endpoint."""
+        return {
+            "document_cache": self.document_cache.stats(),
+            "decomposition_cache": self.decomposition_cache.stats(),
+            "ratings": self.rating_service.stats(),
+            "organizations": self.organization_cache.stats(),
+            "issue_search": self.issue_search.stats(),
+            "jira_sync": self.jira_sync.stats(),
+            "chat_history": self.chat_history.stats(),
+            "chat_writes": self.message_buffer.stats()
+        }
 
     def count_tokens(self, text: str) -> int:
-        encoding = tiktoken.encoding_for_model("gpt-4") # Use gpt-4 encoding as approximation
-        return len(encoding.encode(text))
+        return self.token_budget.count(text)
 
-    async def summarize_text(self, text: str) -> str:
-        prompt = f"""
-        Summarize the following technical document, retaining all key requirements, constraints, and architectural details.
-        The summary should be detailed enough to be used for task decomposition.
-        
-        Document Content:
-        {text[:50000]} # Truncate to safe limit for summarization request
+    async def summarize_text(self, text: str, target_tokens: int = None) -> str:
+        """Summarize the whole document down to `target_tokens` (the decomposition budget by default)."""
+        return await self.summarizer.summarize(text, target_tokens or settings.DECOMPOSE_INPUT_TOKENS)
+
+    async def get_organization_info(self, token: str) -> OrganizationSnapshot:
+        """Organization of the token's user, with user skills derived, from the organization cache."""
+        return await self.organization_cache.get(token)
+
+    async def decompose_tasks(self, text: str, use_cache: bool = True) -> List[Dict[str, Any]]:
         """
-        
-        response = await self.client.chat.completions.create(
-            model=settings.AZURE_OPENAI_DEPLOYMENT_NAME,
-            messages=[
-                {"role": "system", "content": "You are a helpful technical assistant."},
-                {"role": "user", "content": prompt}
-            ]
-        )
-        return response.choices[0].message.content
+        Decompose a document into Epics/Stories/Subtasks.
 
-    async def get_organization_info(self, token: str) -> Dict[str, Any]:
-        # Call the real backend API to get organization info
-        import requests
-        
-        url = f"{settings.BACKEND_API_URL}/organization"
-        headers = {
-            "Authorization": f"Bearer {token}"
-        }
-        
-        print(f"Fetching organization info from {url} with token: {token[:10]}...")
-        
-        try:
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-            org_data = response.json()
-            
-            # Log organization info in the requested format
-            # Log organization info in the requested format
-            # If org_data already has "organization" key, use it directly, otherwise wrap it
-            if "organization" in org_data and isinstance(org_data["organization"], dict):
-                log_data = org_data
-            else:
-                log_data = {"organization": org_data}
-            
-            print(json.dumps(log_data, indent=2))
-            
-            # Derive skills from job titles since backend doesn't provide them
-            for user in org_data.get("users", []):
-                if "skills" not in user:
-                    job = user.get("job", "").lower()
-                    skills = []
-                    
-                    # Backend/Server skills
-                    if any(word in job for word in ["backend", "server", "api"]):
-                        skills.extend(["Backend", "API", "Python", "FastAPI", "SQL", "Database"])
-                    
-                    # Frontend skills
-                    if any(word in job for word in ["frontend", "ui", "ux"]):
-                        skills.extend(["Frontend", "UI", "UX", "React", "TypeScript", "CSS"])
-                    
-                    # Mobile skills
-                    if any(word in job for word in ["mobile", "ios", "android", "app"]):
-                        skills.extend(["Mobile", "iOS", "Android", "Swift", "Kotlin"])
-                    
-                    # DevOps/Infrastructure
-                    if any(word in job for word in ["devops", "infrastructure", "cloud"]):
-                        skills.extend(["DevOps", "AWS", "Docker", "Kubernetes", "CI/CD"])
-                    
-                    # QA/Testing
-                    if any(word in job for word in ["qa", "test", "quality"]):
-                        skills.extend(["Testing", "QA", "Automation", "Selenium"])
-                    
-                    # Data/Analytics
-                    if any(word in job for word in ["data", "analytics", "ml", "ai"]):
-                        skills.extend(["Data", "Analytics", "ML", "Python", "SQL"])
-                    
-                    # Security
-                    if any(word in job for word in ["security", "auth"]):
-                        skills.extend(["Security", "Authentication", "Encryption"])
-                    
-                    # Senior/Lead positions get architecture skills
-                    if any(word in job for word in ["senior", "lead", "principal", "architect"]):
-                        skills.extend(["Architecture", "Design", "Leadership"])
-                    
-                    # General engineering skills
-                    if any(word in job for word in ["engineer", "developer", "programmer"]):
-                        skills.extend(["Programming", "Development"])
-                    
-                    user["skills"] = list(set(skills))  # Remove duplicates
-                    # print(f"Derived skills for {user.get('name')} {user.get('surname')} ({job}): {user['skills']}")
-            
-            return org_data
-        except requests.RequestException as e:
-            print(f"Error fetching organization info: {e}")
-            raise ValueError(f"Failed to fetch organization info: {str(e)}")
-
-    async def decompose_tasks(self, text: str) -> List[Dict[str, Any]]:
-        token_count = self.count_tokens(text)
-        print(f"Token count: {token_count}")
+        Results are cached per document, prompt version and deployment;
+        `use_cache=False` skips the lookup and refreshes the cached entry.
+        """
+        return [epic async for epic in self.decompose_tasks_stream(text, use_cache)]
+
+    async def decompose_tasks_stream(self, text: str, use_cache: bool = True) -> AsyncIterator[Dict[str, Any]]:
+        """Like `decompose_tasks`, but yields each Epic as soon as it is complete."""
+        cache_key = decomposition_cache_key(text)
+        if use_cache:
+            cached = await self.decomposition_cache.get(cache_key)
+            if cached is not None:
+                print("Using cached decomposition")
+                for epic in cached:
+                    yield epic
+                return
+        else:
+            self.decomposition_cache.record_bypass()
+
+        print(f"Estimated token count: {self.token_budget.estimate(text)}")
         
-        if token_count > 100000:
-            print("Token count > 100k, summarizing...")
+        if await self.token_budget.exceeds(text, settings.SUMMARIZE_THRESHOLD_TOKENS):
+            print(f"Token count > {settings.SUMMARIZE_THRESHOLD_TOKENS}, summarizing...")
             text = await self.summarize_text(text)
-            
-        prompt = f"""
+
+        tasks = []
+        if not await self.token_budget.exceeds(text, settings.DECOMPOSE_INPUT_TOKENS):
+            async for epic in self._decompose_part_stream(text):
+                tasks.append(epic)
+                yield copy.deepcopy(epic)
+        else:
+            # Too long for one request: decompose each section and merge the results
+            parts = await pack_sections(split_sections(text), self.token_budget, settings.DECOMPOSE_INPUT_TOKENS)
+            print(f"Decomposing {len(parts)} document sections concurrently...")
+            forests = await asyncio.gather(*[
+                self._decompose_part(part, section=(i + 1, len(parts)))
+                for i, part in enumerate(parts)
+            ])
+            tasks = merge_forests(forests)
+            for epic in tasks:
+                yield copy.deepcopy(epic)
+
+        if tasks:
+            await self.decomposition_cache.put(cache_key, tasks)
+
+    def _decompose_prompt(self, text: str, section: Optional[tuple] = None) -> str:
+        section_note = ""
+        if section:
+            section_note = (
+                f"\n        This is part {section[0]} of {section[1]} of a larger document; the other parts are decomposed separately."
+                f"\n        Decompose ONLY the content of this part.\n"
+            )
+        return f"""
         You are an expert Scrum Master and Technical Project Manager.
         Analyze the following project document and decompose it into a hierarchy of Epics, Stories, and Subtasks.
         The document might be in Russian or English. Output the tasks in the SAME LANGUAGE as the document.
         
-        Structure the output as a JSON list of Epics. Each Epic should have a list of 'stories', and each Story should have a list of 'subtasks'.
+        Structure the output as a JSON object with a single key "epics" holding the list of Epics. Each Epic should have a list of 'stories', and each Story should have a list of 'subtasks'.
         
         For each item (Epic, Story, Subtask), provide:
         - summary: A concise title.
@@ -179,142 +192,258 @@ class JiraScrumMasterService:
         Use BROAD skill categories that match common job roles, not specific technologies.
         
         Example structure:
-        [
-            {{
-                "summary": "Epic Title",
-                "type": "Epic",
-                "complexity": 8,
-                "required_skills": ["Backend", "Architecture"],
-                "stories": [
-                    {{
-                        "summary": "Story Title",
-                        "type": "Story",
-                        "complexity": 6,
-                        "required_skills": ["Backend"],
-                        "subtasks": [
-                            {{ 
-                                "summary": "Subtask Title", 
-                                "type": "Subtask", 
-                                "complexity": 3,
-                                "required_skills": ["Python"] 
-                            }}
-                        ]
-                    }}
-                ]
-            }}
-        ]
-
-        Return ONLY the JSON array.
+        {{
+            "epics": [
+                {{
+                    "summary": "Epic Title",
+                    "type": "Epic",
+                    "complexity": 8,
+                    "required_skills": ["Backend", "Architecture"],
+                    "stories": [
+                        {{
+                            "summary": "Story Title",
+                            "type": "Story",
+                            "complexity": 6,
+                            "required_skills": ["Backend"],
+                            "subtasks": [
+                                {{ 
+                                    "summary": "Subtask Title", 
+                                    "type": "Subtask", 
+                                    "complexity": 3,
+                                    "required_skills": ["Python"] 
+                                }}
+                            ]
+                        }}
+                    ]
+                }}
+            ]
+        }}
 
+        Return ONLY the JSON object.
+        {section_note}
         Document Content:
-        {text[:10000]}
+        {text}
         """
 
-        response = await self.client.chat.completions.create(
-            model=settings.AZURE_OPENAI_DEPLOYMENT_NAME,
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant that outputs JSON."},
-                {"role": "user", "content": prompt}
-            ],
-            response_format={"type": "json_object"}
-        )
-
-        result = response.choices[0].message.content
+    async def _decompose_part(self, text: str, section: Optional[tuple] = None) -> List[Dict[str, Any]]:
+        prompt = self._decompose_prompt(text, section)
+
+        async with self.decompose_semaphore:
+            response = await self.client.chat.completions.create(
+                model=settings.AZURE_OPENAI_DEPLOYMENT_NAME,
+                messages=[
+                    {"role": "system", "content": "You are a helpful assistant that outputs JSON."},
+                    {"role": "user", "content": prompt}
+                ],
+                response_format={"type": "json_object"}
+            )
+
+        return self._parse_decomposition(response.choices[0].message.content)
+
+    async def _decompose_part_stream(self, text: str) -> AsyncIterator[Dict[str, Any]]:
+        """Stream one decomposition request, yielding Epics as their JSON objects close."""
+        parser = EpicStreamParser()
+        async with self.decompose_semaphore:
+            response = await self.client.chat.completions.create(
+                model=settings.AZURE_OPENAI_DEPLOYMENT_NAME,
+                messages=[
+                    {"role": "system", "content": "You are a helpful assistant that outputs JSON."},
+                    {"role": "user", "content": self._decompose_prompt(text)}
+                ],
+                response_format={"type": "json_object"},
+                stream=True
+            )
+            async for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    for epic in parser.feed(chunk.choices[0].delta.content):
+                        yield epic
+
+        if parser.emitted == 0:
+            # Not wrapped as the prompt asks (e.g. another key or a single Epic);
+            # fall back to the full parse, which loses the streaming
+            epics = self._parse_decomposition(parser.text)
+            if epics:
+                print(f"WARNING: decomposition did not use the \"epics\" key; "
+                      f"{len(epics)} Epic(s) were parsed only after the response completed")
+            for epic in epics:
+                yield epic
+
+    def _parse_decomposition(self, result: str) -> List[Dict[str, Any]]:
         try:
             parsed = json.loads(result)
             if isinstance(parsed, dict) and "epics" in parsed:
                 return parsed["epics"]
             if isinstance(parsed, list):
                 return parsed
+            if "stories" in parsed or "summary" in parsed:
+                # A single Epic; its own lists (stories, skills) are not Epics
+                return [parsed]
             # Handle wrapper keys
             for key, value in parsed.items():
-                if isinstance(value, list):
+                if isinstance(value, list) and all(isinstance(item, dict) for item in value):
                     return value
             return [parsed]
         except json.JSONDecodeError:
             print(f"Failed to parse JSON: {result}")
             return []
 
-    def assign_tasks(self, tasks: List[Dict[str, Any]], organization: Dict[str, Any]) -> List[Dict[str, Any]]:
+    async def assign_tasks(self, tasks: List[Dict[str, Any]], organization: Dict[str, Any]) -> List[Dict[str, Any]]:
+        ratings = await self.rate_users(organization)
+        return self._assign_rated(tasks, organization, ratings)
+
+    async def rate_users(self, organization: Dict[str, Any]) -> Dict[str, int]:
+        """
+        Fetch ratings for the organization's users.
+
+        Returns:
+            Rating per user email. Ratings are kept out of the organization
+            because cached organization snapshots are shared and read-only.
+        """
         users = organization.get("users", [])
         
         # print(f"\n=== Assignment Debug ===")
         # print(f"Organization: {organization.get('name', 'Unknown')}")
         # print(f"Number of users: {len(users)}")
         
-        user_ratings = self.rating_service.get_ratings_for_users(users)
-        
-        for user in users:
-            email = user.get('email')
-            rating = user_ratings.get(email, 0)
-            user['rating'] = rating
-            # print(f"  - {user.get('name', '')} {user.get('surname', '')}: skills={user.get('skills', [])}, rating={rating}")
-        
-        def find_best_match(required_skills, complexity):
-            candidates = []
-            
-            # print(f"\nFinding match for skills: {required_skills}, complexity: {complexity}")
-            
-            for user in users:
-                user_skills = set(user.get("skills", []))
-                overlap = len(set(required_skills).intersection(user_skills))
-                
-                if overlap > 0:
-                    rating = user.get('rating', 0)
-                    score = overlap * 10 + rating / 100
-                    
-                    candidates.append({
-                        'user': user,
-                        'overlap': overlap,
-                        'rating': rating,
-                        'score': score
-                    })
-                    
-                    # print(f"  - {user.get('name')} {user.get('surname')}: {overlap} skill matches, rating={rating}, score={score:.2f}")
-            
-            if not candidates:
-                # print(f"  -> No match found")
-                return None
-            
-            candidates.sort(key=lambda x: (-x['overlap'], -x['rating']))
-            
-            complexity_threshold = 7
-            if complexity >= complexity_threshold:
-                high_rated = [c for c in candidates if c['rating'] >= 300]
-                if high_rated:
-                    best = high_rated[0]['user']
-                    # print(f"  -> Complex task (>={complexity_threshold}): assigned to high-rated user {best.get('name')} {best.get('surname')} (rating={best.get('rating')})")
-                    return best
-            
-            best = candidates[0]['user']
-            # print(f"  -> Best match: {best.get('name')} {best.get('surname')} (overlap={candidates[0]['overlap']}, rating={best.get('rating')})")
-            return best
+        return await self.rating_service.get_ratings_for_users(users)
+
+    def _assign_rated(self, tasks: List[Dict[str, Any]], organization: Dict[str, Any],
+                      ratings: Dict[str, int]) -> List[Dict[str, Any]]:
+        """Assign tasks to the organization's users given their `ratings` from `rate_users`."""
+        return assign_tree(tasks, organization, ratings)
 
-        def process_item(item):
-            complexity = item.get("complexity", 5)
-            
-            if "required_skills" in item:
-                assignee = find_best_match(item["required_skills"], complexity)
-                item["assignee"] = f"{assignee['name']} {assignee['surname']}" if assignee else "Unassigned"
-                if assignee:
-                    item["assignee_rating"] = assignee.get('rating', 0)
-                    item["assignee_email"] = assignee.get('email')
-            
-            if "stories" in item:
-                item["stories"] = [process_item(story) for story in item["stories"]]
-            
-            if "subtasks" in item:
-                item["subtasks"] = [process_item(subtask) for subtask in item["subtasks"]]
-                
-            return item
 
-        return [process_item(task) for task in tasks]
+    async def decompose_pipeline(self, text: str, organization: Dict[str, Any], token: str,
+                                 use_cache: bool = True) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Decompose, assign and create Jira issues as one streaming pipeline.
+
+        Each Epic is assigned and sent to Jira as soon as the model finishes
+        it, while later Epics are still being generated. Yields progress
+        events; the last one is {"event": "completed", "tasks": [...]}.
+
+        The run is journaled as a Jira batch job keyed by the document and the
+        organization. Resubmitting the document resumes an unfinished job,
+        skipping the LLM once the decomposition was journaled and creating
+        only the missing issues; a completed job is answered from the journal.
+        `use_cache=False` starts a fresh job.
+        """
+        key = jira_job_key(text, organization_scope(organization, token))
+        async with self.jira_jobs.lock(key):
+            journal = await self.jira_jobs.open(key, reset=not use_cache)
+            if journal and journal.status == "completed":
+                print(f"Jira job {key} already completed; returning journaled issues.")
+                yield {"event": "completed", "tasks": journal.tasks}
+                return
+            async for event in self._run_pipeline(text, organization, token, use_cache, journal):
+                yield event
+
+    async def _run_pipeline(self, text: str, organization: Dict[str, Any], token: str, use_cache: bool,
+                            journal: Optional[JiraJobJournal]) -> AsyncIterator[Dict[str, Any]]:
+        events: asyncio.Queue = asyncio.Queue()
+        epics: asyncio.Queue = asyncio.Queue()
+
+        async def decompose():
+            try:
+                if journal and journal.decomposed:
+                    print(f"Resuming Jira job {journal.key} from its journaled decomposition.")
+                    for index, epic in enumerate(journal.tasks, 1):
+                        await events.put({"event": "epic_decomposed", "index": index, "summary": epic.get("summary")})
+                        await epics.put(epic)
+                    return
+
+                rated = asyncio.ensure_future(self.rate_users(organization))
+                decomposed = []
+                async for epic in self.decompose_tasks_stream(text, use_cache):
+                    self._assign_rated([epic], organization, await rated)
+                    decomposed.append(epic)
+                    await events.put({"event": "epic_decomposed", "index": len(decomposed), "summary": epic.get("summary")})
+                    await epics.put(epic)
+                await rated
+                if journal:
+                    await journal.save_tasks(decomposed)
+            finally:
+                await epics.put(None)
+
+        scheduler = None
+
+        async def create():
+            nonlocal scheduler
+            scheduler = self.jira_scheduler(token, await self.get_active_sprint(token), journal)
+
+            async def create_tree(epic):
+                created = await scheduler.create_item(epic)
+                await events.put({
+                    "event": "epic_created" if created else "epic_failed",
+                    "summary": epic.get("summary"),
+                    "jira_key": epic.get("jira_key")
+                })
+                return created
 
+            pending = []
+            while (epic := await epics.get()) is not None:
+                pending.append((epic, asyncio.ensure_future(create_tree(epic))))
+            try:
+                results = await asyncio.gather(*[task for _, task in pending])
+            finally:
+                await scheduler.finish()
+            return [epic for (epic, _), created in zip(pending, results) if created]
+
+        async def run():
+            try:
+                _, created_items = await asyncio.gather(decompose(), create())
+                if journal:
+                    await self._finish_job(journal, scheduler, created_items)
+                await events.put({"event": "completed", "tasks": created_items})
+            except Exception as e:
+                if journal:
+                    await journal.fail(str(e))
+                raise
+            finally:
+                await events.put(None)
+
+        runner = asyncio.create_task(run())
+        try:
+            while (event := await events.get()) is not None:
+                yield event
+            await runner
+        finally:
+            if not runner.done():
+                runner.cancel()
+
+    def describe_progress(self, event: Dict[str, Any]) -> str:
+        """Human-readable line for a `decompose_pipeline` progress event."""
+        if event["event"] == "epic_decomposed":
+            return f"Epic {event['index']} decomposed: {event['summary']}"
+        if event["event"] == "epic_created":
+            return f"Created {event['jira_key']} {event['summary']} in Jira"
+        if event["event"] == "epic_failed":
+            return f"Failed to create {event['summary']} in Jira"
+        return event["event"]
 
     async def create_jira_tasks(self, tasks: List[Dict[str, Any]], token: str) -> List[Dict[str, Any]]:
-        created_items = []
-        created_issue_keys = []  # Track all created issue keys
-        
+        """
+        Create an assigned forest in Jira and move the new issues to the active sprint.
+
+        The batch is journaled as a Jira job keyed by its content and token, so
+        submitting it again resumes where a failed attempt stopped and a
+        completed batch returns the issues it already created.
+        """
+        key = jira_job_key(json.dumps(tasks, sort_keys=True, default=str), f"token:{token}")
+        async with self.jira_jobs.lock(key):
+            journal = await self.jira_jobs.open(key)
+            if journal and journal.status == "completed":
+                print(f"Jira job {key} already completed; returning journaled issues.")
+                return journal.tasks
+            try:
+                return await self._create_jira_batch(tasks, token, journal)
+            except Exception as e:
+                if journal:
+                    await journal.fail(str(e))
+                raise
+
+    async def _create_jira_batch(self, tasks: List[Dict[str, Any]], token: str,
+                                 journal: Optional[JiraJobJournal]) -> List[Dict[str, Any]]:
         print("\n" + "="*80)
         print("[JIRA INTEGRATION] Starting Batch Creation")
         print("="*80)
@@ -326,73 +455,16 @@ class JiraScrumMasterService:
         else:
             print("[INFO] No active sprint found. Issues will remain in backlog.")
         
-        for item in tasks:
-            try:
-                # 1. Create the main item (Epic or Task)
-                summary = item.get('summary', 'Untitled')
-                item_type = item.get('type', 'Task')
-                assignee_email = item.get('assignee_email')
-                
-                jira_res = None
-                due_date = item.get('due_date')  # Get due_date if present
-                
-                if item_type == 'Epic':
-                    jira_res = await self.create_epic(summary, token)
-                else:
-                    # Story or Task
-                    jira_res = await self.create_task(summary, assignee_email=assignee_email, due_date=due_date, token=token)
-                    # Collect issue keys for sprint assignment (non-Epics only)
-                    if jira_res and jira_res.get('key'):
-                        created_issue_keys.append(jira_res.get('key'))
-                
-                if jira_res:
-                    item['jira_key'] = jira_res.get('key')
-                    item['jira_id'] = jira_res.get('id')
-                    item['jira_link'] = jira_res.get('self')
-                
-                # 2. Process Stories (if this is an Epic)
-                if 'stories' in item:
-                    for story in item['stories']:
-                        story_summary = story.get('summary', 'Untitled Story')
-                        story_assignee = story.get('assignee_email')
-                        
-                        # Create Story/Task
-                        story_due_date = story.get('due_date')
-                        story_res = await self.create_task(story_summary, assignee_email=story_assignee, due_date=story_due_date, token=token)
-                        
-                        # Collect story keys for sprint assignment
-                        if story_res and story_res.get('key'):
-                            created_issue_keys.append(story_res.get('key'))
-                        
-                        story['jira_key'] = story_res.get('key')
-                        story['jira_id'] = story_res.get('id')
-                        story['jira_link'] = story_res.get('self')
-                        
-                        # 3. Process Subtasks for this Story
-                        if 'subtasks' in story:
-                            for subtask in story['subtasks']:
-                                sub_summary = subtask.get('summary', 'Untitled Subtask')
-                                await self.create_subtask(sub_summary, parent_key=story_res.get('key'), token=token)
-                
-                # 3. Process Subtasks (if this item has direct subtasks)
-                if 'subtasks' in item and item_type != 'Epic':
-                     for subtask in item['subtasks']:
-                        sub_summary = subtask.get('summary', 'Untitled Subtask')
-                        # Only create subtask if we have a parent key
-                        if item.get('jira_key'):
-                            await self.create_subtask(sub_summary, parent_key=item['jira_key'], token=token)
-                            
-                created_items.append(item)
-                
-            except Exception as e:
-                print(f"âŒ ERROR processing item {item.get('summary')}: {str(e)}")
-                # Continue with next item instead of failing everything
-                continue
-                
-        # Move all created issues to active sprint
-        if active_sprint_id and created_issue_keys:
-            print(f"\n[INFO] Moving {len(created_issue_keys)} issues to sprint {active_sprint_id}...")
-            await self.move_issues_to_sprint(active_sprint_id, created_issue_keys, token)
+        # Epics, Stories and Subtasks are created concurrently as their parents
+        # exist; created issues are moved to the sprint in chunks along the way
+        scheduler = self.jira_scheduler(token, active_sprint_id, journal)
+        created_items = await scheduler.run(tasks)
+        if active_sprint_id and scheduler.created_issue_keys:
+            print(f"\n[INFO] Moved {len(scheduler.created_issue_keys)} issues to sprint {active_sprint_id}")
+        if scheduler.reused:
+            print(f"[INFO] Reused {scheduler.reused} issues created by an earlier attempt")
+        if journal:
+            await self._finish_job(journal, scheduler, created_items)
         
         print("\n" + "="*80)
         print("[JIRA INTEGRATION] Batch Creation Completed")
@@ -400,6 +472,24 @@ class JiraScrumMasterService:
         
         return created_items
 
+    def jira_scheduler(self, token: str, sprint_id: Optional[int],
+                       journal: Optional[JiraJobJournal] = None) -> JiraCreationScheduler:
+        """Scheduler for one batch, sharing the service-wide concurrency cap and the token's rate limit."""
+        return JiraCreationScheduler(
+            self, token, sprint_id,
+            semaphore=self.jira_semaphore,
+            rate_limiter=self.jira_rate_limiters.get(token),
+            journal=journal
+        )
+
+    async def _finish_job(self, journal: JiraJobJournal, scheduler: JiraCreationScheduler,
+                          created_items: List[Dict[str, Any]]):
+        """Mark a job completed, or failed if some issues are still missing so a retry creates them."""
+        if scheduler.failed:
+            await journal.fail(f"{scheduler.failed} issues could not be created")
+        else:
+            await journal.complete(created_items)
+
     async def create_epic(self, summary: str, token: str) -> Dict[str, Any]:
         """
         Create an epic in Jira.
@@ -428,7 +518,7 @@ class JiraScrumMasterService:
         print(f"Token: {token[:10]}..." if len(token) > 10 else f"Token: {token}")
         
         try:
-            response = requests.post(url, headers=headers, json=payload, timeout=10)
+            response = await self.http.post(url, headers=headers, json=payload)
             print(f"\nResponse Status: {response.status_code}")
             print(f"Response Body: {response.text}")
             
@@ -441,7 +531,7 @@ class JiraScrumMasterService:
             print(f"   - URL: {result.get('self', 'N/A')}")
             print("="*80 + "\n")
             return result
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             print(f"\nâŒ ERROR: Failed to create epic")
             print(f"   Error: {str(e)}")
             if hasattr(e, 'response') and e.response is not None:
@@ -451,7 +541,7 @@ class JiraScrumMasterService:
             raise ValueError(f"Failed to create epic: {str(e)}")
 
     async def create_task(self, summary: str, assignee_account_id: str = None, 
-                         assignee_email: str = None, due_date: str = None, token: str = None) -> Dict[str, Any]:
+                     assignee_email: str = None, due_date: str = None, token: str =  None) -> Dict[str, Any]:
         """
         Create a task (issue) in Jira.
         
@@ -469,16 +559,7 @@ class JiraScrumMasterService:
             "Authorization": f"Bearer {token}",
             "Content-Type": "application/json"
         }
-        payload = {
-            "summary": summary
-        }
-        
-        if assignee_account_id:
-            payload["assigneeAccountId"] = assignee_account_id
-        if assignee_email:
-            payload["assigneeEmail"] = assignee_email
-        if due_date:
-            payload["dueDate"] = due_date
+        payload = self.task_payload(summary, assignee_account_id, assignee_email, due_date)
         
         print("\n" + "="*80)
         print("[JIRA API] Creating Task (Issue)")
@@ -488,7 +569,7 @@ class JiraScrumMasterService:
         print(f"Token: {token[:10]}..." if len(token) > 10 else f"Token: {token}")
         
         try:
-            response = requests.post(url, headers=headers, json=payload, timeout=10)
+            response = await self.http.post(url, headers=headers, json=payload)
             print(f"\nResponse Status: {response.status_code}")
             print(f"Response Body: {response.text}")
             
@@ -503,7 +584,7 @@ class JiraScrumMasterService:
                 print(f"   - Assignee: {assignee_email or assignee_account_id}")
             print("="*80 + "\n")
             return result
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             print(f"\nâŒ ERROR: Failed to create task")
             print(f"   Error: {str(e)}")
             if hasattr(e, 'response') and e.response is not None:
@@ -512,6 +593,21 @@ class JiraScrumMasterService:
             print("="*80 + "\n")
             raise ValueError(f"Failed to create task: {str(e)}")
 
+    @staticmethod
+    def task_payload(summary: str, assignee_account_id: str = None, assignee_email: str = None,
+                     due_date: str = None) -> Dict[str, Any]:
+        """Request body for creating a task, shared by single and bulk creates."""
+        payload = {
+            "summary": summary
+        }
+        if assignee_account_id:
+            payload["assigneeAccountId"] = assignee_account_id
+        if assignee_email:
+            payload["assigneeEmail"] = assignee_email
+        if due_date:
+            payload["dueDate"] = due_date
+        return payload
+
     async def create_subtask(self, summary: str, parent_key: str, token: str) -> Dict[str, Any]:
         """
         Create a subtask in Jira.
@@ -542,7 +638,7 @@ class JiraScrumMasterService:
         print(f"Token: {token[:10]}..." if len(token) > 10 else f"Token: {token}")
         
         try:
-            response = requests.post(url, headers=headers, json=payload, timeout=10)
+            response = await self.http.post(url, headers=headers, json=payload)
             print(f"\nResponse Status: {response.status_code}")
             print(f"Response Body: {response.text}")
             
@@ -556,32 +652,7 @@ class JiraScrumMasterService:
             print(f"   - Parent: {parent_key}")
             print("="*80 + "\n")
             return result
-        except requests.RequestException as e:
-            print(f"\nâŒ ERROR: Failed to create subtask")
-            print(f"   Error: {str(e)}")
-            if hasattr(e, 'response') and e.response is not None:
-                print(f"   Response Status: {e.response.status_code}")
-                print(f"   Response Body: {e.response.text}")
-            print("="*80 + "\n")
-            raise ValueError(f"Failed to create subtask: {str(e)}")
-
-            
-            if response.status_code in [200, 204]:
-                print(f"âœ… SUCCESS: Moved {len(issue_keys)} issues to sprint")
-            else:
-                print(f"Response Body: {response.text}")
-                response.raise_for_status()
-                
-        except requests.RequestException as e:
-            print(f"âŒ ERROR moving issues to sprint: {str(e)}")
-            if hasattr(e, 'response') and e.response is not None:
-                print(f"Response Body: {e.response.text}")
-            # Don't raise - this is a non-critical operation
-
-            print(f"   - Parent: {parent_key}")
-            print("="*80 + "\n")
-            return result
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             print(f"\nâŒ ERROR: Failed to create subtask")
             print(f"   Error: {str(e)}")
             if hasattr(e, 'response') and e.response is not None:
@@ -591,348 +662,64 @@ class JiraScrumMasterService:
             raise ValueError(f"Failed to create subtask: {str(e)}")
 
 
-    async def get_active_sprint(self, token: str):
-        """
-        Fetch sprints and return the ID of the first active sprint.
-        
-        Returns:
-            Sprint ID if an active sprint is found, None otherwise
-        """
-        url = f"{settings.JIRA_API_URL}/sprints"
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Accept": "application/json"
-        }
-        
-        print(f"\n[JIRA API] Fetching sprints from {url}")
-        
-        try:
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            sprints = data.get("sprints", [])
-            for sprint in sprints:
-                if sprint.get("state") == "active":
-                    sprint_name = sprint.get("name", "Unknown")
-                    sprint_id = sprint.get("id")
-                    print(f"âœ… Found active sprint: {sprint_name} (ID: {sprint_id})")
-                    return sprint_id
-            
-            print("âš ï¸  No active sprint found")
-            return None
-            
-        except requests.RequestException as e:
-            print(f"âŒ ERROR fetching sprints: {str(e)}")
-            return None
-
-    async def move_issues_to_sprint(self, sprint_id: int, issue_keys: List[str], token: str):
+    async def create_issues_bulk(self, kind: str, issue_updates: List[Dict[str, Any]],
+                                 token: str) -> Optional[List[Optional[Dict[str, Any]]]]:
         """
-        Move a list of issues to a specific sprint.
+        Create several tasks or subtasks in one request, following Jira's bulk-create semantics.
         
         Args:
-            sprint_id: The ID of the target sprint
-            issue_keys: List of issue keys to move (e.g., ["SCRUM-1", "SCRUM-2"])
-            token: Authorization token
-        """
-        if not issue_keys:
-            return
-        
-        url = f"{settings.JIRA_API_URL}/sprints/{sprint_id}/issues"
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json"
-        }
-        payload = {
-            "issueKeys": issue_keys
-        }
-        
-        print(f"\n[JIRA API] Moving {len(issue_keys)} issues to sprint {sprint_id}")
-        print(f"URL: {url}")
-        print(f"Payload: {json.dumps(payload, indent=2)}")
-        
-        try:
-            response = requests.post(url, headers=headers, json=payload, timeout=10)
-            print(f"Response Status: {response.status_code}")
-            
-            if response.status_code in [200, 204]:
-                print(f"âœ… SUCCESS: Moved {len(issue_keys)} issues to sprint")
-            else:
-                print(f"Response Body: {response.text}")
-                response.raise_for_status()
-                
-        except requests.RequestException as e:
-            print(f"âŒ ERROR moving issues to sprint: {str(e)}")
-            if hasattr(e, 'response') and e.response is not None:
-                print(f"Response Body: {e.response.text}")
-            # Don't raise - this is a non-critical operation
-
-    async def analyze_transcription(self, request) -> Dict[str, str]:
-        
-        jira_url = f"{settings.JIRA_API_URL}/issues?sort=deadline&limit=10"
-        print(f"Fetching Jira issues from {jira_url}...")
-        
-        try:
-            response = requests.get(jira_url, headers={"accept": "application/json"}, timeout=10)
-            response.raise_for_status()
-            jira_data = response.json()
-            issues = jira_data.get("issues", [])
-            print(f"Fetched {len(issues)} issues from Jira.")
-        except requests.RequestException as e:
-            print(f"Error fetching Jira issues: {e}")
-            issues = []
-
-        issues_context = ""
-        for issue in issues:
-            key = issue.get("key", "UNKNOWN")
-            fields = issue.get("fields") or {}
-            summary = fields.get("summary", "No summary")
-            description = fields.get("description", "No description")
-            status = fields.get("status", {}).get("name", "Unknown")
-            
-            issues_context += f"- [{key}] {summary} (Status: {status})\n"
-            if description:
-                issues_context += f"  Description: {str(description)[:200]}...\n"
-
-        transcription_text = ""
-        for block in request.transcript.speaker_blocks:
-            transcription_text += f"{block.speaker.name}: {block.words}\n"
-
-        meeting_context = f"""
-        Meeting: {request.title}
-        Time: {request.start_time} - {request.end_time}
-        Participants: {', '.join([p.name for p in request.participants])}
-        
-        Summary: {request.summary}
-        
-        Action Items:
-        {chr(10).join([f"- {item.text}" for item in request.action_items])}
-        
-        Key Questions:
-        {chr(10).join([f"- {q.text}" for q in request.key_questions])}
-        
-        Topics:
-        {chr(10).join([f"- {t.text}" for t in request.topics])}
-        
-        Chapter Summaries:
-        {chr(10).join([f"- {ch.title}: {ch.description}" for ch in request.chapter_summaries])}
-        """
-
-        prompt = f"""
-        You are an expert Project Manager and Scrum Master.
-        
-        I have a transcription of a meeting and a list of existing Jira issues.
-        Your goal is to identify important questions or topics that were NOT discussed in the meeting but are relevant to the existing issues or the project context implied by the transcription.
-        
-        CRITICAL: Detect the language used in the meeting transcript and respond in that EXACT SAME LANGUAGE. If the transcript is in Russian, respond in Russian. If in English, respond in English.
-        
-        Existing Jira Issues:
-        {issues_context[:20000]}
-        
-        Meeting Context:
-        {meeting_context[:10000]}
-        
-        Full Transcript:
-        {transcription_text[:20000]}
-        
-        Instructions:
-        1. Analyze the transcription to understand what was discussed.
-        2. Cross-reference with the existing Jira issues.
-        3. Identify gaps: What critical details, risks, or requirements related to the issues (or new topics mentioned) were missed?
-        4. Generate a list of important questions to ask the team.
-        
-        Output Format:
-        Return ONLY valid HTML content formatted for Telegram's HTML parser. Use these tags ONLY:
-        - <b>text</b> for bold
-        - <i>text</i> for italic
-        - <u>text</u> for underline
-        - <s>text</s> for strikethrough
-        - <code>text</code> for inline code
-        - <pre>text</pre> for code blocks
-        - <a href="url">text</a> for links
-        
-        Structure your response with proper headings using <b> tags and organize questions in a clear list format.
-        Do NOT use markdown, do NOT wrap in code blocks, return ONLY the HTML content.
-        """
-
-        response = await self.client.chat.completions.create(
-            model=settings.AZURE_OPENAI_DEPLOYMENT_NAME,
-            messages=[
-                {"role": "system", "content": "You are a helpful technical assistant that outputs valid HTML."},
-                {"role": "user", "content": prompt}
-            ]
-        )
-        
-        result_text = response.choices[0].message.content
-        clean = result_text.replace("```html", "").replace("```", "").strip()
-        return {"text": clean}
-
-    async def create_epic(self, summary: str, token: str) -> Dict[str, Any]:
-        """
-        Create an epic in Jira.
-        
-        Args:
-            summary: The epic title/summary
-            token: Authorization token for the request
-            
-        Returns:
-            Dictionary with id, key, and self fields from Jira response
-        """
-        url = f"{settings.JIRA_API_URL}/epics"
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json"
-        }
-        payload = {
-            "summary": summary
-        }
-        
-        print("\n" + "="*80)
-        print("[JIRA API] Creating Epic")
-        print("="*80)
-        print(f"URL: {url}")
-        print(f"Payload: {json.dumps(payload, indent=2)}")
-        print(f"Token: {token[:10]}..." if len(token) > 10 else f"Token: {token}")
-        
-        try:
-            response = requests.post(url, headers=headers, json=payload, timeout=10)
-            print(f"\nResponse Status: {response.status_code}")
-            print(f"Response Body: {response.text}")
-            
-            response.raise_for_status()
-            result = response.json()
-            
-            print(f"\nâœ… SUCCESS: Epic created!")
-            print(f"   - ID: {result.get('id', 'N/A')}")
-            print(f"   - Key: {result.get('key', 'N/A')}")
-            print(f"   - URL: {result.get('self', 'N/A')}")
-            print("="*80 + "\n")
-            return result
-        except requests.RequestException as e:
-            print(f"\nâŒ ERROR: Failed to create epic")
-            print(f"   Error: {str(e)}")
-            if hasattr(e, 'response') and e.response is not None:
-                print(f"   Response Status: {e.response.status_code}")
-                print(f"   Response Body: {e.response.text}")
-            print("="*80 + "\n")
-            raise ValueError(f"Failed to create epic: {str(e)}")
-
-    async def create_task(self, summary: str, assignee_account_id: str = None, 
-                     assignee_email: str = None, due_date: str = None, token: str =  None) -> Dict[str, Any]:
-        """
-        Create a task (issue) in Jira.
-        
-        Args:
-            summary: The task title/summary
-            assignee_account_id: Account ID of the assignee (optional)
-            assignee_email: Email of the assignee (optional)
-            token: Authorization token for the request
-            
-        Returns:
-            Dictionary with id, key, and self fields from Jira response
-        """
-        url = f"{settings.JIRA_API_URL}/issues"
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json"
-        }
-        payload = {
-            "summary": summary
-        }
-        
-        if assignee_account_id:
-            payload["assigneeAccountId"] = assignee_account_id
-        if assignee_email:
-            payload["assigneeEmail"] = assignee_email
-        if due_date:
-            payload["dueDate"] = due_date
-
-        
-        print("\n" + "="*80)
-        print("[JIRA API] Creating Task (Issue)")
-        print("="*80)
-        print(f"URL: {url}")
-        print(f"Payload: {json.dumps(payload, indent=2)}")
-        print(f"Token: {token[:10]}..." if len(token) > 10 else f"Token: {token}")
-        
-        try:
-            response = requests.post(url, headers=headers, json=payload, timeout=10)
-            print(f"\nResponse Status: {response.status_code}")
-            print(f"Response Body: {response.text}")
-            
-            response.raise_for_status()
-            result = response.json()
-            
-            print(f"\nâœ… SUCCESS: Task created!")
-            print(f"   - ID: {result.get('id', 'N/A')}")
-            print(f"   - Key: {result.get('key', 'N/A')}")
-            print(f"   - URL: {result.get('self', 'N/A')}")
-            if assignee_email or assignee_account_id:
-                print(f"   - Assignee: {assignee_email or assignee_account_id}")
-            print("="*80 + "\n")
-            return result
-        except requests.RequestException as e:
-            print(f"\nâŒ ERROR: Failed to create task")
-            print(f"   Error: {str(e)}")
-            if hasattr(e, 'response') and e.response is not None:
-                print(f"   Response Status: {e.response.status_code}")
-                print(f"   Response Body: {e.response.text}")
-            print("="*80 + "\n")
-            raise ValueError(f"Failed to create task: {str(e)}")
-
-    async def create_subtask(self, summary: str, parent_key: str, token: str) -> Dict[str, Any]:
-        """
-        Create a subtask in Jira.
-        
-        Args:
-            summary: The subtask title/summary
-            parent_key: Key of the parent task (e.g., "SCRUM-15")
+            kind: "issues" for tasks or "subtasks"
+            issue_updates: Request bodies as accepted by the single-create endpoint
             token: Authorization token for the request
             
         Returns:
-            Dictionary with id, key, and self fields from Jira response
+            One entry per input in the same order: the created issue (id, key, self)
+            or None if Jira rejected that element. Returns None if the Jira API has
+            no bulk endpoint: it answers 404, 405 or 501, or 400 before any bulk
+            request has succeeded.
         """
-        url = f"{settings.JIRA_API_URL}/subtasks"
+        url = f"{settings.JIRA_API_URL}/{kind}/bulk"
         headers = {
             "Authorization": f"Bearer {token}",
             "Content-Type": "application/json"
         }
-        payload = {
-            "summary": summary,
-            "parentKey": parent_key
-        }
         
-        print("\n" + "="*80)
-        print("[JIRA API] Creating Subtask")
-        print("="*80)
+        print(f"\n[JIRA API] Bulk creating {len(issue_updates)} {kind}")
         print(f"URL: {url}")
-        print(f"Payload: {json.dumps(payload, indent=2)}")
-        print(f"Token: {token[:10]}..." if len(token) > 10 else f"Token: {token}")
         
         try:
-            response = requests.post(url, headers=headers, json=payload, timeout=10)
-            print(f"\nResponse Status: {response.status_code}")
-            print(f"Response Body: {response.text}")
-            
+            response = await self.http.post(url, headers=headers, json={"issueUpdates": issue_updates})
+            print(f"Response Status: {response.status_code}")
+            unsupported = response.status_code in [404, 405, 501] or (
+                response.status_code == 400 and not self.jira_bulk_confirmed
+            )
+            if unsupported:
+                print("Bulk create is not supported by the Jira API; using single creates.")
+                self.jira_bulk_supported = False
+                return None
             response.raise_for_status()
-            result = response.json()
-            
-            print(f"\nâœ… SUCCESS: Subtask created!")
-            print(f"   - ID: {result.get('id', 'N/A')}")
-            print(f"   - Key: {result.get('key', 'N/A')}")
-            print(f"   - URL: {result.get('self', 'N/A')}")
-            print(f"   - Parent: {parent_key}")
-            print("="*80 + "\n")
-            return result
-        except requests.RequestException as e:
-            print(f"\nâŒ ERROR: Failed to create subtask")
-            print(f"   Error: {str(e)}")
+            data = response.json()
+            self.jira_bulk_confirmed = True
+        except httpx.HTTPError as e:
+            print(f"ERROR: Failed to bulk create {kind}: {str(e)}")
             if hasattr(e, 'response') and e.response is not None:
-                print(f"   Response Status: {e.response.status_code}")
-                print(f"   Response Body: {e.response.text}")
-            print("="*80 + "\n")
-            raise ValueError(f"Failed to create subtask: {str(e)}")
-
+                print(f"Response Body: {e.response.text}")
+            raise ValueError(f"Failed to bulk create {kind}: {str(e)}")
+        
+        # Like Jira, `issues` lists only the created elements in request order and
+        # `errors` points at the rejected ones by index.
+        failed = set()
+        for error in data.get("errors") or []:
+            failed.add(error.get("failedElementNumber"))
+            print(f"Bulk element {error.get('failedElementNumber')} rejected: {error.get('elementErrors')}")
+        created = list(data.get("issues") or [])
+        if len(created) + len(failed) != len(issue_updates) or not failed <= set(range(len(issue_updates))):
+            raise ValueError(f"Unexpected bulk create response for {len(issue_updates)} {kind}")
+        
+        created.reverse()
+        results = [None if index in failed else created.pop() for index in range(len(issue_updates))]
+        print(f"SUCCESS: Bulk created {len(issue_updates) - len(failed)} of {len(issue_updates)} {kind}")
+        return results
 
     async def get_active_sprint(self, token: str):
         """
@@ -950,7 +737,7 @@ class JiraScrumMasterService:
         print(f"\n[JIRA API] Fetching sprints from {url}")
         
         try:
-            response = requests.get(url, headers=headers, timeout=10)
+            response = await self.http.get(url, headers=headers)
             response.raise_for_status()
             data = response.json()
             
@@ -965,11 +752,11 @@ class JiraScrumMasterService:
             print("âš ï¸  No active sprint found")
             return None
             
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             print(f"âŒ ERROR fetching sprints: {str(e)}")
             return None
 
-    async def move_issues_to_sprint(self, sprint_id: int, issue_keys: List[str], token: str):
+    async def move_issues_to_sprint(self, sprint_id: int, issue_keys: List[str], token: str) -> bool:
         """
         Move a list of issues to a specific sprint.
         
@@ -977,9 +764,12 @@ class JiraScrumMasterService:
             sprint_id: The ID of the target sprint
             issue_keys: List of issue keys to move (e.g., ["SCRUM-1", "SCRUM-2"])
             token: Authorization token
+            
+        Returns:
+            True if Jira accepted the move
         """
         if not issue_keys:
-            return
+            return True
         
         url = f"{settings.JIRA_API_URL}/sprints/{sprint_id}/issues"
         headers = {
@@ -995,47 +785,26 @@ class JiraScrumMasterService:
         print(f"Payload: {json.dumps(payload, indent=2)}")
         
         try:
-            response = requests.post(url, headers=headers, json=payload, timeout=10)
+            response = await self.http.post(url, headers=headers, json=payload)
             print(f"Response Status: {response.status_code}")
             
             if response.status_code in [200, 204]:
                 print(f"âœ… SUCCESS: Moved {len(issue_keys)} issues to sprint")
-            else:
-                print(f"Response Body: {response.text}")
-                response.raise_for_status()
+                return True
+            print(f"Response Body: {response.text}")
+            response.raise_for_status()
+            return True
                 
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             print(f"âŒ ERROR moving issues to sprint: {str(e)}")
             if hasattr(e, 'response') and e.response is not None:
                 print(f"Response Body: {e.response.text}")
             # Don't raise - this is a non-critical operation
+            return False
 
     async def analyze_transcription(self, request) -> Dict[str, str]:
-        
-        jira_url = "https://jira.azed.kz/api/jira/issues?sort=deadline&limit=10"
-        print(f"Fetching Jira issues from {jira_url}...")
-        
-        try:
-            response = requests.get(jira_url, headers={"accept": "application/json"}, timeout=10)
-            response.raise_for_status()
-            jira_data = response.json()
-            issues = jira_data.get("issues", [])
-            print(f"Fetched {len(issues)} issues from Jira.")
-        except requests.RequestException as e:
-            print(f"Error fetching Jira issues: {e}")
-            issues = []
-
-        issues_context = ""
-        for issue in issues:
-            key = issue.get("key", "UNKNOWN")
-            fields = issue.get("fields", {})
-            summary = fields.get("summary", "No summary")
-            description = fields.get("description", "No description")
-            status = fields.get("status", {}).get("name", "Unknown")
-            
-            issues_context += f"- [{key}] {summary} (Status: {status})\n"
-            if description:
-                issues_context += f"  Description: {str(description)[:200]}...\n"
+        # Issues due soonest, from the in-process snapshot of the Jira cache
+        issues_context = await self.issue_search.upcoming_context(10)
 
         transcription_text = ""
         for block in request.transcript.speaker_blocks:
@@ -1110,42 +879,57 @@ class JiraScrumMasterService:
         clean = result_text.replace("```html", "").replace("```", "").strip()
         return {"text": clean}
 
+    @property
+    def ready(self) -> bool:
+        return all(self.readiness.values())
+
+    def start_warmup(self):
+        """Warm the service up in the background, so startup does not wait on its dependencies."""
+        if self._warmup is None:
+            self._warmup = asyncio.create_task(self.warmup())
+
+    async def warmup(self):
+        """
+        Load and connect what requests need, before the first one arrives.
+
+        The tokenizer and the OpenAI client load in worker threads while Mongo
+        is pinged until it answers; those are the critical dependencies that
+        `ready` waits for. The Jira issue snapshot, index builds and the first
+        Jira sync follow, and may still be running once the service reports ready.
+        """
+        await asyncio.gather(
+            self._until_up("tokenizer", lambda: asyncio.to_thread(self.token_budget.load)),
+            self._until_up("openai", lambda: asyncio.to_thread(self.client.load)),
+            self._until_up("mongo", self.mongo_client.ping)
+        )
+        print("Service is ready.")
+        self.issue_search.start()
+        await self.ensure_indexes()
+        self.start_jira_sync()
+
+    async def _until_up(self, name: str, check):
+        while not self.readiness[name]:
+            try:
+                await check()
+                self.readiness[name] = True
+            except Exception as e:
+                print(f"ERROR: {name} is not available yet, retrying: {e}")
+                await asyncio.sleep(settings.STARTUP_RETRY_SECONDS)
+
+    async def ensure_indexes(self):
+        """Create the Mongo indexes behind the service's queries."""
+        await self.mongo_client.ensure_indexes()
+
+    def start_jira_sync(self):
+        """Keep the Jira cache fresh from a background worker."""
+        self.jira_sync.start()
+
     async def sync_jira_data(self):
-        """Fetch issues from Jira and cache them in MongoDB."""
-        print("Syncing Jira data...")
-        # Fetch more issues for caching
-        jira_url = f"{settings.JIRA_API_URL}/issues?limit=100" 
-        try:
-            response = requests.get(jira_url, headers={"accept": "application/json"}, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            issues = data.get("issues", [])
-            
-            # Transform for cache if needed, or store raw
-            # We want to store key, summary, description, status, assignee
-            cached_issues = []
-            for issue in issues:
-                fields = issue.get("fields") or {}
-                status = fields.get("status") or {}
-                assignee = fields.get("assignee") or {}
-                
-                cached_issues.append({
-                    "key": issue.get("key"),
-                    "summary": fields.get("summary"),
-                    "description": fields.get("description"),
-                    "status": status.get("name"),
-                    "assignee": assignee.get("displayName"),
-                    "updated": fields.get("updated")
-                })
-            
-            await self.mongo_client.cache_jira_issues(cached_issues)
-            print(f"Synced {len(cached_issues)} issues to MongoDB.")
-            return len(cached_issues)
-        except Exception as e:
-            print(f"Error syncing Jira data: {e}")
-            return 0
+        """Cache the Jira issues changed since the last sync in MongoDB; returns how many."""
+        return await self.jira_sync.sync_once()
 
     async def chat(self, message: str, session_id: str, file: UploadFile = None, authorization: str = None):
+        asked_at = datetime.utcnow()
         file_context = ""
         if file:
             try:
@@ -1156,14 +940,14 @@ class JiraScrumMasterService:
                     token = authorization.split(" ")[1] if " " in authorization else authorization
                     organization = await self.get_organization_info(token)
                     
-                    yield "data: Decomposing tasks (this may take a moment)...\n\n"
-                    await asyncio.sleep(0)
-                    tasks = await self.decompose_tasks(text)
-                    assigned_tasks = self.assign_tasks(tasks, organization)
-                    
-                    yield "data: Creating tasks in Jira...\n\n"
+                    yield "data: Decomposing tasks and creating them in Jira (this may take a moment)...\n\n"
                     await asyncio.sleep(0)
-                    final_tasks = await self.create_jira_tasks(assigned_tasks, token)
+                    final_tasks = []
+                    async for event in self.decompose_pipeline(text, organization, token):
+                        if event["event"] == "completed":
+                            final_tasks = event["tasks"]
+                        else:
+                            yield f"data: {self.describe_progress(event)}\n\n"
                     
                     yield "data: Tasks created. Generating response...\n\n"
                     await asyncio.sleep(0)
@@ -1171,8 +955,8 @@ class JiraScrumMasterService:
                     file_context = f"Uploaded File Processed. Created Jira Tasks:\n{task_summary}\n"
                 else:
                     file_content = await self.parse_file(file)
-                    if self.count_tokens(file_content) > 5000:
-                        file_summary = await self.summarize_text(file_content)
+                    if await self.token_budget.exceeds(file_content, settings.CHAT_FILE_INLINE_TOKENS):
+                        file_summary = await self.summarize_text(file_content, settings.CHAT_FILE_INLINE_TOKENS)
                         file_context = f"Uploaded File Summary:\n{file_summary}\n"
                     else:
                         file_context = f"Uploaded File Content:\n{file_content}\n"
@@ -1183,11 +967,8 @@ class JiraScrumMasterService:
         yield "data: Loading context...\n\n"
         await asyncio.sleep(0)
         
-        history = await self.mongo_client.get_chat_history(session_id)
-        cached_issues = await self.mongo_client.get_cached_issues(limit=20)
-        jira_context = "Relevant Jira Issues:\n"
-        for issue in cached_issues:
-            jira_context += f"- [{issue['key']}] {issue['summary']} ({issue['status']})\n"
+        history = await self.chat_history.context(session_id)
+        jira_context = await self.issue_search.context(message)
 
         system_prompt = """You are an expert Scrum Master assistant. 
         Use the provided Jira context and file content to answer the user's questions.
@@ -1196,8 +977,7 @@ class JiraScrumMasterService:
         """
         
         messages = [{"role": "system", "content": system_prompt}]
-        for msg in history:
-            messages.append({"role": msg["role"], "content": msg["content"]})
+        messages.extend(history)
         
         user_content = f"{jira_context}\n\n{file_context}\n\nUser Question: {message}"
         messages.append({"role": "user", "content": user_content})
@@ -1216,5 +996,6 @@ class JiraScrumMasterService:
                 yield f"data: {content}\n\n"
                 await asyncio.sleep(0)
 
-        await self.mongo_client.save_message(session_id, "user", message)
-        await self.mongo_client.save_message(session_id, "assistant", full_response)
\ No newline at end of file
+        # Written behind the response; the next turn reads it from the buffer until then
+        self.message_buffer.add_turn(session_id, message, full_response, asked_at=asked_at)
+        self.chat_history.schedule_fold(session_id)
\ No newline at end of file
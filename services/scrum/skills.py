@@ -0,0 +1,126 @@
+import bisect
+import json
+import re
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+from config import settings
+
+
+def load_skill_rules(path: str = None) -> List[Dict[str, Any]]:
+    """
+    Load job-title skill rules from a JSON file (SKILL_RULES_FILE by default).
+
+    The file holds a list of rules, each with `keywords` (lowercase substrings
+    of a job title) and the `skills` a title containing any of them implies.
+    """
+    with open(path or settings.SKILL_RULES_FILE, encoding="utf-8") as f:
+        rules = json.load(f)
+    for rule in rules:
+        if not rule.get("keywords") or not rule.get("skills"):
+            raise ValueError(f"Skill rule {rule.get('name', rule)} needs keywords and skills")
+    return rules
+
+
+def _trie_regex(keywords: Iterable[str]) -> str:
+    """
+    Regex alternation of `keywords` factored into a trie.
+
+    At each position the engine follows one branch per character instead of
+    trying every keyword, and the longest keyword starting there matches.
+    """
+    trie: Dict[str, Any] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, Any]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            # A keyword ends here; longer ones may continue
+            return "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+
+class SkillMatcher:
+    """
+    Compiled matcher from job titles to skills.
+
+    All rule keywords are compiled into one trie-shaped regex inside a
+    lookahead, so a single scan finds every keyword occurrence, overlapping
+    ones included, and the cost per character barely grows with the number
+    of keywords. Keyword hits map to rule sets, and the skill list of each
+    distinct rule set is built once.
+    """
+
+    def __init__(self, rules: Sequence[Dict[str, Any]]):
+        self.rules = [(tuple(k.lower() for k in rule["keywords"] if k), tuple(rule["skills"])) for rule in rules]
+
+        keyword_rules: Dict[str, set] = {}
+        for index, (keywords, _) in enumerate(self.rules):
+            for keyword in keywords:
+                keyword_rules.setdefault(keyword, set()).add(index)
+        # The regex reports the longest keyword at each position; every keyword
+        # that is a prefix of it matched at that position too.
+        self._hit_rules: Dict[str, FrozenSet[int]] = {
+            keyword: frozenset().union(*(
+                rules_ for other, rules_ in keyword_rules.items() if keyword.startswith(other)
+            ))
+            for keyword in keyword_rules
+        }
+        self._pattern = re.compile("(?=(" + _trie_regex(keyword_rules) + "))") if keyword_rules else None
+        self._skills_cache: Dict[FrozenSet[int], Tuple[str, ...]] = {}
+
+    def _skills(self, rule_indexes: FrozenSet[int]) -> Tuple[str, ...]:
+        skills = self._skills_cache.get(rule_indexes)
+        if skills is None:
+            ordered = (skill for index in sorted(rule_indexes) for skill in self.rules[index][1])
+            skills = tuple(dict.fromkeys(ordered))
+            self._skills_cache[rule_indexes] = skills
+        return skills
+
+    def derive(self, job: str) -> List[str]:
+        """Skills implied by one job title."""
+        return self.derive_many([job])[0]
+
+    def derive_many(self, jobs: Sequence[Optional[str]]) -> List[List[str]]:
+        """Skills for each of `jobs`, found with a single scan over all titles."""
+        titles = [(job or "").lower().replace("\n", " ") for job in jobs]
+        hits: List[set] = [set() for _ in titles]
+        if self._pattern is None:
+            return [[] for _ in titles]
+
+        # Titles are joined with a separator no keyword contains, so a match
+        # never spans two titles
+        text = "\n".join(titles)
+        starts = []
+        offset = 0
+        for title in titles:
+            starts.append(offset)
+            offset += len(title) + 1
+
+        for match in self._pattern.finditer(text):
+            hits[bisect.bisect_right(starts, match.start()) - 1].update(self._hit_rules[match.group(1)])
+        return [list(self._skills(frozenset(rule_indexes))) for rule_indexes in hits]
+
+
+_default_matcher: Optional[SkillMatcher] = None
+
+
+def default_matcher() -> SkillMatcher:
+    """Matcher for the configured rules, compiled on first use."""
+    global _default_matcher
+    if _default_matcher is None:
+        _default_matcher = SkillMatcher(load_skill_rules())
+    return _default_matcher
+
+
+def derive_skills(job: str) -> List[str]:
+    """Derive skills from a job title, since the backend doesn't provide them."""
+    return default_matcher().derive(job)
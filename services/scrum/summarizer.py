@@ -0,0 +1,113 @@
+import asyncio
+from typing import TYPE_CHECKING, List
+
+from config import settings
+from token_budget import TokenBudget
+
+if TYPE_CHECKING:
+    from openai import AsyncAzureOpenAI
+
+# Reduce rounds after which the combined summary is truncated to the target.
+MAX_REDUCE_LEVELS = 4
+
+# Lower bound on the length requested for a single partial summary.
+MIN_PARTIAL_SUMMARY_TOKENS = 300
+
+MAP_PROMPT = """
+        Summarize the following part ({part} of {total}) of a technical document, retaining all key requirements, constraints, and architectural details.
+        The summary should be detailed enough to be used for task decomposition.
+        Keep the summary under {max_tokens} tokens. Write it in the same language as the document.
+
+        Document Part:
+        {text}
+        """
+
+REDUCE_PROMPT = """
+        The following are summaries of consecutive parts of one technical document.
+        Merge them into a single summary that keeps every requirement, constraint and architectural detail, removing repetition.
+        Keep the summary under {max_tokens} tokens. Write it in the same language as the summaries.
+
+        Partial Summaries:
+        {text}
+        """
+
+
+class MapReduceSummarizer:
+    """
+    Summarizes documents of any length with a map-reduce over token chunks.
+
+    The document is split into SUMMARY_INPUT_TOKENS chunks that overlap by
+    SUMMARY_CHUNK_OVERLAP_TOKENS, and the chunks are summarized concurrently
+    (at most SUMMARY_CONCURRENCY LLM calls at a time). Partial summaries are
+    then merged in groups that fit one request, level by level, until the
+    result fits the requested token budget.
+    """
+
+    def __init__(self, client: "AsyncAzureOpenAI", token_budget: TokenBudget,
+                 chunk_tokens: int = None, overlap_tokens: int = None, concurrency: int = None):
+        self.client = client
+        self.token_budget = token_budget
+        self.chunk_tokens = chunk_tokens or settings.SUMMARY_INPUT_TOKENS
+        self.overlap_tokens = settings.SUMMARY_CHUNK_OVERLAP_TOKENS if overlap_tokens is None else overlap_tokens
+        self.semaphore = asyncio.Semaphore(concurrency or settings.SUMMARY_CONCURRENCY)
+
+    async def summarize(self, text: str, target_tokens: int) -> str:
+        chunks = await self.token_budget.split_async(text, self.chunk_tokens, self.overlap_tokens)
+        print(f"Summarizing {len(chunks)} chunk(s) to fit {target_tokens} tokens...")
+        summaries = await asyncio.gather(*[
+            self._complete(MAP_PROMPT.format(
+                part=i + 1,
+                total=len(chunks),
+                max_tokens=self._partial_budget(target_tokens, len(chunks)),
+                text=chunk
+            ))
+            for i, chunk in enumerate(chunks)
+        ])
+
+        for level in range(1, MAX_REDUCE_LEVELS + 1):
+            combined = "\n\n".join(summaries)
+            if not await self.token_budget.exceeds(combined, target_tokens):
+                return combined
+
+            groups = await self._group(summaries)
+            print(f"Reduce level {level}: {len(summaries)} summaries -> {len(groups)}")
+            summaries = await asyncio.gather(*[
+                self._complete(REDUCE_PROMPT.format(
+                    max_tokens=self._partial_budget(target_tokens, len(groups)),
+                    text="\n\n".join(group)
+                ))
+                for group in groups
+            ])
+
+        combined = "\n\n".join(summaries)
+        return await self.token_budget.truncate_async(combined, target_tokens)
+
+    async def _group(self, summaries: List[str]) -> List[List[str]]:
+        """Pack consecutive summaries into groups that each fit one request."""
+        counts = await asyncio.gather(*[self.token_budget.count_async(s) for s in summaries])
+        groups: List[List[str]] = []
+        current: List[str] = []
+        current_tokens = 0
+        for summary, tokens in zip(summaries, counts):
+            if current and current_tokens + tokens > self.chunk_tokens:
+                groups.append(current)
+                current, current_tokens = [], 0
+            current.append(summary)
+            current_tokens += tokens
+        if current:
+            groups.append(current)
+        return groups
+
+    def _partial_budget(self, target_tokens: int, parts: int) -> int:
+        return max(target_tokens // max(parts, 1), MIN_PARTIAL_SUMMARY_TOKENS)
+
+    async def _complete(self, prompt: str) -> str:
+        async with self.semaphore:
+            response = await self.client.chat.completions.create(
+                model=settings.AZURE_OPENAI_DEPLOYMENT_NAME,
+                messages=[
+                    {"role": "system", "content": "You are a helpful technical assistant."},
+                    {"role": "user", "content": prompt}
+                ]
+            )
+        return response.choices[0].message.content or ""
@@ -0,0 +1,122 @@
+"""
+Tests for the vectorized assignment engine.
+
+Run with: python -m pytest test_assignment.py
+"""
+
+import copy
+import random
+
+import pytest
+
+from assignment import SkillIndex, assign_tree, balanced_matches
+from bench_assignment import assignees, legacy_assign, make_forest, make_organization
+
+USERS = [
+    {"name": "Ann", "surname": "Lee", "email": "ann@acme.test", "skills": ["Backend", "Python", "SQL"]},
+    {"name": "Bob", "surname": "Kim", "email": "bob@acme.test", "skills": ["Backend", "Python"]},
+    {"name": "Cy", "surname": "Poe", "email": "cy@acme.test", "skills": ["Frontend"]},
+]
+
+
+def test_most_overlap_then_rating_then_organization_order():
+    ratings = {"ann@acme.test": 100, "bob@acme.test": 200, "cy@acme.test": 100}
+    tasks = [{
+        "summary": "Epic",
+        "required_skills": ["Backend", "SQL"],
+        "stories": [
+            {"summary": "Python work", "required_skills": ["Python"]},
+            {"summary": "Unknown", "required_skills": ["Rust"]},
+        ],
+    }]
+
+    assign_tree(tasks, {"users": USERS}, ratings)
+
+    epic = tasks[0]
+    assert epic["assignee_email"] == "ann@acme.test"
+    assert epic["stories"][0]["assignee_email"] == "bob@acme.test"
+    assert epic["stories"][0]["assignee_rating"] == 200
+    assert epic["stories"][1]["assignee"] == "Unassigned"
+    assert "assignee_email" not in epic["stories"][1]
+
+
+def test_complex_tasks_prefer_high_rated_candidates():
+    ratings = {"ann@acme.test": 250, "bob@acme.test": 350}
+    tasks = [
+        {"summary": "Simple", "required_skills": ["Backend", "SQL"], "complexity": 3},
+        {"summary": "Complex", "required_skills": ["Backend", "SQL"], "complexity": 8},
+    ]
+
+    assign_tree(tasks, {"users": USERS}, ratings)
+
+    assert [task["assignee_email"] for task in tasks] == ["ann@acme.test", "bob@acme.test"]
+
+
+@pytest.mark.parametrize("mode", ["best", "balanced"])
+def test_string_and_missing_complexity_are_read_as_numbers(mode):
+    ratings = {"ann@acme.test": 250, "bob@acme.test": 350}
+    tasks = [
+        {"summary": "Complex", "required_skills": ["Backend"], "complexity": "8"},
+        {"summary": "Unrated", "required_skills": ["Backend"], "complexity": None},
+        {"summary": "Vague", "required_skills": ["Backend"], "complexity": "high"},
+        {"summary": "Missing", "required_skills": ["Backend"]},
+    ]
+
+    assign_tree(tasks, {"users": USERS}, ratings, mode=mode)
+
+    assert tasks[0]["assignee_email"] == "bob@acme.test"
+    assert all(task["assignee_email"] for task in tasks)
+
+
+def test_matches_the_previous_loop_on_a_random_organization():
+    rng = random.Random(1)
+    organization, ratings = make_organization(200, rng)
+    forest = make_forest(600, rng)
+
+    legacy = legacy_assign(copy.deepcopy(forest), organization["users"], ratings)
+    vectorized = assign_tree(copy.deepcopy(forest), organization, ratings)
+
+    assert assignees(vectorized) == assignees(legacy)
+
+
+def test_index_cached_on_the_organization_is_reused():
+    class Snapshot(dict):
+        skill_index = SkillIndex(USERS)
+
+    tasks = [{"summary": "Story", "required_skills": ["Frontend"]}]
+
+    assign_tree(tasks, Snapshot(users=[]), {})
+
+    assert tasks[0]["assignee_email"] == "cy@acme.test"
+
+
+def backlog(count, complexity=3):
+    return [{"summary": f"Story {i}", "required_skills": ["Backend"], "complexity": complexity} for i in range(count)]
+
+
+def test_balanced_mode_spreads_load_across_fitting_users():
+    ratings = {"ann@acme.test": 500, "bob@acme.test": 100}
+    tasks = backlog(300)
+
+    assign_tree(tasks, {"users": USERS}, ratings, mode="balanced")
+
+    owners = [task["assignee_email"] for task in tasks]
+    assert owners.count("ann@acme.test") == 150
+    assert owners.count("bob@acme.test") == 150
+
+
+def test_balanced_mode_prefers_high_rated_users_for_complex_nodes():
+    ratings = {"ann@acme.test": 500, "bob@acme.test": 100}
+    tasks = [{"summary": "Hard", "required_skills": ["Backend"], "complexity": 9}] + backlog(4)
+
+    assign_tree(tasks, {"users": USERS}, ratings, mode="balanced")
+
+    assert tasks[0]["assignee_email"] == "ann@acme.test"
+    assert [task["assignee_email"] for task in tasks[1:]].count("bob@acme.test") == 3
+
+
+def test_balanced_mode_leaves_nodes_over_capacity_unassigned():
+    matches = balanced_matches(SkillIndex(USERS), [(["Backend"], 3)] * 5, {}, capacity=6)
+
+    assert sorted(match for match in matches if match is not None) == [0, 0, 1, 1]
+    assert matches.count(None) == 1
@@ -0,0 +1,70 @@
+"""
+Tests for token-budgeted chat history with rolling summaries.
+
+Run with: python -m pytest test_chat_history.py
+"""
+
+import asyncio
+
+
+def prompt_tokens(messages, budget):
+    return sum(budget.count(m["content"]) + 4 for m in messages)
+
+
+def test_short_session_is_replayed_verbatim_without_summarizing(history_mongo, make_manager):
+    mongo = history_mongo
+    mongo.add("s", "user", "hello")
+    mongo.add("s", "assistant", "hi there")
+    manager, completions = make_manager(mongo)
+
+    async def run():
+        context = await manager.context("s")
+        folded = await manager.fold("s")
+        return context, folded
+
+    context, folded = asyncio.run(run())
+
+    assert context == [{"role": "user", "content": "hello"}, {"role": "assistant", "content": "hi there"}]
+    assert not folded
+    assert completions.prompts == []
+
+
+def test_long_session_prompt_stays_bounded_and_old_turns_are_summarized(history_mongo, make_manager, token_budget):
+    mongo = history_mongo
+    manager, completions = make_manager(mongo, history_tokens=200)
+
+    async def run():
+        sizes = []
+        for turn in range(60):
+            await manager.context("s")
+            mongo.add("s", "user", f"question {turn} " + "x" * 30)
+            mongo.add("s", "assistant", f"answer {turn} " + "y" * 30)
+            manager.schedule_fold("s")
+            await asyncio.sleep(0)
+            while manager._folds:
+                await asyncio.sleep(0.001)
+            sizes.append(prompt_tokens(await manager.context("s"), token_budget))
+        return sizes, await manager.context("s")
+
+    sizes, context = asyncio.run(run())
+
+    assert max(sizes) <= 200 + 50 + 64
+    assert context[0]["role"] == "system" and context[0]["content"].endswith(f"summary #{len(completions.prompts)}")
+    assert context[-1]["content"].startswith("answer 59")
+    # Folding runs every few turns, not on every reply, and never refolds a message
+    assert 5 < len(completions.prompts) < 40
+    assert "question 0 " in completions.prompts[0]
+    assert all("question 0 " not in prompt for prompt in completions.prompts[1:])
+    assert "summary #1" in completions.prompts[1]
+
+
+def test_context_drops_oldest_unsummarized_turns_beyond_the_budget(history_mongo, make_manager, token_budget):
+    mongo = history_mongo
+    for turn in range(20):
+        mongo.add("s", "user", f"message {turn} " + "z" * 40)
+    manager, _ = make_manager(mongo, history_tokens=120)
+
+    context = asyncio.run(manager.context("s"))
+
+    assert prompt_tokens(context, token_budget) <= 120
+    assert context[-1]["content"].startswith("message 19")
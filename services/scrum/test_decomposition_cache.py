@@ -0,0 +1,85 @@
+"""
+Tests for the Mongo-backed decomposition cache.
+
+Run with: python -m pytest test_decomposition_cache.py
+"""
+
+import asyncio
+import types
+from datetime import datetime, timedelta
+
+import decomposition_cache
+from config import settings
+from decomposition_cache import DecompositionCache, decomposition_cache_key
+from service import JiraScrumMasterService
+
+TASKS = [{"summary": "Auth", "stories": [{"summary": "Login"}]}]
+
+
+def test_key_depends_on_text_prompt_version_and_deployment(monkeypatch):
+    key = decomposition_cache_key("spec")
+
+    assert decomposition_cache_key("spec") == key
+    assert decomposition_cache_key("other spec") != key
+    monkeypatch.setattr(decomposition_cache, "DECOMPOSE_PROMPT_VERSION", "next")
+    assert decomposition_cache_key("spec") != key
+    monkeypatch.undo()
+    monkeypatch.setattr(settings, "AZURE_OPENAI_DEPLOYMENT_NAME", "another-model")
+    assert decomposition_cache_key("spec") != key
+
+
+def test_entries_expire_through_a_ttl_index(mongomock_client):
+    client = mongomock_client
+    cache = DecompositionCache(client, ttl_seconds=60)
+
+    async def run():
+        await cache.put("k", TASKS)
+        indexes = await client.decompositions.index_information()
+        doc = await client.decompositions.find_one({"_id": "k"})
+        return indexes, doc, await cache.get("k")
+
+    indexes, doc, tasks = asyncio.run(run())
+
+    ttl = [i for i in indexes.values() if list(i["key"]) == [("expires_at", 1)]]
+    assert ttl and ttl[0]["expireAfterSeconds"] == 0
+    assert timedelta(seconds=59) < doc["expires_at"] - datetime.utcnow() <= timedelta(seconds=60)
+    assert tasks == TASKS
+
+
+def test_expired_entries_are_misses_before_mongo_removes_them(mongomock_client):
+    client = mongomock_client
+    cache = DecompositionCache(client, ttl_seconds=60)
+
+    async def run():
+        await cache.put("k", TASKS)
+        await client.decompositions.update_one({"_id": "k"}, {"$set": {"expires_at": datetime.utcnow()}})
+        return await cache.get("k")
+
+    assert asyncio.run(run()) is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_refresh_bypasses_the_lookup_and_replaces_the_entry(mongomock_client, fake_mongo, token_budget):
+    service = JiraScrumMasterService(client=types.SimpleNamespace(), mongo_client=fake_mongo,
+                                     token_budget=token_budget)
+    service.decomposition_cache = DecompositionCache(mongomock_client)
+    calls = []
+
+    async def decompose_part_stream(text):
+        calls.append(text)
+        yield {"summary": f"Epic {len(calls)}"}
+
+    service._decompose_part_stream = decompose_part_stream
+
+    async def run():
+        first = await service.decompose_tasks("spec")
+        cached = await service.decompose_tasks("spec")
+        refreshed = await service.decompose_tasks("spec", use_cache=False)
+        return first, cached, refreshed, await service.decompose_tasks("spec")
+
+    first, cached, refreshed, after = asyncio.run(run())
+
+    assert first == cached == [{"summary": "Epic 1"}]
+    assert refreshed == after == [{"summary": "Epic 2"}]
+    assert len(calls) == 2
+    assert service.decomposition_cache.stats()["bypassed"] == 1
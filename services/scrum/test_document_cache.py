@@ -0,0 +1,119 @@
+"""
+Tests for the two-tier extracted document text cache.
+
+Run with: python -m pytest test_document_cache.py
+"""
+
+import asyncio
+
+from pymongo.errors import AutoReconnect, CollectionInvalid
+
+import document_cache
+from document_cache import DocumentTextCache, document_cache_key
+from extraction import PARSER_VERSION
+from ingestion import SpooledDocument
+
+
+class FakeTextStore:
+    """The document_text collection in memory; can be made unreachable."""
+
+    def __init__(self):
+        self.texts = {}
+        self.ensured = 0
+        self.down = False
+
+    async def ensure_document_text_collection(self, max_bytes):
+        self.ensured += 1
+
+    async def get_document_text(self, key):
+        if self.down:
+            raise AutoReconnect("mongo went away")
+        return self.texts.get(key)
+
+    async def save_document_text(self, key, text):
+        if self.down:
+            raise AutoReconnect("mongo went away")
+        self.texts[key] = text
+
+
+def test_key_covers_content_format_and_parser_version():
+    document = SpooledDocument("a.pdf", "pdf", "/tmp/a.pdf", 10, sha256="abc")
+
+    assert document_cache_key(document) == f"abc:pdf:{PARSER_VERSION}"
+
+
+def test_memory_tier_evicts_least_recently_used_by_bytes():
+    store = FakeTextStore()
+    cache = DocumentTextCache(store, max_bytes=30)
+
+    async def run():
+        await cache.put("a", "x" * 10)
+        await cache.put("b", "y" * 10)
+        await cache.get("a")
+        # 10 more bytes than fit: "b" was used least recently
+        await cache.put("c", "é" * 6)
+        return cache.stats()
+
+    stats = asyncio.run(run())
+
+    assert set(cache._entries) == {"a", "c"} and stats["bytes"] == 22
+    assert store.ensured == 1 and set(store.texts) == {"a", "b", "c"}
+
+
+def test_mongo_tier_serves_evicted_text_and_errors_are_misses():
+    store = FakeTextStore()
+    cache = DocumentTextCache(store, max_bytes=15)
+
+    async def run():
+        await cache.put("a", "x" * 10)
+        await cache.put("b", "y" * 10)
+        from_mongo = await cache.get("a")
+        store.down = True
+        await cache.put("c", "z" * 10)
+        missing = await cache.get("b")
+        return from_mongo, missing
+
+    from_mongo, missing = asyncio.run(run())
+
+    assert from_mongo == "x" * 10 and missing is None
+    assert cache.stats()["mongo_hits"] == 1 and cache.stats()["misses"] == 1
+    assert "c" in cache._entries
+
+
+def test_text_over_the_document_limit_stays_out_of_mongo(monkeypatch):
+    monkeypatch.setattr(document_cache, "MAX_STORED_TEXT_BYTES", 5)
+    store = FakeTextStore()
+    cache = DocumentTextCache(store, max_bytes=100)
+
+    asyncio.run(cache.put("big", "x" * 10))
+
+    assert store.texts == {} and "big" in cache._entries
+
+
+class CappedCollections:
+    """Records create_collection calls; mongomock has no capped collections."""
+
+    def __init__(self):
+        self.created = {}
+
+    async def create_collection(self, name, **options):
+        if name in self.created:
+            raise CollectionInvalid(f"collection {name} already exists")
+        self.created[name] = options
+
+
+def test_capped_collection_is_created_once_and_duplicates_are_ignored(mongomock_client):
+    client = mongomock_client
+    collections = CappedCollections()
+
+    async def run():
+        mock_db, client.db = client.db, collections
+        await client.ensure_document_text_collection(1024 * 1024)
+        await client.ensure_document_text_collection(1024 * 1024)
+        client.db = mock_db
+        await client.save_document_text("k", "text")
+        await client.save_document_text("k", "text")
+        return await client.get_document_text("k"), await client.get_document_text("other")
+
+    assert asyncio.run(run()) == ("text", None)
+    assert collections.created == {"document_text": {"capped": True, "size": 1024 * 1024}}
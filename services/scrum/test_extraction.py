@@ -0,0 +1,77 @@
+"""
+Tests for document extraction off the event loop.
+
+Run with: python -m pytest test_extraction.py
+"""
+
+import asyncio
+import os
+
+import docx
+import pytest
+
+import extraction
+from bench_extraction import make_pdf
+from extraction import DocumentExtractor
+from ingestion import SpooledDocument
+
+
+@pytest.fixture(scope="module")
+def pdf(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("pdf") / "spec.pdf")
+    make_pdf(path, 10)
+    return SpooledDocument("spec.pdf", "pdf", path, os.path.getsize(path))
+
+
+def extract(extractor, document):
+    async def run():
+        try:
+            return await extractor.extract(document)
+        finally:
+            extractor.shutdown()
+
+    return asyncio.run(run())
+
+
+def test_pdf_is_split_into_page_ranges_and_joined_in_order(monkeypatch, pdf):
+    ranges = []
+    extract_pages = extraction.extract_pdf_pages
+
+    def recording_extract_pages(path, start, stop):
+        ranges.append((start, stop))
+        return extract_pages(path, start, stop)
+
+    monkeypatch.setattr(extraction, "extract_pdf_pages", recording_extract_pages)
+
+    text = extract(DocumentExtractor(max_workers=0, pages_per_task=4), pdf)
+
+    assert sorted(ranges) == [(0, 4), (4, 8), (8, 10)]
+    positions = [text.index(f"Page {i} requirement 0:") for i in range(10)]
+    assert positions == sorted(positions)
+
+
+def test_process_pool_and_thread_fallback_give_the_same_text(pdf):
+    in_thread = extract(DocumentExtractor(max_workers=0, pages_per_task=3), pdf)
+    in_pool = extract(DocumentExtractor(max_workers=2, pages_per_task=3), pdf)
+    unsplit = extract(DocumentExtractor(max_workers=0, pages_per_task=100), pdf)
+
+    assert in_pool == in_thread == unsplit
+    assert in_thread.count("requirement 0:") == 10
+
+
+def test_docx_headings_become_markdown_headings(tmp_path):
+    path = str(tmp_path / "spec.docx")
+    document = docx.Document()
+    document.add_heading("Spec", level=0)
+    document.add_heading("Login", level=2)
+    document.add_paragraph("Users sign in with SSO.")
+    document.save(path)
+
+    text = extract(DocumentExtractor(max_workers=0), SpooledDocument("spec.docx", "docx", path, 0))
+
+    assert text.splitlines() == ["# Spec", "## Login", "Users sign in with SSO."]
+
+
+def test_unsupported_extension_is_rejected():
+    with pytest.raises(ValueError, match="Unsupported file type"):
+        extract(DocumentExtractor(max_workers=0), SpooledDocument("a.txt", "txt", "/nonexistent", 0))
@@ -0,0 +1,139 @@
+"""
+Tests for the pooled async HTTP client and its use by the Jira calls.
+
+Run with: python -m pytest test_http_client.py
+"""
+
+import asyncio
+import json
+import time
+import types
+
+import httpx
+import pytest
+
+from http_client import HttpClientPool
+from service import JiraScrumMasterService
+
+JIRA_LATENCY = 0.1
+
+
+class FakeJira:
+    """Jira API stand-in that answers every request after JIRA_LATENCY seconds."""
+
+    def __init__(self):
+        self.requests = []
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(JIRA_LATENCY)
+        self.requests.append((request.method, request.url.path))
+        if request.url.path.endswith("/sprints"):
+            return httpx.Response(200, json={"sprints": [{"id": 1, "state": "active", "name": "Sprint 1"}]})
+        key = f"SCRUM-{len(self.requests)}"
+        return httpx.Response(200, json={"id": str(len(self.requests)), "key": key, "self": f"https://jira.test/{key}"})
+
+
+@pytest.fixture
+def make_service(fake_completions, fake_mongo, token_budget):
+    def make(jira: FakeJira) -> JiraScrumMasterService:
+        service = JiraScrumMasterService(
+            client=types.SimpleNamespace(chat=types.SimpleNamespace(completions=fake_completions)),
+            mongo_client=fake_mongo,
+            http=HttpClientPool(transport=httpx.MockTransport(jira), backoff_base=0),
+            token_budget=token_budget
+        )
+        # One POST per issue, so the batch keeps many requests in flight
+        service.jira_bulk_supported = False
+        return service
+
+    return make
+
+
+def test_chat_streams_keep_flowing_during_jira_batch(make_service, make_batch, fake_completions):
+    jira = FakeJira()
+    service = make_service(jira)
+
+    async def consume_chat(session_id):
+        gaps = []
+        last = time.perf_counter()
+        async for _ in service.chat("What is left in the sprint?", session_id):
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+        return gaps
+
+    async def run():
+        batch = asyncio.create_task(service.create_jira_tasks(make_batch(), "test-token"))
+        await asyncio.sleep(JIRA_LATENCY * 1.5)  # let the batch get going
+        assert not batch.done()
+        chat_gaps = await asyncio.gather(*[consume_chat(f"session-{i}") for i in range(3)])
+        # Every chat stream finished while the batch was still creating issues
+        assert not batch.done()
+        created = await batch
+        await service.close()
+        return chat_gaps, created
+
+    chat_gaps, created = asyncio.run(run())
+
+    # A blocking Jira call would stall the streams for a full JIRA_LATENCY
+    for gaps in chat_gaps:
+        assert len(gaps) > fake_completions.chunks
+        assert max(gaps) < JIRA_LATENCY / 2
+    assert [item["jira_key"] for item in created]
+    posts = [path for method, path in jira.requests if method == "POST"]
+    assert len(posts) == 3 + 3 * 2 + 3 * 2 * 2 + 1  # epics, stories, subtasks, sprint move
+
+
+def test_idempotent_requests_retry_transient_errors():
+    statuses = [503, 502, 200]
+    seen = []
+
+    def handler(request):
+        seen.append(request.method)
+        return httpx.Response(statuses[len(seen) - 1], json={"ok": True})
+
+    async def run():
+        pool = HttpClientPool(transport=httpx.MockTransport(handler), retries=3, backoff_base=0)
+        response = await pool.get("http://jira.test/issues")
+        await pool.aclose()
+        return response
+
+    response = asyncio.run(run())
+    assert response.status_code == 200
+    assert seen == ["GET", "GET", "GET"]
+
+
+def test_posts_are_not_retried_on_server_errors():
+    seen = []
+
+    def handler(request):
+        seen.append(json.loads(request.content))
+        return httpx.Response(503)
+
+    async def run():
+        pool = HttpClientPool(transport=httpx.MockTransport(handler), retries=3, backoff_base=0)
+        response = await pool.post("http://jira.test/issues", json={"summary": "x"})
+        await pool.aclose()
+        return response
+
+    response = asyncio.run(run())
+    assert response.status_code == 503
+    assert len(seen) == 1
+
+
+def test_posts_retry_when_rate_limited():
+    statuses = [429, 200]
+    seen = []
+
+    def handler(request):
+        seen.append(request.method)
+        return httpx.Response(statuses[len(seen) - 1], headers={"Retry-After": "0"}, json={"key": "SCRUM-1"})
+
+    async def run():
+        pool = HttpClientPool(transport=httpx.MockTransport(handler), retries=3, backoff_base=0)
+        response = await pool.post("http://jira.test/issues", json={"summary": "x"})
+        await pool.aclose()
+        return response
+
+    assert asyncio.run(run()).json() == {"key": "SCRUM-1"}
+    assert seen == ["POST", "POST"]
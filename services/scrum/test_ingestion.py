@@ -0,0 +1,75 @@
+"""
+Tests for spooling uploads to disk with per-format size limits.
+
+Run with: python -m pytest test_ingestion.py
+"""
+
+import asyncio
+import hashlib
+import io
+import os
+
+import pytest
+from fastapi import UploadFile
+from fastapi.testclient import TestClient
+
+import ingestion
+import main
+from config import settings
+from ingestion import UploadTooLargeError, spool_upload
+
+
+@pytest.fixture(autouse=True)
+def spool_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "UPLOAD_SPOOL_DIR", str(tmp_path))
+    monkeypatch.setitem(ingestion.SIZE_LIMITS, "md", 1000)
+    return tmp_path
+
+
+def upload(data: bytes, filename="spec.md", size=None) -> UploadFile:
+    return UploadFile(file=io.BytesIO(data), filename=filename, size=size)
+
+
+def test_upload_is_spooled_in_chunks_and_removed_on_close(spool_dir):
+    data = b"# Spec\n" * 100
+
+    document = asyncio.run(spool_upload(upload(data), chunk_size=64))
+
+    assert document.size == len(data) and document.extension == "md"
+    assert document.sha256 == hashlib.sha256(data).hexdigest()
+    with document.open() as f:
+        assert f.read() == data
+    document.close()
+    assert os.listdir(spool_dir) == []
+
+
+def test_oversized_upload_is_rejected_while_copying_and_its_spool_file_removed(spool_dir):
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(spool_upload(upload(b"x" * 1500), chunk_size=100))
+
+    assert os.listdir(spool_dir) == []
+
+
+def test_declared_size_over_the_limit_is_rejected_before_reading(spool_dir):
+    file = upload(b"small", size=5000)
+
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(spool_upload(file))
+
+    assert file.file.tell() == 0 and os.listdir(spool_dir) == []
+
+
+def test_unsupported_extension_is_a_value_error():
+    with pytest.raises(ValueError, match="Unsupported file type"):
+        asyncio.run(spool_upload(upload(b"x", filename="notes.txt")))
+
+
+@pytest.mark.parametrize("path", ["/decompose", "/jobs/decompose"])
+def test_endpoints_answer_413_for_oversized_uploads(monkeypatch, spool_dir, path):
+    monkeypatch.setattr(main.service, "start_warmup", lambda: None)
+
+    with TestClient(main.app) as client:
+        response = client.post(path, files={"file": ("spec.md", b"x" * 1500)}, headers={"Authorization": "Bearer t"})
+
+    assert response.status_code == 413 and "limit" in response.json()["detail"]
+    assert os.listdir(spool_dir) == []
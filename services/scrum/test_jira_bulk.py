@@ -0,0 +1,149 @@
+"""
+Tests for bulk Jira creation against the fake Jira server.
+
+Run with: python -m pytest test_jira_bulk.py
+"""
+
+import asyncio
+import types
+
+import httpx
+import pytest
+from fastapi.responses import JSONResponse
+
+from config import settings
+from fake_jira import create_fake_jira
+from http_client import HttpClientPool
+from jira_scheduler import RateLimiterRegistry
+from service import JiraScrumMasterService
+
+
+@pytest.fixture(autouse=True)
+def fake_jira_url(monkeypatch):
+    monkeypatch.setattr(settings, "JIRA_API_URL", "http://jira.test")
+    # Bulk creation is off by default
+    monkeypatch.setattr(settings, "JIRA_BULK_BATCH_SIZE", 50)
+
+
+@pytest.fixture
+def create(fake_completions, fake_mongo, token_budget):
+    """Create `batch` in the fake Jira `app`; returns the service and the created forest."""
+    def create_batch(app, batch):
+        async def run():
+            service = JiraScrumMasterService(
+                client=types.SimpleNamespace(chat=types.SimpleNamespace(completions=fake_completions)),
+                mongo_client=fake_mongo,
+                http=HttpClientPool(transport=httpx.ASGITransport(app=app), backoff_base=0),
+                token_budget=token_budget
+            )
+            service.jira_rate_limiters = RateLimiterRegistry(rate=0)
+            try:
+                return service, await service.create_jira_tasks(batch, "test-token")
+            finally:
+                await service.close()
+
+        return asyncio.run(run())
+
+    return create_batch
+
+
+def posts(app, path):
+    return [p for method, p in app.state.jira.requests if method == "POST" and p == path]
+
+
+def assert_tree_created(app, created):
+    issues = app.state.jira.issues
+    for epic in created:
+        assert issues[epic["jira_key"]]["fields"]["summary"] == epic["summary"]
+        for story in epic["stories"]:
+            assert issues[story["jira_key"]]["fields"]["summary"] == story["summary"]
+            for subtask in story["subtasks"]:
+                fields = issues[subtask["jira_key"]]["fields"]
+                assert fields["summary"] == subtask["summary"]
+                assert fields["parent"]["key"] == story["jira_key"]
+
+
+def test_siblings_are_coalesced_into_bulk_requests(create, make_batch):
+    app = create_fake_jira(latency=0.01)
+
+    _, created = create(app, make_batch(epics=3, stories=4, subtasks=3))
+
+    assert len(created) == 3
+    assert_tree_created(app, created)
+    assert len(app.state.jira.issues) == 3 + 12 + 36
+    assert not posts(app, "/issues") and not posts(app, "/subtasks")
+    # Stories and subtasks each take a handful of bulk requests, not one per issue
+    assert len(posts(app, "/issues/bulk")) <= 3
+    assert len(posts(app, "/subtasks/bulk")) <= 12
+    assert sorted(app.state.jira.sprint_issues[1]) == sorted(
+        story["jira_key"] for epic in created for story in epic["stories"]
+    )
+
+
+def test_batches_respect_the_configured_size(monkeypatch, create, make_batch):
+    monkeypatch.setattr(settings, "JIRA_BULK_BATCH_SIZE", 5)
+    app = create_fake_jira()
+
+    _, created = create(app, make_batch(epics=1, stories=12, subtasks=0))
+
+    assert_tree_created(app, created)
+    assert len(posts(app, "/issues/bulk")) == 3
+
+
+def test_rejected_elements_fall_back_to_single_creates(create, make_batch):
+    app = create_fake_jira(flaky_summaries={"Story 0.1", "Subtask 1.0.1"})
+
+    _, created = create(app, make_batch())
+
+    assert_tree_created(app, created)
+    assert len(posts(app, "/issues")) == 1
+    assert len(posts(app, "/subtasks")) == 1
+
+
+def test_permanently_rejected_element_is_marked_failed(create, make_batch):
+    app = create_fake_jira(fail_summaries={"Subtask 0.0.0"})
+
+    _, created = create(app, make_batch())
+
+    subtask = created[0]["stories"][0]["subtasks"][0]
+    assert "jira_error" in subtask and "jira_key" not in subtask
+    assert created[0]["stories"][0]["subtasks"][1]["jira_key"]
+
+
+def test_falls_back_to_single_creates_without_bulk_endpoint(create, make_batch):
+    app = create_fake_jira(bulk=False)
+
+    service, created = create(app, make_batch())
+
+    assert_tree_created(app, created)
+    assert not service.jira_bulk_supported
+    assert len(posts(app, "/issues")) == 6
+    assert len(posts(app, "/subtasks")) == 12
+
+
+@pytest.mark.parametrize("status", [400, 501])
+def test_first_bulk_request_rejected_as_a_whole_falls_back_to_single_creates(status, create, make_batch):
+    app = create_fake_jira(bulk=False)
+
+    @app.post("/issues/bulk")
+    @app.post("/subtasks/bulk")
+    async def bulk_rejected():
+        return JSONResponse({"errorMessages": ["bulk is not available"]}, status_code=status)
+
+    service, created = create(app, make_batch())
+
+    assert_tree_created(app, created)
+    assert not service.jira_bulk_supported
+    assert len(posts(app, "/issues/bulk")) + len(posts(app, "/subtasks/bulk")) == 1
+    assert len(posts(app, "/issues")) == 6
+
+
+def test_bulk_creation_is_off_with_a_batch_size_of_one(monkeypatch, create, make_batch):
+    monkeypatch.setattr(settings, "JIRA_BULK_BATCH_SIZE", 1)
+    app = create_fake_jira()
+
+    service, created = create(app, make_batch())
+
+    assert_tree_created(app, created)
+    assert not posts(app, "/issues/bulk") and not posts(app, "/subtasks/bulk")
+    assert len(posts(app, "/issues")) == 6 and len(posts(app, "/subtasks")) == 12
@@ -0,0 +1,123 @@
+"""
+Tests for resumable, idempotent Jira batch jobs.
+
+Run with: python -m pytest test_jira_jobs.py
+"""
+
+import asyncio
+import copy
+import types
+
+import httpx
+import pytest
+
+from config import settings
+from fake_jira import create_fake_jira
+from http_client import HttpClientPool
+from jira_jobs import child_node_ids
+from jira_scheduler import RateLimiterRegistry
+from service import JiraScrumMasterService
+
+
+@pytest.fixture(autouse=True)
+def fake_jira_url(monkeypatch):
+    monkeypatch.setattr(settings, "JIRA_API_URL", "http://jira.test")
+
+
+@pytest.fixture
+def make_service(token_budget):
+    def make(app, mongo_client) -> JiraScrumMasterService:
+        service = JiraScrumMasterService(
+            client=types.SimpleNamespace(),
+            mongo_client=mongo_client,
+            http=HttpClientPool(transport=httpx.ASGITransport(app=app), backoff_base=0),
+            token_budget=token_budget
+        )
+        service.jira_rate_limiters = RateLimiterRegistry(rate=0)
+        return service
+
+    return make
+
+
+@pytest.fixture
+def submit(make_service):
+    def run_batch(app, mongo_client, batch):
+        async def run():
+            service = make_service(app, mongo_client)
+            try:
+                return await service.create_jira_tasks(copy.deepcopy(batch), "test-token")
+            finally:
+                await service.close()
+
+        return asyncio.run(run())
+
+    return run_batch
+
+
+def test_retry_creates_only_missing_issues(submit, mongomock_client, make_batch):
+    app = create_fake_jira(fail_summaries={"Story 1.1"})
+    jira = app.state.jira
+    mongo_client = mongomock_client
+    batch = make_batch()
+
+    submit(app, mongo_client, batch)
+    assert len(jira.issues) == 3 + 5 + 10
+    job = mongo_client.jira_jobs._collection.find_one()
+    assert job["status"] == "failed"
+    assert len(job["nodes"]) == 18
+
+    jira.fail_summaries.clear()
+    moved_before = list(jira.sprint_issues[1])
+    created = submit(app, mongo_client, batch)
+
+    # Only the failed story and its two subtasks were created on retry
+    assert len(jira.issues) == 21
+    summaries = [issue["fields"]["summary"] for issue in jira.issues.values()]
+    assert len(set(summaries)) == 21
+    assert [key for key in jira.sprint_issues[1] if key not in moved_before] == [created[1]["stories"][1]["jira_key"]]
+    assert mongo_client.jira_jobs._collection.find_one()["status"] == "completed"
+
+
+def test_completed_job_is_not_submitted_again(submit, mongomock_client, make_batch):
+    app = create_fake_jira()
+    mongo_client = mongomock_client
+    batch = make_batch()
+
+    first = submit(app, mongo_client, batch)
+    requests = len(app.state.jira.requests)
+    second = submit(app, mongo_client, batch)
+
+    assert len(app.state.jira.requests) == requests
+    assert [epic["jira_key"] for epic in second] == [epic["jira_key"] for epic in first]
+
+
+def test_concurrent_duplicate_submissions_create_once(make_service, mongomock_client, make_batch):
+    app = create_fake_jira(latency=0.01)
+    mongo_client = mongomock_client
+    batch = make_batch()
+
+    async def run():
+        service = make_service(app, mongo_client)
+        try:
+            return await asyncio.gather(*[
+                service.create_jira_tasks(copy.deepcopy(batch), "test-token") for _ in range(3)
+            ])
+        finally:
+            await service.close()
+
+    results = asyncio.run(run())
+
+    assert len(app.state.jira.issues) == 21
+    assert results[0] == results[1] == results[2]
+
+
+def test_node_ids_follow_summaries_not_positions():
+    nodes = [{"summary": "Build API"}, {"summary": "Write docs"}, {"summary": "build  api"}]
+
+    ids = child_node_ids("parent", "story", nodes)
+    reordered = child_node_ids("parent", "story", [nodes[1], nodes[0], nodes[2]])
+
+    assert len(set(ids)) == 3
+    assert ids[1] == reordered[0]
+    assert ids[0] == reordered[1]
+    assert child_node_ids("other", "story", nodes) != ids
@@ -0,0 +1,150 @@
+"""
+Tests for the dependency-aware Jira creation scheduler.
+
+Run with: python -m pytest test_jira_scheduler.py
+"""
+
+import asyncio
+import time
+
+from jira_scheduler import JiraCreationScheduler, TokenBucket
+
+LATENCY = 0.05
+
+
+class FakeJiraService:
+    """Records create/move calls and tracks how many run at once."""
+
+    jira_bulk_supported = False
+
+    def __init__(self, fail_summaries=()):
+        self.calls = []
+        self.moves = []
+        self.created = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.fail_summaries = set(fail_summaries)
+
+    async def _create(self, summary, parent_key=None):
+        assert parent_key is None or parent_key in self.created
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(LATENCY)
+        finally:
+            self.in_flight -= 1
+        if summary in self.fail_summaries:
+            raise ValueError(f"Failed to create {summary}")
+        key = f"SCRUM-{len(self.calls) + 1}"
+        self.calls.append((summary, parent_key))
+        self.created.add(key)
+        return {"id": key, "key": key, "self": f"https://jira.test/{key}"}
+
+    def task_payload(self, summary, **kwargs):
+        return {"summary": summary}
+
+    async def create_epic(self, summary, token):
+        return await self._create(summary)
+
+    async def create_task(self, summary, assignee_email=None, due_date=None, token=None):
+        return await self._create(summary)
+
+    async def create_subtask(self, summary, parent_key, token):
+        return await self._create(summary, parent_key)
+
+    async def move_issues_to_sprint(self, sprint_id, issue_keys, token):
+        self.moves.append(list(issue_keys))
+
+
+def make_scheduler(service, concurrency=8, rate=0, chunk_size=20, sprint_id=1):
+    return JiraCreationScheduler(
+        service, "test-token", sprint_id,
+        semaphore=asyncio.Semaphore(concurrency),
+        rate_limiter=TokenBucket(rate, 1),
+        sprint_chunk_size=chunk_size
+    )
+
+
+def test_tree_is_created_level_by_level_in_parallel(make_batch):
+    service = FakeJiraService()
+
+    async def run():
+        start = time.perf_counter()
+        created = await make_scheduler(service, concurrency=100).run(make_batch())
+        return created, time.perf_counter() - start
+
+    created, elapsed = asyncio.run(run())
+
+    assert len(created) == 3
+    assert len(service.calls) == 3 + 6 + 12
+    # Three dependency levels, not 21 sequential round trips
+    assert elapsed < LATENCY * 6
+    for epic in created:
+        for story in epic["stories"]:
+            for subtask in story["subtasks"]:
+                assert (subtask["summary"], story["jira_key"]) in service.calls
+
+
+def test_concurrency_cap_and_chunked_sprint_moves(make_batch):
+    service = FakeJiraService()
+
+    async def run():
+        scheduler = make_scheduler(service, concurrency=2, chunk_size=4)
+        await scheduler.run(make_batch())
+        return scheduler
+
+    scheduler = asyncio.run(run())
+
+    assert service.max_in_flight == 2
+    # Six stories go to the sprint: one full chunk of four, then the rest
+    assert sorted(len(chunk) for chunk in service.moves) == [2, 4]
+    assert sorted(sum(service.moves, [])) == sorted(scheduler.created_issue_keys)
+
+
+def test_failed_parent_skips_its_children(make_batch):
+    service = FakeJiraService(fail_summaries={"Epic 1", "Story 0.1"})
+
+    async def run():
+        return await make_scheduler(service).run(make_batch())
+
+    created = asyncio.run(run())
+
+    assert [epic["summary"] for epic in created] == ["Epic 0", "Epic 2"]
+    failed_story = created[0]["stories"][1]
+    assert "jira_error" in failed_story
+    assert all("jira_key" not in subtask for subtask in failed_story["subtasks"])
+    assert not any(summary.startswith(("Story 1.", "Subtask 1.", "Subtask 0.1.")) for summary, _ in service.calls)
+
+
+def test_token_bucket_limits_rate():
+    async def run():
+        bucket = TokenBucket(rate=50, burst=5)
+        start = time.perf_counter()
+        for _ in range(15):
+            await bucket.acquire()
+        return time.perf_counter() - start
+
+    # Five calls from the burst, then ten more at 50 per second
+    assert asyncio.run(run()) >= 10 / 50 * 0.9
+
+
+def test_token_waiting_for_its_rate_limit_does_not_hold_a_shared_slot():
+    async def run():
+        semaphore = asyncio.Semaphore(1)
+        empty_bucket = TokenBucket(2, 1)
+        empty_bucket.tokens = 0
+        heavy = JiraCreationScheduler(FakeJiraService(), "heavy-token", None, semaphore, empty_bucket)
+        light = JiraCreationScheduler(FakeJiraService(), "light-token", None, semaphore, TokenBucket(0, 1))
+
+        heavy_run = asyncio.create_task(heavy.run([{"summary": "Heavy", "type": "Epic"}]))
+        await asyncio.sleep(0)
+        start = time.perf_counter()
+        await light.run([{"summary": f"Light {i}", "type": "Epic"} for i in range(3)])
+        light_elapsed = time.perf_counter() - start
+        await heavy_run
+        return light_elapsed, time.perf_counter() - start
+
+    light_elapsed, total = asyncio.run(run())
+
+    # The heavy token waits ~0.5 s for its bucket while the light one runs
+    assert light_elapsed < 0.3 <= total
@@ -0,0 +1,225 @@
+"""
+Tests for the incremental Jira sync against the fake Jira server.
+
+Run with: python -m pytest test_jira_sync.py
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import httpx
+import pytest
+
+from config import settings
+from fake_jira import create_fake_jira
+from http_client import HttpClientPool
+from jira_sync import SYNC_STATE_ID, JiraSyncWorker
+
+START = datetime(2024, 5, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture(autouse=True)
+def fake_jira_url(monkeypatch):
+    monkeypatch.setattr(settings, "JIRA_API_URL", "http://jira.test")
+
+
+class FakeSyncMongo:
+    """jira_cache and sync_state in memory; can fail one cache write after `fail_after` others."""
+
+    def __init__(self, fail_after=None):
+        self.cache = {}
+        self.state = {}
+        self.writes = 0
+        self.version = 0
+        self.fail_after = fail_after
+
+    async def cache_jira_issues(self, issues):
+        if self.writes == self.fail_after:
+            self.fail_after = None
+            raise ConnectionError("mongo went away")
+        self.writes += 1
+        for issue in issues:
+            self.cache[issue["key"]] = issue
+
+    async def bump_jira_cache_version(self):
+        self.version += 1
+
+    async def get_sync_state(self, name):
+        return self.state.get(name)
+
+    async def save_sync_state(self, name, fields):
+        self.state.setdefault(name, {"_id": name}).update(fields)
+
+
+def make_jira(count, spacing_seconds=20):
+    """A fake Jira with `count` issues, updated `spacing_seconds` apart, several per minute."""
+    app = create_fake_jira()
+    state = app.state.jira
+    for i in range(count):
+        key = state.create("Task", {"summary": f"Task {i}"})["key"]
+        state.issues[key]["fields"]["updated"] = (START + timedelta(seconds=i * spacing_seconds)).isoformat()
+    return app
+
+
+def sync(app, mongo, runs=1, **kwargs):
+    async def run():
+        http = HttpClientPool(transport=httpx.ASGITransport(app=app), retries=0)
+        received = []
+        worker = JiraSyncWorker(http, mongo, on_issues=received.extend, page_size=7, **kwargs)
+        try:
+            counts = [await worker.sync_once() for _ in range(runs)]
+            return counts, received, worker.stats()
+        finally:
+            await http.aclose()
+
+    return asyncio.run(run())
+
+
+def list_requests(app):
+    return [p for method, p in app.state.jira.requests if method == "GET" and p == "/issues"]
+
+
+def test_first_run_pages_through_every_issue():
+    app = make_jira(250)
+    mongo = FakeSyncMongo()
+
+    counts, received, stats = sync(app, mongo)
+
+    assert len(mongo.cache) == 250
+    assert counts == [len(received)] and 250 <= counts[0] < 300
+    # One request, one bulk write and one cache version bump per page
+    assert mongo.writes == mongo.version == len(list_requests(app)) < 250 // 7 + 10
+    watermark = mongo.state[SYNC_STATE_ID]["watermark"]
+    assert datetime.fromisoformat(watermark) == START + timedelta(seconds=249 * 20)
+    assert stats["last_error"] is None
+
+
+def test_pages_within_one_minute_are_not_skipped_or_repeated():
+    app = make_jira(30, spacing_seconds=1)
+    mongo = FakeSyncMongo()
+
+    counts, received, _ = sync(app, mongo)
+
+    assert len(mongo.cache) == 30
+    assert counts == [30] and len({issue["key"] for issue in received}) == 30
+
+
+def test_later_runs_fetch_only_changed_issues():
+    app = make_jira(250)
+    mongo = FakeSyncMongo()
+    sync(app, mongo, overlap_seconds=0)
+    app.state.jira.touch("SCRUM-3", summary="Renamed")
+    app.state.jira.touch("SCRUM-100", status={"name": "Done"})
+    requests_before = len(list_requests(app))
+
+    counts, received, _ = sync(app, mongo, overlap_seconds=0)
+
+    changed = {issue["key"]: issue for issue in received}
+    assert {"SCRUM-3", "SCRUM-100"} <= set(changed)
+    # Besides the edits, only issues from the old watermark's minute are read again
+    assert counts[0] <= 2 + 3
+    assert len(list_requests(app)) - requests_before == 1
+    assert mongo.cache["SCRUM-3"]["summary"] == "Renamed"
+    assert mongo.cache["SCRUM-100"]["status"] == "Done"
+    assert datetime.fromisoformat(mongo.state[SYNC_STATE_ID]["watermark"]) > START + timedelta(days=1)
+
+
+def test_failed_write_keeps_the_watermark_of_stored_pages():
+    app = make_jira(50)
+    mongo = FakeSyncMongo(fail_after=1)
+
+    counts, _, stats = sync(app, mongo)
+
+    # Only the first page was stored, and the watermark stops there
+    assert counts == [0] and "mongo went away" in stats["last_error"]
+    assert len(mongo.cache) == 7
+    assert datetime.fromisoformat(mongo.state[SYNC_STATE_ID]["watermark"]) == START + timedelta(seconds=6 * 20)
+
+    counts, _, stats = sync(app, mongo, overlap_seconds=0)
+
+    assert len(mongo.cache) == 50 and stats["last_error"] is None
+
+
+def test_gateway_ignoring_paging_params_does_not_loop():
+    issues = [{"key": f"SCRUM-{i}", "fields": {"summary": f"Task {i}",
+                                               "updated": (START + timedelta(seconds=i)).isoformat()}}
+              for i in range(7)]
+    calls = []
+
+    def gateway(request):
+        # Like the old gateway: jql, startAt and maxResults are ignored
+        calls.append(request.url.params.get("startAt"))
+        return httpx.Response(200, json={"issues": issues})
+
+    mongo = FakeSyncMongo()
+
+    async def run():
+        http = HttpClientPool(transport=httpx.MockTransport(gateway), retries=0)
+        worker = JiraSyncWorker(http, mongo, page_size=7)
+        try:
+            return await worker.sync_once()
+        finally:
+            await http.aclose()
+
+    count = asyncio.run(run())
+
+    assert count == 7 and len(calls) == 2
+    assert mongo.writes == mongo.version == 1
+
+
+def test_runs_stop_after_max_pages():
+    app = make_jira(50)
+    mongo = FakeSyncMongo()
+
+    counts, _, _ = sync(app, mongo, max_pages=3)
+
+    assert counts == [21] and len(list_requests(app)) == 3
+    assert datetime.fromisoformat(mongo.state[SYNC_STATE_ID]["watermark"]) == START + timedelta(seconds=20 * 20)
+
+
+@pytest.mark.parametrize("jira_timezone, found", [("America/New_York", True), ("UTC", False)])
+def test_jql_dates_are_written_in_the_jira_users_timezone(jira_timezone, found):
+    app = make_jira(20)
+    app.state.jira.timezone = ZoneInfo("America/New_York")
+    mongo = FakeSyncMongo()
+    sync(app, mongo, overlap_seconds=0, jira_timezone=jira_timezone)
+    # Edited an hour after the watermark: a UTC literal read as New York time skips it
+    edited = datetime.fromisoformat(mongo.state[SYNC_STATE_ID]["watermark"]) + timedelta(hours=1)
+    app.state.jira.issues["SCRUM-5"]["fields"].update(summary="Edited", updated=edited.isoformat())
+
+    _, received, _ = sync(app, mongo, overlap_seconds=0, jira_timezone=jira_timezone)
+
+    assert ("SCRUM-5" in {issue["key"] for issue in received}) == found
+
+
+def test_page_positions_count_issues_that_were_not_stored():
+    # A keyless issue and two more in the last minute of the first page
+    times = [START, START + timedelta(seconds=70), START + timedelta(seconds=80)] + \
+        [START + timedelta(seconds=90 + i) for i in range(3)]
+    issues = [{"key": None if i == 1 else f"SCRUM-{i}", "fields": {"summary": f"Task {i}", "updated": t.isoformat()}}
+              for i, t in enumerate(times)]
+    returned = []
+
+    def gateway(request):
+        start_at, max_results = int(request.url.params["startAt"]), int(request.url.params["maxResults"])
+        match = request.url.params["jql"].split('"')
+        since = datetime.strptime(match[1], "%Y/%m/%d %H:%M").replace(tzinfo=timezone.utc) if len(match) > 1 else None
+        page = [issue for issue in issues
+                if since is None or datetime.fromisoformat(issue["fields"]["updated"]) >= since]
+        page = page[start_at:start_at + max_results]
+        returned.extend(page)
+        return httpx.Response(200, json={"issues": page})
+
+    mongo = FakeSyncMongo()
+
+    async def run():
+        http = HttpClientPool(transport=httpx.MockTransport(gateway), retries=0)
+        try:
+            return await JiraSyncWorker(http, mongo, page_size=3, overlap_seconds=0).sync_once()
+        finally:
+            await http.aclose()
+
+    assert asyncio.run(run()) == 5
+    # Every issue is read exactly once
+    assert len(returned) == len(issues)
@@ -0,0 +1,172 @@
+"""
+Tests for the background job queue and the /jobs endpoints.
+
+Run with: python -m pytest test_job_queue.py
+"""
+
+import asyncio
+import json
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from job_queue import InProcessJobQueue, JobQueue, JobQueueFullError
+
+
+def test_workers_bound_concurrency_and_record_results():
+    running = 0
+    max_running = 0
+
+    async def handler(payload, emit):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await emit({"event": "started", "n": payload["n"]})
+        await asyncio.sleep(0.02)
+        running -= 1
+        if payload["n"] == 3:
+            raise ValueError("bad input")
+        return payload["n"] * 2
+
+    async def run():
+        queue = InProcessJobQueue(workers=2, max_size=10)
+        queue.register("double", handler)
+        jobs = [await queue.submit("double", {"n": n}) for n in range(5)]
+        assert all(job.status == "queued" for job in jobs)
+        while not all(job.done for job in jobs):
+            await asyncio.sleep(0.01)
+        await queue.close()
+        return jobs
+
+    jobs = asyncio.run(run())
+
+    assert max_running == 2
+    assert [job.status for job in jobs] == ["succeeded"] * 3 + ["failed", "succeeded"]
+    assert jobs[4].result == 8
+    assert jobs[3].error == "bad input"
+    assert jobs[0].public()["progress"] == {"event": "started", "n": 0}
+
+
+def test_events_replay_then_follow_live():
+    async def run():
+        gate = asyncio.Event()
+
+        async def handler(payload, emit):
+            await emit({"event": "first"})
+            await gate.wait()
+            await emit({"event": "second"})
+            return "done"
+
+        queue = InProcessJobQueue(workers=1)
+        queue.register("steps", handler)
+        job = await queue.submit("steps", {})
+        while not job.events:
+            await asyncio.sleep(0.001)
+
+        async def follow(after):
+            return [event["event"] async for event in queue.events(job.id, after)]
+
+        followers = [asyncio.create_task(follow(0)), asyncio.create_task(follow(1))]
+        await asyncio.sleep(0.01)
+        gate.set()
+        seen = await asyncio.gather(*followers)
+        await queue.close()
+        return seen
+
+    assert asyncio.run(run()) == [["first", "second"], ["second"]]
+
+
+def test_full_queue_rejects_and_finished_jobs_expire():
+    cleaned = []
+
+    async def handler(payload, emit):
+        await asyncio.sleep(0.05)
+
+    async def run():
+        queue = InProcessJobQueue(workers=1, max_size=1, result_ttl_seconds=0.05)
+        queue.register("slow", handler, cleanup=lambda payload: cleaned.append(payload["n"]))
+        first = await queue.submit("slow", {"n": 1})
+        await asyncio.sleep(0)  # the worker takes the first job
+        await queue.submit("slow", {"n": 2})
+        with pytest.raises(JobQueueFullError):
+            await queue.submit("slow", {"n": 3})
+
+        while queue.get(first.id).status != "succeeded":
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.06)
+        expired = queue.get(first.id)
+        await queue.close()
+        return expired
+
+    assert asyncio.run(run()) is None
+    # The second job was discarded at shutdown and still cleaned up
+    assert cleaned == [1, 2]
+
+
+def test_decompose_job_endpoints(monkeypatch):
+    spooled = {}
+
+    async def parse_document(document):
+        spooled["path"] = document.path
+        with document.open() as f:
+            return f.read().decode()
+
+    async def get_organization_info(token):
+        return {"users": []}
+
+    async def decompose_pipeline(text, organization, token, use_cache=True):
+        yield {"event": "epic_decomposed", "index": 1, "summary": text}
+        await asyncio.sleep(0.05)
+        yield {"event": "epic_created", "summary": text, "jira_key": "SCRUM-1"}
+        yield {"event": "completed", "tasks": [{"summary": text, "jira_key": "SCRUM-1"}]}
+
+    def start_warmup():
+        pass
+
+    monkeypatch.setattr(main.service, "parse_document", parse_document)
+    monkeypatch.setattr(main.service, "get_organization_info", get_organization_info)
+    monkeypatch.setattr(main.service, "decompose_pipeline", decompose_pipeline)
+    monkeypatch.setattr(main.service, "start_warmup", start_warmup)
+    monkeypatch.setattr(main, "job_queue", InProcessJobQueue(workers=1))
+    main.job_queue.register("decompose", main.run_decompose_job, cleanup=main.discard_decompose_job)
+
+    with TestClient(main.app) as client:
+        assert client.post("/jobs/decompose", files={"file": ("spec.md", b"Build login")}).status_code == 401
+
+        response = client.post(
+            "/jobs/decompose",
+            files={"file": ("spec.md", b"Build login")},
+            headers={"Authorization": "Bearer test-token"}
+        )
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+
+        with client.stream("GET", f"/jobs/{job_id}/events") as stream:
+            body = "".join(stream.iter_text())
+        names = [line.split(": ", 1)[1] for line in body.splitlines() if line.startswith("event: ")]
+        assert names == ["epic_decomposed", "epic_created", "succeeded"]
+        final = json.loads(body.strip().splitlines()[-1].split(": ", 1)[1])
+        assert final["result"] == [{"summary": "Build login", "jira_key": "SCRUM-1"}]
+
+        status = client.get(f"/jobs/{job_id}").json()
+        assert status["status"] == "succeeded"
+        assert status["progress"]["message"] == "Created SCRUM-1 Build login in Jira"
+        assert not os.path.exists(spooled["path"])
+
+        with client.stream("GET", f"/jobs/{job_id}/events", headers={"Last-Event-ID": "0"}) as stream:
+            assert "epic_decomposed" not in "".join(stream.iter_text())
+        assert client.get("/jobs/unknown").status_code == 404
+
+
+def test_queue_implementations_must_provide_the_whole_interface():
+    class SubmitOnly(JobQueue):
+        async def submit(self, kind, payload):
+            return None
+
+    with pytest.raises(TypeError):
+        JobQueue()
+    with pytest.raises(TypeError, match="events"):
+        SubmitOnly()
+    assert isinstance(InProcessJobQueue(workers=1, max_size=1), JobQueue)
@@ -0,0 +1,129 @@
+"""
+Tests for the incremental Epic parser used by streamed decomposition.
+
+Run with: python -m pytest test_json_stream.py
+"""
+
+import asyncio
+import json
+import types
+
+import pytest
+
+from json_stream import EpicStreamParser
+from service import JiraScrumMasterService
+
+EPICS = [
+    {"summary": "Auth", "required_skills": ["Backend"], "stories": [
+        {"summary": "Login {with} \"SSO\"", "subtasks": [{"summary": "Callback \\ path ]"}]},
+    ]},
+    {"summary": "Billing", "required_skills": [], "stories": []},
+]
+
+
+def feed_in_chunks(text, size):
+    parser = EpicStreamParser()
+    epics = []
+    for start in range(0, len(text), size):
+        epics.extend(parser.feed(text[start:start + size]))
+    return parser, epics
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 1000])
+def test_bare_array_emits_each_epic_across_any_chunk_boundary(size):
+    parser, epics = feed_in_chunks(json.dumps(EPICS), size)
+
+    assert epics == EPICS and parser.emitted == 2
+
+
+@pytest.mark.parametrize("size", [1, 5, 1000])
+def test_epics_wrapper_emits_the_wrapped_epics(size):
+    text = json.dumps({"project": "X", "tags": ["a", "b"], "epics": EPICS})
+
+    parser, epics = feed_in_chunks(text, size)
+
+    assert epics == EPICS
+
+
+def test_single_epic_object_emits_nothing_and_falls_back_to_the_full_parse(fake_mongo, token_budget):
+    text = json.dumps({"summary": "E", "required_skills": ["Backend"],
+                       "stories": [{"summary": "S1"}, {"summary": "S2"}]})
+
+    parser, epics = feed_in_chunks(text, 4)
+
+    # Its stories are not Epics
+    assert epics == [] and parser.emitted == 0
+    service = JiraScrumMasterService(client=types.SimpleNamespace(), mongo_client=fake_mongo,
+                                     token_budget=token_budget)
+    assert service._parse_decomposition(parser.text) == [json.loads(text)]
+
+
+def test_keys_inside_strings_do_not_select_the_epic_array():
+    text = '{"note": "\\"epics\\": [", "other": [{"summary": "not an epic"}], "epics": [{"summary": "E"}]}'
+
+    _, epics = feed_in_chunks(text, 3)
+
+    assert epics == [{"summary": "E"}]
+
+
+def test_unparsable_epic_is_dropped_and_counted():
+    parser = EpicStreamParser()
+
+    epics = parser.feed('[{"summary": "ok"}, {"summary": tru}, {"summary": "also ok"}]')
+
+    assert epics == [{"summary": "ok"}, {"summary": "also ok"}]
+    assert parser.dropped == 1
+
+
+class ChunkedCompletions:
+    """Streams `text` in `size`-character deltas, counting how many were sent."""
+
+    def __init__(self, text, size=8):
+        self.chunks = [text[i:i + size] for i in range(0, len(text), size)]
+        self.sent = 0
+        self.kwargs = None
+
+    async def create(self, **kwargs):
+        self.kwargs = kwargs
+        return self._stream()
+
+    async def _stream(self):
+        for chunk in self.chunks:
+            self.sent += 1
+            delta = types.SimpleNamespace(content=chunk)
+            yield types.SimpleNamespace(choices=[types.SimpleNamespace(delta=delta)])
+
+
+@pytest.fixture
+def stream_decomposition(fake_mongo, token_budget):
+    """Run one streamed decomposition; returns (epic, deltas sent so far) as each Epic is yielded."""
+    def stream(completions):
+        client = types.SimpleNamespace(chat=types.SimpleNamespace(completions=completions))
+        service = JiraScrumMasterService(client=client, mongo_client=fake_mongo, token_budget=token_budget)
+
+        async def run():
+            return [(epic, completions.sent) async for epic in service._decompose_part_stream("spec")]
+
+        return asyncio.run(run())
+
+    return stream
+
+
+def test_prompt_asks_for_the_epics_wrapper_and_each_epic_streams_before_the_end(stream_decomposition):
+    completions = ChunkedCompletions(json.dumps({"epics": EPICS}))
+
+    streamed = stream_decomposition(completions)
+
+    assert '"epics"' in completions.kwargs["messages"][-1]["content"]
+    assert [epic for epic, _ in streamed] == EPICS
+    assert streamed[0][1] < len(completions.chunks)
+
+
+def test_other_wrapper_key_is_parsed_at_the_end_with_a_warning(capsys, stream_decomposition):
+    completions = ChunkedCompletions(json.dumps({"tasks": EPICS}))
+
+    streamed = stream_decomposition(completions)
+
+    assert [epic for epic, _ in streamed] == EPICS
+    assert all(sent == len(completions.chunks) for _, sent in streamed)
+    assert 'WARNING: decomposition did not use the "epics" key' in capsys.readouterr().out
@@ -0,0 +1,71 @@
+"""
+Tests for the write-behind chat message buffer.
+
+Run with: python -m pytest test_message_buffer.py
+"""
+
+import asyncio
+
+from message_buffer import ChatMessageBuffer
+
+
+def test_turns_are_paired_and_written_in_batches(history_mongo):
+    mongo = history_mongo
+
+    async def run():
+        buffer = ChatMessageBuffer(mongo, batch_size=20, flush_ms=50)
+        for i in range(25):
+            buffer.add_turn(f"session-{i % 3}", f"question {i}", f"answer {i}")
+        await asyncio.sleep(0)
+        early = list(mongo.batches)
+        await asyncio.sleep(0.1)
+        return early, buffer.stats()
+
+    early, stats = asyncio.run(run())
+
+    # A full batch went out at once, the rest within the flush interval
+    assert mongo.batches == [20, 20, 10]
+    assert early == [] and stats["pending"] == 0 and stats["written"] == 50
+    session = [m for m in mongo.messages if m["session_id"] == "session-0"]
+    assert [m["role"] for m in session[:2]] == ["user", "assistant"]
+    assert session[0]["content"] == "question 0" and session[1]["content"] == "answer 0"
+    assert session[0]["_id"] < session[1]["_id"]
+
+
+def test_failed_writes_are_retried_and_close_drains(history_mongo):
+    mongo = history_mongo
+    mongo.failures = 1
+
+    async def run():
+        buffer = ChatMessageBuffer(mongo, batch_size=100, flush_ms=10)
+        buffer.add_turn("s", "first", "reply")
+        await asyncio.sleep(0.02)
+        failed_once = buffer.stats()["pending"]
+        buffer.add_turn("s", "second", "reply")
+        await buffer.close()
+        return failed_once, buffer.stats()
+
+    failed_once, stats = asyncio.run(run())
+
+    assert failed_once == 2
+    assert [m["content"] for m in mongo.messages] == ["first", "reply", "second", "reply"]
+    assert stats["pending"] == 0 and stats["dropped"] == 0
+
+
+def test_history_includes_turns_not_yet_written(history_mongo, make_manager):
+    mongo = history_mongo
+
+    async def run():
+        buffer = ChatMessageBuffer(mongo, batch_size=100, flush_ms=60_000)
+        manager, _ = make_manager(mongo)
+        manager.buffer = buffer
+        mongo.add("s", "user", "stored question")
+        buffer.add_turn("s", "queued question", "queued answer")
+        context = await manager.context("s")
+        await buffer.close()
+        return context, await manager.context("s")
+
+    before, after = asyncio.run(run())
+
+    assert [m["content"] for m in before] == ["stored question", "queued question", "queued answer"]
+    assert before == after
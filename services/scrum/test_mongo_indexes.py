@@ -0,0 +1,102 @@
+"""
+Tests that every Mongo query shape the service runs is backed by an index.
+
+The coverage tests check the declared indexes; the explain() test runs each
+query against a real mongod and is skipped unless MONGO_TEST_URL is set.
+
+Run with: python -m pytest test_mongo_indexes.py
+"""
+
+import asyncio
+import os
+import uuid
+
+import pytest
+
+from mongo_indexes import INDEXES, QUERY_SHAPES
+
+
+def index_keys(collection):
+    yield ["_id"]
+    for model in INDEXES.get(collection, []):
+        yield [field for field, _ in model.document["key"].items()]
+
+
+def query_fields(query):
+    """Equality fields of a filter, and the fields it filters by range or inside $or."""
+    equality, other = set(), set()
+    for field, value in query.items():
+        if field == "$or":
+            for branch in value:
+                other.update(branch)
+        elif isinstance(value, dict):
+            other.add(field)
+        else:
+            equality.add(field)
+    return equality, other
+
+
+def covering_index(shape):
+    equality, other = query_fields(shape.filter)
+    other |= {field for field, _ in shape.sort or []}
+    for keys in index_keys(shape.collection):
+        prefix = keys[:len(equality)]
+        if equality and set(prefix) == equality and (other - equality) <= set(keys):
+            return keys
+        if "_id" in equality and keys == ["_id"]:
+            return keys
+        if not equality and keys[0] in other:
+            # Range-only filter, served by an index that leads with the range field
+            return keys
+    return None
+
+
+@pytest.mark.parametrize("shape", QUERY_SHAPES, ids=lambda shape: shape.collection)
+def test_every_query_shape_has_a_covering_index(shape):
+    assert covering_index(shape) is not None, f"No index serves {shape}"
+
+
+def test_ensure_indexes_is_idempotent(mongomock_client):
+    client = mongomock_client
+
+    async def run():
+        await client.ensure_indexes()
+        await client.ensure_indexes()
+        return {name: await client.db[name].index_information() for name in INDEXES}
+
+    info = asyncio.run(run())
+
+    assert info["jira_cache"]["key_1"]["unique"]
+    assert info["chat_summaries"]["session_id_1"]["unique"]
+    assert "session_id_1_timestamp_1__id_1" in info["chat_history"]
+    assert info["decompositions"]["expires_at_1"]["expireAfterSeconds"] == 0
+
+
+def winning_stages(plan):
+    yield plan.get("stage")
+    for child in [plan.get("inputStage")] + plan.get("inputStages", []):
+        if child:
+            yield from winning_stages(child)
+
+
+@pytest.mark.skipif(not os.getenv("MONGO_TEST_URL"), reason="MONGO_TEST_URL is not set")
+def test_hot_queries_use_an_index_on_mongod():
+    from pymongo import MongoClient as SyncMongoClient
+
+    client = SyncMongoClient(os.environ["MONGO_TEST_URL"])
+    db = client[f"scrum_index_test_{uuid.uuid4().hex[:8]}"]
+    try:
+        for name, models in INDEXES.items():
+            db[name].create_indexes(models)
+            # A few documents so the planner has a choice to make
+            db[name].insert_many([{"session_id": f"s{i}", "key": f"SCRUM-{i}"} for i in range(20)])
+        for shape in QUERY_SHAPES:
+            cursor = db[shape.collection].find(shape.filter)
+            if shape.sort:
+                cursor = cursor.sort(shape.sort)
+            plan = cursor.explain()["queryPlanner"]["winningPlan"]
+            plan = plan.get("queryPlan", plan)
+            assert "COLLSCAN" not in set(winning_stages(plan)), f"{shape} scans {shape.collection}"
+    finally:
+        client.drop_database(db.name)
+        client.close()
@@ -0,0 +1,118 @@
+"""
+Tests for the organization snapshot cache.
+
+Run with: python -m pytest test_organization_cache.py
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from http_client import HttpClientPool
+from organization_cache import OrganizationCache
+
+ORGANIZATION = {
+    "organization": {"id": 7, "name": "Acme"},
+    "users": [
+        {"name": "Ann", "surname": "Lee", "email": "ann@acme.test", "job": "Senior Backend Engineer"},
+        {"name": "Bob", "surname": "Kim", "email": "bob@acme.test", "job": "Designer", "skills": ["Figma"]},
+    ],
+}
+
+
+class FakeBackend:
+    """`/organization` endpoint that supports ETag revalidation."""
+
+    def __init__(self, etag='"v1"'):
+        self.etag = etag
+        self.requests = []
+        self.status = 200
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(dict(request.headers))
+        await asyncio.sleep(0.01)
+        if self.status != 200:
+            return httpx.Response(self.status)
+        if self.etag and request.headers.get("If-None-Match") == self.etag:
+            return httpx.Response(304)
+        headers = {"ETag": self.etag} if self.etag else {}
+        return httpx.Response(200, json=ORGANIZATION, headers=headers)
+
+
+def make_cache(backend: FakeBackend, **kwargs) -> OrganizationCache:
+    http = HttpClientPool(transport=httpx.MockTransport(backend), retries=0)
+    return OrganizationCache(http, url="http://backend.test/organization", **kwargs)
+
+
+def test_snapshot_has_skills_and_is_read_only():
+    backend = FakeBackend()
+
+    async def run():
+        cache = make_cache(backend)
+        snapshot = await cache.get("token-a")
+        await cache.http.aclose()
+        return snapshot
+
+    snapshot = asyncio.run(run())
+
+    ann, bob = snapshot["users"]
+    assert {"Backend", "Architecture", "Programming"} <= set(ann["skills"])
+    assert bob["skills"] == ("Figma",)
+    assert snapshot["organization"]["name"] == "Acme"
+    with pytest.raises(TypeError):
+        ann["skills"] = []
+    with pytest.raises(TypeError):
+        snapshot["organization"]["name"] = "Other"
+
+
+def test_fresh_snapshot_is_a_lookup_and_misses_share_one_fetch():
+    backend = FakeBackend()
+
+    async def run():
+        cache = make_cache(backend, ttl_seconds=60)
+        first = await asyncio.gather(*[cache.get("token-a") for _ in range(5)])
+        again = await cache.get("token-a")
+        await cache.http.aclose()
+        return first, again, cache.stats()
+
+    first, again, stats = asyncio.run(run())
+
+    assert len(backend.requests) == 1
+    assert all(snapshot is again for snapshot in first)
+    assert stats["hits"] == 1
+
+
+def test_stale_snapshot_is_served_and_revalidated_with_etag():
+    backend = FakeBackend()
+
+    async def run():
+        cache = make_cache(backend, ttl_seconds=0, stale_seconds=60)
+        first = await cache.get("token-a")
+        stale = await cache.get("token-a")
+        await asyncio.sleep(0.05)
+        await cache.http.aclose()
+        return first, stale, cache.stats()
+
+    first, stale, stats = asyncio.run(run())
+
+    assert stale is first
+    assert len(backend.requests) == 2
+    assert backend.requests[1]["if-none-match"] == '"v1"'
+    assert stats["not_modified"] == 1
+
+
+def test_revoked_token_is_evicted():
+    backend = FakeBackend(etag=None)
+
+    async def run():
+        cache = make_cache(backend, ttl_seconds=0, stale_seconds=0)
+        await cache.get("token-a")
+        backend.status = 401
+        with pytest.raises(ValueError):
+            await cache.get("token-a")
+        entries = cache.stats()["entries"]
+        await cache.http.aclose()
+        return entries
+
+    assert asyncio.run(run()) == 0
@@ -0,0 +1,130 @@
+"""
+Tests for the async, cached rating client.
+
+Run with: python -m pytest test_rating_service.py
+"""
+
+import asyncio
+
+import httpx
+
+from http_client import HttpClientPool
+from rating_service import RatingService
+
+LATENCY = 0.05
+
+
+class FakeRatings:
+    """Rating API stand-in that tracks requests and how many run at once."""
+
+    def __init__(self, ratings):
+        self.ratings = ratings
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.fail = False
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        email = request.url.path.split("/")[-2]
+        self.requests.append(email)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(LATENCY)
+        finally:
+            self.in_flight -= 1
+        if self.fail:
+            return httpx.Response(500)
+        if email not in self.ratings:
+            return httpx.Response(404)
+        return httpx.Response(200, json={"email": email, "rating": self.ratings[email]})
+
+
+def make_rating_service(api: FakeRatings, **kwargs) -> RatingService:
+    http = HttpClientPool(transport=httpx.MockTransport(api), retries=0)
+    return RatingService(http, base_url="http://git.test/api/v1", **kwargs)
+
+
+def test_lookups_fan_out_with_bounded_concurrency():
+    api = FakeRatings({f"user{i}@example.com": i for i in range(20)})
+    users = [{"email": f"user{i}@example.com"} for i in range(20)] + [{"email": "new@example.com"}, {"name": "no email"}]
+
+    async def run():
+        service = make_rating_service(api, concurrency=5)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        ratings = await service.get_ratings_for_users(users)
+        elapsed = loop.time() - start
+        await service.http.aclose()
+        return ratings, elapsed
+
+    ratings, elapsed = asyncio.run(run())
+
+    assert ratings["user7@example.com"] == 7
+    assert ratings["new@example.com"] == 0
+    assert len(ratings) == 21
+    assert api.max_in_flight == 5
+    # 21 lookups in waves of five, not one after another
+    assert elapsed < LATENCY * 8
+
+
+def test_concurrent_lookups_share_one_request_and_warm_cache_is_free():
+    api = FakeRatings({"dev@example.com": 420})
+
+    async def run():
+        service = make_rating_service(api)
+        first = await asyncio.gather(*[service.get_rating("dev@example.com") for _ in range(10)])
+        requests_after_first = len(api.requests)
+        second = await service.get_ratings_for_users([{"email": "dev@example.com"}] * 3)
+        await service.http.aclose()
+        return first, requests_after_first, second, service.stats()
+
+    first, requests_after_first, second, stats = asyncio.run(run())
+
+    assert first == [420] * 10
+    assert requests_after_first == 1
+    assert second == {"dev@example.com": 420}
+    assert len(api.requests) == 1
+    assert stats["hits"] == 1
+
+
+def test_stale_rating_is_served_while_refreshing():
+    api = FakeRatings({"dev@example.com": 100})
+
+    async def run():
+        service = make_rating_service(api, ttl_seconds=0, stale_seconds=60)
+        await service.get_rating("dev@example.com")
+        api.ratings["dev@example.com"] = 200
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        stale = await service.get_rating("dev@example.com")
+        stale_elapsed = loop.time() - start
+        await asyncio.sleep(LATENCY * 2)
+        refreshed = await service.get_rating("dev@example.com")
+        await service.close()
+        await service.http.aclose()
+        return stale, stale_elapsed, refreshed
+
+    stale, stale_elapsed, refreshed = asyncio.run(run())
+
+    assert stale == 100
+    assert stale_elapsed < LATENCY / 2
+    assert refreshed == 200
+
+
+def test_errors_keep_previous_rating_and_are_not_cached():
+    api = FakeRatings({"dev@example.com": 300})
+
+    async def run():
+        service = make_rating_service(api, ttl_seconds=0, stale_seconds=0)
+        api.fail = True
+        missing = await service.get_rating("dev@example.com")
+        api.fail = False
+        fetched = await service.get_rating("dev@example.com")
+        api.fail = True
+        kept = await service.get_rating("dev@example.com")
+        await service.http.aclose()
+        return missing, fetched, kept
+
+    assert asyncio.run(run()) == (0, 300, 300)
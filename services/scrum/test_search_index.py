@@ -0,0 +1,231 @@
+"""
+Tests for the BM25 issue index used for chat context.
+
+Run with: python -m pytest test_search_index.py
+"""
+
+import asyncio
+import datetime
+
+from search_index import BM25Index, IssueSearch
+
+ISSUES = [
+    {"key": "SCRUM-1", "summary": "Login page returns 500", "description": "OAuth callback fails", "status": "In Progress",
+     "assignee": "Ann Lee", "updated": "2024-05-01"},
+    {"key": "SCRUM-2", "summary": "Add dark mode to settings", "description": "UI theme toggle", "status": "To Do",
+     "assignee": "Cy Poe", "updated": "2024-05-03"},
+    {"key": "SCRUM-3", "summary": "Migrate billing database", "description": "Move invoices to Postgres", "status": "Done",
+     "assignee": "Bob Kim", "updated": "2024-05-02"},
+    {"key": "SCRUM-4", "summary": "Оптимизация поиска задач", "description": None, "status": "To Do", "updated": "2024-04-01"},
+]
+
+
+def keys(results):
+    return [issue["key"] for _, issue in results]
+
+
+def test_ranks_matching_issues_first():
+    index = BM25Index()
+    index.upsert_many(ISSUES)
+
+    assert keys(index.search("Why does the login fail?", k=2))[0] == "SCRUM-1"
+    assert keys(index.search("what did Bob do on the database", k=3))[0] == "SCRUM-3"
+    assert keys(index.search("scrum-2 status"))[0] == "SCRUM-2"
+    assert keys(index.search("поиска"))[0] == "SCRUM-4"
+    assert index.search("kubernetes") == []
+
+
+def test_upsert_replaces_postings_incrementally():
+    index = BM25Index()
+    index.upsert_many(ISSUES)
+
+    index.upsert({**ISSUES[1], "summary": "Add kubernetes autoscaling", "description": "", "_id": "ignored"})
+
+    assert keys(index.search("kubernetes")) == ["SCRUM-2"]
+    assert index.search("dark mode") == []
+    assert "_id" not in index.search("kubernetes")[0][1]
+    index.remove("SCRUM-2")
+    assert len(index) == 3
+    assert index.search("kubernetes") == []
+
+
+class FakeCache:
+    def __init__(self, issues):
+        self.issues = issues
+        self.loads = 0
+
+    async def load_cached_issues(self, synced_since=None):
+        self.loads += 1
+        return list(self.issues)
+
+    async def get_jira_cache_version(self):
+        return 0
+
+
+def test_issue_search_loads_once_keeps_synced_updates_and_falls_back_to_recent():
+    cache = FakeCache(ISSUES)
+    search = IssueSearch(cache)
+    search.update([{**ISSUES[0], "summary": "Login page fixed"}])
+
+    async def run():
+        relevant = await asyncio.gather(*[search.relevant("login", k=3) for _ in range(3)])
+        fallback = await search.relevant("unrelated words", k=2)
+        return relevant, fallback
+
+    relevant, fallback = asyncio.run(run())
+
+    assert cache.loads == 1
+    assert relevant[0][0]["summary"] == "Login page fixed"
+    assert [issue["key"] for issue in fallback] == ["SCRUM-2", "SCRUM-3"]
+    assert search.stats()["fallbacks"] == 1
+
+
+class FakeReplicatedCache(FakeCache):
+    """jira_cache shared with other replicas: a version counter, synced_at stamps and an optional change stream."""
+
+    def __init__(self, issues, change_stream=False):
+        super().__init__([])
+        self.version = 0
+        self.version_reads = 0
+        self.changes = asyncio.Queue() if change_stream else None
+        self.sync(issues)
+
+    def sync(self, issues):
+        """What another replica's sync does: write the issues and bump the version."""
+        synced_at = datetime.datetime.utcnow()
+        self.issues = [issue for issue in self.issues if issue["key"] not in {i["key"] for i in issues}]
+        self.issues += [{**issue, "synced_at": synced_at} for issue in issues]
+        self.version += 1
+        if self.changes is not None:
+            for issue in issues:
+                self.changes.put_nowait({"operationType": "update", "fullDocument": issue})
+
+    async def load_cached_issues(self, synced_since=None):
+        self.loads += 1
+        return [issue for issue in self.issues if synced_since is None or issue["synced_at"] >= synced_since]
+
+    async def get_jira_cache_version(self):
+        self.version_reads += 1
+        return self.version
+
+    def watch_jira_cache(self):
+        if self.changes is None:
+            raise RuntimeError("The $changeStream stage is only supported on replica sets")
+        return FakeChangeStream(self.changes)
+
+
+class FakeChangeStream:
+    def __init__(self, changes):
+        self.changes = changes
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.changes.get()
+
+
+def test_context_is_prerendered_and_read_without_mongo_round_trips():
+    cache = FakeReplicatedCache(ISSUES)
+    search = IssueSearch(cache)
+
+    async def run():
+        first = await search.context("login", k=1)
+        version = search.version
+        again = [await search.context("login", k=1) for _ in range(3)]
+        search.update([{**ISSUES[0], "summary": "Login page fixed", "updated": "2024-06-01"}])
+        # An older copy arriving late does not replace the newer one
+        search.update([ISSUES[0]])
+        return first, again, version, await search.context("login", k=1), await search.upcoming_context(2)
+
+    first, again, version, updated, upcoming = asyncio.run(run())
+
+    assert first == "Relevant Jira Issues:\n- [SCRUM-1] Login page returns 500 (In Progress)\n"
+    assert again == [first] * 3
+    assert cache.loads == 1 and cache.version_reads == 1
+    assert search.version == version + 1
+    assert updated == "Relevant Jira Issues:\n- [SCRUM-1] Login page fixed (In Progress)\n"
+    assert upcoming.startswith("- [SCRUM-1] Login page fixed (Status: In Progress)\n  Description: OAuth callback fails...")
+
+
+def listed_keys(context):
+    return [line.split("]")[0][3:] for line in context.splitlines() if line.startswith("-")]
+
+
+def test_upcoming_context_lists_issues_due_soonest_first():
+    cache = FakeReplicatedCache([{**ISSUES[0], "duedate": "2024-07-01"}, {**ISSUES[1], "duedate": "2024-06-01"},
+                                 ISSUES[3], {**ISSUES[3], "key": "SCRUM-5", "updated": "2024-04-02"}])
+    search = IssueSearch(cache)
+
+    context = asyncio.run(search.upcoming_context(3))
+
+    assert listed_keys(context) == ["SCRUM-2", "SCRUM-1", "SCRUM-5"]
+
+
+def test_upcoming_context_skips_done_issues_and_lists_overdue_ones_first():
+    overdue = (datetime.date.today() - datetime.timedelta(days=30)).isoformat()
+    soon = (datetime.date.today() + datetime.timedelta(days=1)).isoformat()
+    cache = FakeReplicatedCache([
+        {**ISSUES[0], "duedate": soon},
+        {**ISSUES[1], "duedate": f"{overdue}T12:00:00.000+0000"},
+        {**ISSUES[2], "duedate": overdue},
+        {**ISSUES[3], "duedate": overdue, "status": "Closed"},
+        {"key": "SCRUM-5", "summary": "Ship it", "status": "Released", "status_category": "done",
+         "duedate": overdue, "updated": "2024-05-01"},
+        {"key": "SCRUM-6", "summary": "Someday", "status": "Done", "updated": "2024-06-01"},
+        {"key": "SCRUM-7", "summary": "Undated", "status": "To Do", "updated": "2024-05-01"},
+    ])
+    search = IssueSearch(cache)
+
+    context = asyncio.run(search.upcoming_context(10))
+
+    # SCRUM-3, 4, 5 and 6 are done (by status name or category); overdue SCRUM-2 stays, first
+    assert listed_keys(context) == ["SCRUM-2", "SCRUM-1", "SCRUM-7"]
+
+
+def test_polling_picks_up_issues_synced_by_other_replicas():
+    cache = FakeReplicatedCache(ISSUES)
+    search = IssueSearch(cache, poll_seconds=0.01, overlap_seconds=0)
+
+    async def run():
+        search.start()
+        await asyncio.sleep(0.03)
+        reads = cache.version_reads
+        await asyncio.sleep(0.03)
+        idle_loads = cache.loads
+        cache.sync([{**ISSUES[1], "summary": "Add kubernetes autoscaling", "updated": "2024-06-01"}])
+        await asyncio.sleep(0.05)
+        await search.close()
+        return reads, idle_loads, await search.context("kubernetes", k=1)
+
+    reads, idle_loads, context = asyncio.run(run())
+
+    assert search.mode == "polling"
+    # Polling reads the version; issues are only loaded after it moves
+    assert cache.version_reads > reads and idle_loads == 1
+    assert cache.loads == 2 and search.refreshes == 1
+    assert context == "Relevant Jira Issues:\n- [SCRUM-2] Add kubernetes autoscaling (To Do)\n"
+
+
+def test_change_stream_applies_other_replicas_syncs_without_polling():
+    cache = FakeReplicatedCache(ISSUES, change_stream=True)
+    search = IssueSearch(cache, poll_seconds=0.01)
+
+    async def run():
+        search.start()
+        await asyncio.sleep(0.02)
+        cache.sync([{**ISSUES[2], "status": "Reopened", "updated": "2024-06-01"}])
+        await asyncio.sleep(0.02)
+        await search.close()
+        return await search.context("billing", k=1)
+
+    context = asyncio.run(run())
+
+    assert search.mode == "change_stream" and cache.loads == 1 and search.refreshes == 0
+    assert context == "Relevant Jira Issues:\n- [SCRUM-3] Migrate billing database (Reopened)\n"
@@ -0,0 +1,74 @@
+"""
+Tests for splitting documents into sections and merging per-section decompositions.
+
+Run with: python -m pytest test_sections.py
+"""
+
+import asyncio
+
+from sections import merge_forests, pack_sections, split_sections
+
+DOCUMENT = """Intro text.
+# Auth
+Users sign in.
+```
+# not a heading
+```
+## SSO
+Okta only.
+# Billing
+Invoices monthly.
+"""
+
+
+def test_sections_split_on_headings_outside_code_fences():
+    sections = split_sections(DOCUMENT)
+
+    assert [(s.title, s.level) for s in sections] == [(None, 0), ("Auth", 1), ("SSO", 2), ("Billing", 1)]
+    assert "# not a heading" in sections[1].text
+
+
+def test_small_sections_are_packed_together_and_large_ones_split_with_their_heading(token_budget):
+    sections = split_sections("# A\nshort\n# B\nshort\n# Big\n" + "x" * 300)
+
+    parts = asyncio.run(pack_sections(sections, token_budget, 200))
+
+    assert parts[0] == "# A\nshort\n\n# B\nshort"
+    assert parts[1].startswith("# Big\n") and len(parts) > 2
+    assert all(p.startswith("# Big (continued)\n") for p in parts[2:])
+    assert all(len(p.encode()) <= 200 for p in parts)
+
+
+def test_repeated_items_are_merged_ignoring_case_and_punctuation():
+    forests = [
+        [{"summary": "User login", "complexity": 2, "required_skills": ["Backend"],
+          "stories": [{"summary": "Login form", "subtasks": [{"summary": "Build form"}]}]}],
+        [{"summary": "user login!", "description": "Sign in", "complexity": 5, "required_skills": ["Frontend"],
+          "stories": [{"summary": "Login Form.", "subtasks": [{"summary": "Validate input"}]},
+                      {"summary": "Logout"}]},
+         {"summary": "Billing"}],
+    ]
+
+    merged = merge_forests(forests)
+
+    assert [e["summary"] for e in merged] == ["User login", "Billing"]
+    login = merged[0]
+    assert login["description"] == "Sign in" and login["complexity"] == 5
+    assert login["required_skills"] == ["Backend", "Frontend"]
+    assert [s["summary"] for s in login["stories"]] == ["Login form", "Logout"]
+    assert [t["summary"] for t in login["stories"][0]["subtasks"]] == ["Build form", "Validate input"]
+
+
+def test_duplicates_within_one_forest_are_merged_too():
+    merged = merge_forests([[{"summary": "Auth", "stories": [{"summary": "SSO"}, {"summary": "sso"}]},
+                             {"summary": "AUTH"}, "not a node"]])
+
+    assert merged == [{"summary": "Auth", "stories": [{"summary": "SSO"}]}]
+
+
+def test_non_numeric_complexity_counts_as_zero():
+    merged = merge_forests([[{"summary": "A", "complexity": "high"}],
+                            [{"summary": "A", "complexity": "3"}],
+                            [{"summary": "A", "complexity": None}]])
+
+    assert merged[0]["complexity"] == 3
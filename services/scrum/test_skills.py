@@ -0,0 +1,77 @@
+"""
+Tests for the compiled skill matcher.
+
+Run with: python -m pytest test_skills.py
+"""
+
+import json
+
+import pytest
+
+from skills import SkillMatcher, derive_skills, load_skill_rules
+
+JOBS = [
+    "Senior Backend Engineer",
+    "Frontend Developer",
+    "iOS App Developer",
+    "Open Source Maintainer",
+    "Cloud Infrastructure Lead",
+    "Test Automation Engineer",
+    "Head of Data & ML",
+    "Designer",
+    "",
+    None,
+]
+
+
+def legacy_derive(job, rules):
+    job = (job or "").lower()
+    skills = []
+    for rule in rules:
+        if any(word in job for word in rule["keywords"]):
+            skills.extend(rule["skills"])
+    return list(dict.fromkeys(skills))
+
+
+def test_matches_the_previous_substring_rules():
+    rules = load_skill_rules()
+    matcher = SkillMatcher(rules)
+
+    assert matcher.derive_many(JOBS) == [legacy_derive(job, rules) for job in JOBS]
+    # "ai" inside "maintainer" counted as a data keyword before, and still does
+    assert "Data" in derive_skills("Open Source Maintainer")
+    assert derive_skills("Designer") == []
+
+
+def test_overlapping_and_prefix_keywords_all_hit():
+    matcher = SkillMatcher([
+        {"keywords": ["test"], "skills": ["Testing"]},
+        {"keywords": ["tester"], "skills": ["Manual QA"]},
+        {"keywords": ["ester"], "skills": ["Chemistry"]},
+    ])
+
+    assert matcher.derive("Game Tester") == ["Testing", "Manual QA", "Chemistry"]
+
+
+def test_matches_do_not_span_titles():
+    matcher = SkillMatcher([{"keywords": ["ops lead"], "skills": ["Operations"]}])
+
+    assert matcher.derive_many(["DevOps", "Lead"]) == [[], []]
+    assert matcher.derive_many(["DevOps Lead", "Lead"]) == [["Operations"], []]
+
+
+def test_rules_load_from_file(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps([{"name": "rust", "keywords": ["rust"], "skills": ["Rust"]}]))
+
+    matcher = SkillMatcher(load_skill_rules(str(path)))
+
+    assert matcher.derive("Rust Developer") == ["Rust"]
+
+
+def test_rule_without_skills_is_rejected(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps([{"name": "empty", "keywords": ["x"], "skills": []}]))
+
+    with pytest.raises(ValueError):
+        load_skill_rules(str(path))
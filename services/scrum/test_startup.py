@@ -0,0 +1,100 @@
+"""
+Tests for background warmup, readiness and the local tokenizer file.
+
+Run with: python -m pytest test_startup.py
+"""
+
+import asyncio
+import os
+import types
+
+import pytest
+import tiktoken
+from fastapi.testclient import TestClient
+
+import main
+from config import settings
+from openai_client import LazyAzureOpenAI
+from service import JiraScrumMasterService
+from token_budget import TokenBudget, load_encoding
+
+
+def test_warmup_retries_until_mongo_is_up_then_builds_indexes_and_syncs(monkeypatch, fake_mongo, fake_completions):
+    monkeypatch.setattr(settings, "STARTUP_RETRY_SECONDS", 0)
+    pings = []
+
+    async def ping():
+        # Unreachable for the first two pings
+        pings.append(len(pings))
+        if len(pings) <= 2:
+            raise ConnectionError("mongo is starting")
+
+    mongo = fake_mongo
+    mongo.ping = ping
+    budget = TokenBudget(encoding_file="cl100k_base.tiktoken")
+    monkeypatch.setattr(budget, "load", lambda: setattr(budget, "_encoding", "loaded"))
+    service = JiraScrumMasterService(
+        client=types.SimpleNamespace(chat=types.SimpleNamespace(completions=fake_completions)),
+        mongo_client=mongo,
+        token_budget=budget
+    )
+    steps = []
+
+    async def ensure_indexes():
+        steps.append(("indexes", service.ready))
+
+    monkeypatch.setattr(service, "ensure_indexes", ensure_indexes)
+    monkeypatch.setattr(service, "start_jira_sync", lambda: steps.append(("sync", service.ready)))
+
+    async def run():
+        assert not service.ready
+        service.start_warmup()
+        await service._warmup
+        await service.close()
+
+    asyncio.run(run())
+
+    assert len(pings) == 3
+    assert service.readiness == {"tokenizer": True, "openai": True, "mongo": True}
+    assert steps == [("indexes", True), ("sync", True)]
+
+
+def test_health_is_up_at_once_and_ready_waits_for_dependencies(monkeypatch):
+    monkeypatch.setattr(main.service, "start_warmup", lambda: None)
+    monkeypatch.setattr(main.service, "readiness", {"tokenizer": True, "openai": True, "mongo": False})
+
+    with TestClient(main.app) as client:
+        assert client.get("/health").json() == {"status": "ok"}
+        response = client.get("/ready")
+        assert response.status_code == 503 and response.json()["checks"]["mongo"] is False
+
+        main.service.readiness["mongo"] = True
+        response = client.get("/ready")
+        assert response.status_code == 200 and response.json()["ready"] is True
+
+
+def test_openai_client_is_created_on_first_use():
+    client = LazyAzureOpenAI()
+    assert not client.loaded
+
+    client.chat
+
+    assert client.loaded
+
+
+def test_missing_encoding_file_falls_back_to_tiktoken(monkeypatch, tmp_path, token_budget):
+    fallback = token_budget.encoding
+    monkeypatch.setattr(tiktoken, "encoding_for_model", lambda model: fallback)
+
+    budget = TokenBudget(encoding_file=str(tmp_path / "missing.tiktoken"))
+    assert not budget.loaded
+
+    assert budget.count("hello") == 5 and budget.encoding is fallback
+
+
+@pytest.mark.skipif(not os.path.exists(settings.TIKTOKEN_ENCODING_FILE), reason="no local cl100k_base.tiktoken")
+def test_local_encoding_file_matches_tiktoken():
+    local = load_encoding(settings.TIKTOKEN_ENCODING_FILE)
+
+    assert local.encode("hello world") == [15339, 1917]
+    assert local.encode("<|endoftext|>", allowed_special="all") == [100257]
@@ -0,0 +1,77 @@
+"""
+Tests for the map-reduce document summarizer.
+
+Run with: python -m pytest test_summarizer.py
+"""
+
+import asyncio
+import types
+
+import pytest
+
+from summarizer import MapReduceSummarizer
+
+
+class RecordingCompletions:
+    """Answers every prompt with `reply` after a short delay, tracking concurrent calls."""
+
+    def __init__(self, reply="ok"):
+        self.reply = reply
+        self.prompts = []
+        self.active = 0
+        self.peak = 0
+
+    async def create(self, **kwargs):
+        self.prompts.append(kwargs["messages"][-1]["content"])
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            self.active -= 1
+        message = types.SimpleNamespace(content=self.reply)
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)])
+
+
+@pytest.fixture
+def summarize(token_budget):
+    def run(completions, text, target_tokens, **kwargs):
+        client = types.SimpleNamespace(chat=types.SimpleNamespace(completions=completions))
+        summarizer = MapReduceSummarizer(client, token_budget, **kwargs)
+        return asyncio.run(summarizer.summarize(text, target_tokens))
+
+    return run
+
+
+def document_part(prompt):
+    return prompt.split("Document Part:\n", 1)[1].strip()
+
+
+def test_chunks_overlap_by_the_configured_tokens(summarize):
+    text = "".join(chr(ord("a") + i % 26) for i in range(100))
+    completions = RecordingCompletions()
+
+    summary = summarize(completions, text, 1000, chunk_tokens=40, overlap_tokens=10, concurrency=4)
+
+    parts = [document_part(p) for p in completions.prompts]
+    assert parts == [text[0:40], text[30:70], text[60:100]]
+    assert summary == "ok\n\nok\n\nok"
+
+
+def test_no_more_than_the_concurrency_limit_of_calls_run_at_once(summarize):
+    completions = RecordingCompletions()
+
+    summarize(completions, "x" * 1000, 1000, chunk_tokens=50, overlap_tokens=0, concurrency=3)
+
+    assert len(completions.prompts) == 20
+    assert completions.peak == 3
+
+
+def test_partial_summaries_over_the_target_are_reduced(summarize):
+    completions = RecordingCompletions(reply="s" * 30)
+
+    summary = summarize(completions, "x" * 400, 15, chunk_tokens=100, overlap_tokens=0, concurrency=2)
+
+    reduce_prompts = [p for p in completions.prompts if "Partial Summaries:" in p]
+    assert len(completions.prompts) == 4 + len(reduce_prompts) and reduce_prompts
+    assert summary.startswith("s") and len(summary.encode()) <= 15
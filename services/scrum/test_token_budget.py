@@ -0,0 +1,64 @@
+"""
+Tests for token counting, truncation and splitting.
+
+Run with: python -m pytest test_token_budget.py
+"""
+
+import asyncio
+import types
+
+import pytest
+
+from token_budget import TokenBudget
+
+
+def test_truncate_cuts_at_the_budget(token_budget):
+    budget = token_budget
+    text = "word " * 100
+
+    truncated = budget.truncate(text, 42)
+
+    assert budget.count(truncated) == 42 and text.startswith(truncated)
+    assert asyncio.run(budget.truncate_async(text, 42)) == truncated
+
+
+def test_truncate_keeps_text_within_the_budget_and_drops_split_characters(token_budget):
+    budget = token_budget
+
+    assert budget.truncate("short", 100) == "short"
+    assert budget.truncate("x" * 50, 50) == "x" * 50
+    # Each Cyrillic letter is two byte-tokens; a cut in the middle drops the half
+    assert budget.truncate("привет", 5) == "пр"
+
+
+def test_exceeds_counts_exactly_unless_the_text_surely_fits(token_budget):
+    budget = token_budget
+
+    async def run():
+        # 150 bytes estimate at ~43 tokens, but each byte is a token here
+        return (await budget.exceeds("x" * 100, 100), await budget.exceeds("x" * 150, 100),
+                await budget.exceeds("x" * 1000, 10), await budget.exceeds("x" * 350, 350))
+
+    assert asyncio.run(run()) == (False, True, True, False)
+
+
+def test_text_within_its_byte_length_is_not_encoded():
+    # An encoding without encode(): any exact count would raise
+    budget = TokenBudget(encoding=types.SimpleNamespace())
+
+    assert asyncio.run(budget.exceeds("1,2;3" * 20, 100)) is False
+    assert budget.truncate("1,2;3" * 20, 100) == "1,2;3" * 20
+
+
+def test_split_overlaps_consecutive_chunks(token_budget):
+    budget = token_budget
+    text = "".join(chr(ord("a") + i % 26) for i in range(100))
+
+    chunks = budget.split(text, 40, overlap=10)
+
+    assert [len(chunk) for chunk in chunks] == [40, 40, 40]
+    assert all(a[-10:] == b[:10] for a, b in zip(chunks, chunks[1:]))
+    assert chunks[0] + chunks[1][10:] + chunks[2][10:] == text
+    assert budget.split("", 40) == [] and budget.split("abc", 40) == ["abc"]
+    with pytest.raises(ValueError):
+        budget.split(text, 10, overlap=10)
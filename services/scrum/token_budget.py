@@ -0,0 +1,143 @@
+import asyncio
+import os
+import threading
+from typing import List
+
+import tiktoken
+from tiktoken.load import load_tiktoken_bpe
+
+from config import settings
+
+# Rough characters-per-token ratios for the cheap estimator. Non-ASCII text
+# (Cyrillic in our documents) packs noticeably fewer characters per token.
+ASCII_CHARS_PER_TOKEN = 3.5
+NON_ASCII_CHARS_PER_TOKEN = 2.5
+
+# cl100k_base (the gpt-4 encoding) as tiktoken_ext.openai_public defines it,
+# so it can be built from a local copy of its BPE file instead of a download.
+CL100K_BASE_SHA256 = "223921b76ee99bde995b7ff738513eef100fb51d18c93597a113bcffe865b2a7"
+CL100K_BASE_PAT_STR = (
+    r"""'(?i:[sdmt]|ll|ve|re)|[^\r\n\p{L}\p{N}]?+\p{L}++|\p{N}{1,3}+| ?[^\s\p{L}\p{N}]++[\r\n]*+|\s++$|\s*[\r\n]|\s+(?!\S)|\s"""
+)
+CL100K_BASE_SPECIAL_TOKENS = {
+    "<|endoftext|>": 100257,
+    "<|fim_prefix|>": 100258,
+    "<|fim_middle|>": 100259,
+    "<|fim_suffix|>": 100260,
+    "<|endofprompt|>": 100276,
+}
+
+
+def load_encoding(path: str = None, model: str = "gpt-4") -> tiktoken.Encoding:
+    """
+    The cl100k_base encoding from the BPE file at `path` (TIKTOKEN_ENCODING_FILE).
+
+    Falls back to tiktoken's own loader for `model`, which may download the
+    file, when there is no local copy.
+    """
+    path = path or settings.TIKTOKEN_ENCODING_FILE
+    if not os.path.exists(path):
+        print(f"⚠️ WARNING: {path} not found, loading the {model} encoding through tiktoken")
+        return tiktoken.encoding_for_model(model)
+    return tiktoken.Encoding(
+        name="cl100k_base",
+        pat_str=CL100K_BASE_PAT_STR,
+        mergeable_ranks=load_tiktoken_bpe(path, expected_hash=CL100K_BASE_SHA256),
+        special_tokens=CL100K_BASE_SPECIAL_TOKENS
+    )
+
+
+class TokenBudget:
+    """
+    Token counting and token-accurate truncation for prompt building.
+
+    The encoder is loaded once, by `load` during startup warmup or else on
+    first use. Exact counts, truncation and splitting encode the full text, so
+    the async variants run them in a worker thread to keep the event loop free.
+    """
+
+    def __init__(self, model: str = "gpt-4", encoding: tiktoken.Encoding = None, encoding_file: str = None):
+        self.model = model
+        self.encoding_file = encoding_file
+        self._encoding = encoding
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._encoding is not None
+
+    @property
+    def encoding(self) -> tiktoken.Encoding:
+        if self._encoding is None:
+            self.load()
+        return self._encoding
+
+    def load(self) -> tiktoken.Encoding:
+        with self._lock:
+            if self._encoding is None:
+                self._encoding = load_encoding(self.encoding_file, self.model)
+        return self._encoding
+
+    def estimate(self, text: str) -> int:
+        """Cheap token estimate without encoding the text."""
+        non_ascii = len(text.encode('utf-8')) - len(text)
+        ascii_chars = len(text) - non_ascii
+        return int(ascii_chars / ASCII_CHARS_PER_TOKEN + non_ascii / NON_ASCII_CHARS_PER_TOKEN) + 1
+
+    def count(self, text: str) -> int:
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+    async def count_async(self, text: str) -> int:
+        return await asyncio.to_thread(self.count, text)
+
+    async def exceeds(self, text: str, limit: int) -> bool:
+        """Whether `text` is longer than `limit` tokens, counting exactly unless it surely fits."""
+        if self._surely_fits(text, limit):
+            return False
+        return await self.count_async(text) > limit
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Cut `text` to at most `max_tokens` tokens on a token boundary."""
+        if self._surely_fits(text, max_tokens):
+            return text
+        tokens = self.encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        return self._decode(tokens[:max_tokens])
+
+    @staticmethod
+    def _surely_fits(text: str, max_tokens: int) -> bool:
+        # Every token covers at least one byte, so the UTF-8 length bounds the
+        # count; the estimate does not (digits and punctuation pack densely).
+        return len(text.encode('utf-8')) <= max_tokens
+
+    async def truncate_async(self, text: str, max_tokens: int) -> str:
+        return await asyncio.to_thread(self.truncate, text, max_tokens)
+
+    def split(self, text: str, max_tokens: int, overlap: int = 0) -> List[str]:
+        """
+        Split `text` into consecutive chunks of at most `max_tokens` tokens.
+
+        Each chunk after the first repeats the last `overlap` tokens of the
+        previous one, so content cut at a boundary appears whole in one chunk.
+        """
+        if overlap >= max_tokens:
+            raise ValueError("overlap must be smaller than max_tokens")
+        tokens = self.encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return [text] if text else []
+
+        chunks = []
+        step = max_tokens - overlap
+        for start in range(0, len(tokens), step):
+            chunks.append(self._decode(tokens[start:start + max_tokens]))
+            if start + max_tokens >= len(tokens):
+                break
+        return chunks
+
+    async def split_async(self, text: str, max_tokens: int, overlap: int = 0) -> List[str]:
+        return await asyncio.to_thread(self.split, text, max_tokens, overlap)
+
+    def _decode(self, tokens: List[int]) -> str:
+        # A cut can land inside a multi-byte character; drop the partial bytes.
+        return self.encoding.decode_bytes(tokens).decode('utf-8', errors='ignore')